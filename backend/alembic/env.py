@@ -10,7 +10,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from app.core.database import Base
-from app.models import user, watermark, payment
+from app.models import user, watermark, analysis, payment, admin, storage, stats
 
 config = context.config
 
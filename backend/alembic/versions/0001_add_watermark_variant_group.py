@@ -0,0 +1,31 @@
+"""add watermarks.variant_group
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    inspector = sa.inspect(op.get_bind())
+    return column in [c["name"] for c in inspector.get_columns(table)]
+
+
+def upgrade() -> None:
+    # Fresh databases already get the column from Base.metadata.create_all
+    if _has_column("watermarks", "variant_group"):
+        return
+    op.add_column("watermarks", sa.Column("variant_group", sa.String(length=32), nullable=True))
+    op.create_index("ix_watermarks_variant_group", "watermarks", ["variant_group"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_watermarks_variant_group", table_name="watermarks")
+    op.drop_column("watermarks", "variant_group")
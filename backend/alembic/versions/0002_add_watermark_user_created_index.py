@@ -0,0 +1,37 @@
+"""add (user_id, created_at DESC, id) index on watermarks
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_watermarks_user_created_id"
+
+
+def _has_index(table: str, name: str) -> bool:
+    inspector = sa.inspect(op.get_bind())
+    return name in [i["name"] for i in inspector.get_indexes(table)]
+
+
+def upgrade() -> None:
+    # Fresh databases already get the index from Base.metadata.create_all
+    if _has_index("watermarks", INDEX_NAME):
+        return
+    columns = ["user_id", sa.text("created_at DESC"), "id"]
+    if op.get_bind().dialect.name == "postgresql":
+        # Build without blocking inserts; CONCURRENTLY can't run in a transaction
+        with op.get_context().autocommit_block():
+            op.create_index(INDEX_NAME, "watermarks", columns, postgresql_concurrently=True)
+    else:
+        op.create_index(INDEX_NAME, "watermarks", columns)
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name="watermarks")
@@ -0,0 +1,156 @@
+"""move watermark AI analyses into a shared, compressed analyses table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+Each distinct analysis document is stored once (zlib, keyed by the sha256
+of its canonical JSON) and referenced by watermarks.analysis_id; the
+per-render keys stay in watermarks.ai_analysis. Rows are backfilled in
+batches by id. On PostgreSQL, VACUUM FULL (or pg_repack) the watermarks
+table afterwards to return the freed space.
+"""
+from alembic import op
+import sqlalchemy as sa
+import hashlib
+import json
+import zlib
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Must match app.models.analysis.RENDER_KEYS
+RENDER_KEYS = ("processing_time", "degradation", "custom_settings")
+BATCH_SIZE = 1000
+FK_NAME = "watermarks_analysis_id_fkey"
+
+analyses = sa.table(
+    "analyses",
+    sa.column("id", sa.Integer),
+    sa.column("sha256", sa.String),
+    sa.column("codec", sa.String),
+    sa.column("data", sa.LargeBinary),
+    sa.column("size", sa.Integer),
+    sa.column("created_at", sa.DateTime),
+)
+watermarks = sa.table(
+    "watermarks",
+    sa.column("id", sa.Integer),
+    sa.column("analysis_id", sa.Integer),
+    sa.column("ai_analysis", sa.JSON),
+)
+
+
+def _canonical_json(document: dict) -> bytes:
+    return json.dumps(document, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _batches(bind, where):
+    """Watermark rows matching `where` in id order, BATCH_SIZE at a time"""
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(watermarks.c.id, watermarks.c.analysis_id, watermarks.c.ai_analysis)
+            .where(watermarks.c.id > last_id, where)
+            .order_by(watermarks.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def _update_rows(bind, values: list) -> None:
+    bind.execute(
+        watermarks.update()
+        .where(watermarks.c.id == sa.bindparam("row_id"))
+        .values(analysis_id=sa.bindparam("new_analysis_id"), ai_analysis=sa.bindparam("info", type_=sa.JSON)),
+        values,
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # Fresh databases already get both from Base.metadata.create_all
+    if not inspector.has_table("analyses"):
+        op.create_table(
+            "analyses",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("sha256", sa.String(length=64), nullable=False),
+            sa.Column("codec", sa.String(length=8), nullable=False),
+            sa.Column("data", sa.LargeBinary(), nullable=False),
+            sa.Column("size", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_analyses_id", "analyses", ["id"])
+        op.create_index("ix_analyses_sha256", "analyses", ["sha256"], unique=True)
+
+    if "analysis_id" not in [c["name"] for c in inspector.get_columns("watermarks")]:
+        op.add_column("watermarks", sa.Column("analysis_id", sa.Integer(), nullable=True))
+        op.create_index("ix_watermarks_analysis_id", "watermarks", ["analysis_id"])
+        if bind.dialect.name != "sqlite":  # SQLite can't add constraints to a table
+            op.create_foreign_key(FK_NAME, "watermarks", "analyses", ["analysis_id"], ["id"])
+
+    ids = dict(bind.execute(sa.select(analyses.c.sha256, analyses.c.id)).all())
+    pending = sa.and_(watermarks.c.analysis_id.is_(None), watermarks.c.ai_analysis.isnot(None))
+    for rows in _batches(bind, pending):
+        values = []
+        for row in rows:
+            if not isinstance(row.ai_analysis, dict):
+                continue
+            document = {k: v for k, v in row.ai_analysis.items() if k not in RENDER_KEYS}
+            raw = _canonical_json(document)
+            sha256 = hashlib.sha256(raw).hexdigest()
+            if sha256 not in ids:
+                ids[sha256] = bind.execute(
+                    analyses.insert()
+                    .values(sha256=sha256, codec="zlib", data=zlib.compress(raw, 9), size=len(raw))
+                    .returning(analyses.c.id)
+                ).scalar_one()
+            values.append({
+                "row_id": row.id,
+                "new_analysis_id": ids[sha256],
+                "info": {k: row.ai_analysis[k] for k in RENDER_KEYS if k in row.ai_analysis},
+            })
+        if values:
+            _update_rows(bind, values)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    # Put the full document back on every row before dropping the table
+    documents = {}
+    for analysis_id, codec, data in bind.execute(
+        sa.select(analyses.c.id, analyses.c.codec, analyses.c.data)
+    ).all():
+        if codec == "zstd":
+            import zstandard
+
+            raw = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            raw = zlib.decompress(data)
+        documents[analysis_id] = json.loads(raw)
+
+    for rows in _batches(bind, watermarks.c.analysis_id.isnot(None)):
+        _update_rows(bind, [
+            {
+                "row_id": row.id,
+                "new_analysis_id": None,
+                "info": {**documents[row.analysis_id], **(row.ai_analysis or {})},
+            }
+            for row in rows
+        ])
+
+    if bind.dialect.name != "sqlite":
+        op.drop_constraint(FK_NAME, "watermarks", type_="foreignkey")
+    op.drop_index("ix_watermarks_analysis_id", table_name="watermarks")
+    op.drop_column("watermarks", "analysis_id")
+    op.drop_index("ix_analyses_sha256", table_name="analyses")
+    op.drop_index("ix_analyses_id", table_name="analyses")
+    op.drop_table("analyses")
@@ -0,0 +1,112 @@
+"""add daily_stats and daily_active_users rollups for the admin dashboard
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+Backfills both tables from the existing watermarks and completed payments;
+from then on the application keeps them up to date.
+"""
+from alembic import op
+import sqlalchemy as sa
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+daily_stats = sa.table(
+    "daily_stats",
+    sa.column("day", sa.Date),
+    sa.column("watermarks", sa.Integer),
+    sa.column("payments", sa.Integer),
+    sa.column("revenue", sa.Numeric(12, 2)),
+)
+daily_active_users = sa.table(
+    "daily_active_users",
+    sa.column("day", sa.Date),
+    sa.column("user_id", sa.Integer),
+)
+watermarks = sa.table(
+    "watermarks",
+    sa.column("user_id", sa.Integer),
+    sa.column("created_at", sa.DateTime),
+)
+payments = sa.table(
+    "payments",
+    sa.column("amount", sa.Numeric(10, 2)),
+    sa.column("payment_status", sa.String),
+    sa.column("completed_at", sa.DateTime),
+)
+
+
+def _as_date(value) -> date:
+    # SQLite's date() returns text
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _insert_batched(bind, table, rows: list) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        bind.execute(table.insert(), rows[start:start + BATCH_SIZE])
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # Fresh databases already get the tables from Base.metadata.create_all
+    if not inspector.has_table("daily_stats"):
+        op.create_table(
+            "daily_stats",
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("watermarks", sa.Integer(), nullable=False),
+            sa.Column("payments", sa.Integer(), nullable=False),
+            sa.Column("revenue", sa.Numeric(12, 2), nullable=False),
+        )
+    if not inspector.has_table("daily_active_users"):
+        op.create_table(
+            "daily_active_users",
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), primary_key=True),
+        )
+
+    if bind.execute(sa.select(sa.func.count()).select_from(daily_stats)).scalar():
+        return  # already backfilled
+
+    days = defaultdict(lambda: {"watermarks": 0, "payments": 0, "revenue": Decimal(0)})
+    created_day = sa.func.date(watermarks.c.created_at)
+    for day, count in bind.execute(
+        sa.select(created_day, sa.func.count())
+        .where(watermarks.c.created_at.isnot(None))
+        .group_by(created_day)
+    ):
+        days[_as_date(day)]["watermarks"] = count
+
+    completed_day = sa.func.date(payments.c.completed_at)
+    for day, count, revenue in bind.execute(
+        sa.select(completed_day, sa.func.count(), sa.func.sum(payments.c.amount))
+        .where(payments.c.payment_status == "COMPLETED", payments.c.completed_at.isnot(None))
+        .group_by(completed_day)
+    ):
+        days[_as_date(day)].update(payments=count, revenue=Decimal(str(revenue or 0)))
+
+    _insert_batched(bind, daily_stats, [{"day": day, **values} for day, values in days.items()])
+
+    active = bind.execute(
+        sa.select(created_day, watermarks.c.user_id)
+        .where(watermarks.c.created_at.isnot(None))
+        .group_by(created_day, watermarks.c.user_id)
+    ).all()
+    _insert_batched(
+        bind, daily_active_users, [{"day": _as_date(day), "user_id": user_id} for day, user_id in active]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_active_users")
+    op.drop_table("daily_stats")
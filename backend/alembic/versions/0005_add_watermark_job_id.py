@@ -0,0 +1,31 @@
+"""add watermarks.job_id so background jobs insert their row once
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    inspector = sa.inspect(op.get_bind())
+    return column in [c["name"] for c in inspector.get_columns(table)]
+
+
+def upgrade() -> None:
+    # Fresh databases already get the column from Base.metadata.create_all
+    if _has_column("watermarks", "job_id"):
+        return
+    op.add_column("watermarks", sa.Column("job_id", sa.String(length=32), nullable=True))
+    op.create_index("ix_watermarks_job_id", "watermarks", ["job_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_watermarks_job_id", table_name="watermarks")
+    op.drop_column("watermarks", "job_id")
@@ -1,13 +1,4 @@
-from typing import Generator
-from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..core.database import SessionLocal
+# The request-scoped AsyncSession dependency lives in core.database
+from ..core.database import get_db
 
-
-def get_db() -> Generator:
-    try:
-        db = SessionLocal()
-        yield db
-    finally:
-        db.close()
-from fastapi import Depends
+__all__ = ["get_db"]
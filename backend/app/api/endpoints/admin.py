@@ -1,23 +1,28 @@
 # backend/app/api/endpoints/admin.py
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import select, func, or_
 from typing import List, Optional
 from datetime import datetime, timedelta
 import secrets
 import logging
 
 from ...core.database import get_db
-from ...core.security import get_current_active_user
+from ...core.query_stats import query_budget
+from ...core.security import get_current_active_snapshot
+from ...core.user_cache import UserSnapshot
 from ...core.config import settings
 from ...models.user import User, SubscriptionTier
 from ...models.watermark import Watermark
-from ...models.payment import Payment, PaymentStatus
+from ...models.payment import Payment
 from ...models.admin import AdminAction
+from ...services.stats_service import StatsService
 from ...schemas.admin import (
     UserAdminView, 
     AdminStats, 
+    DailyStatsView,
     GrantSubscriptionRequest,
     AdminActionLog,
     BulkUserUpdate
@@ -31,9 +36,9 @@ SUPER_ADMIN_EMAIL = "bidar.qadir@gmail.com"  # CHANGE THIS TO YOUR EMAIL
 
 
 def get_admin_user(
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserSnapshot = Depends(get_current_active_snapshot),
     request: Request = None
-) -> User:
+) -> UserSnapshot:
     """
     Verify user is admin with multiple security checks
     """
@@ -64,9 +69,9 @@ def get_admin_user(
     return current_user
 
 
-def log_admin_action(
-    db: Session,
-    admin: User,
+async def log_admin_action(
+    db: AsyncSession,
+    admin: UserSnapshot,
     action_type: str,
     target_user_id: Optional[int] = None,
     details: Optional[dict] = None,
@@ -82,75 +87,19 @@ def log_admin_action(
         user_agent=request.headers.get("user-agent") if request else None
     )
     db.add(action)
-    db.commit()
+    await db.commit()
 
 
 @router.get("/stats", response_model=AdminStats)
+@query_budget(2)
 async def get_admin_stats(
-    admin_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    admin_user: UserSnapshot = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get system statistics - Read only, safe operation"""
     try:
-        # User statistics
-        total_users = db.query(User).count()
-        free_users = db.query(User).filter(User.subscription_tier == SubscriptionTier.FREE).count()
-        pro_users = db.query(User).filter(User.subscription_tier == SubscriptionTier.PRO).count()
-        elite_users = db.query(User).filter(User.subscription_tier == SubscriptionTier.ELITE).count()
-        
-        # Watermark statistics
-        total_watermarks = db.query(Watermark).count()
-        
-        today = datetime.utcnow().date()
-        watermarks_today = db.query(Watermark).filter(
-            func.date(Watermark.created_at) == today
-        ).count()
-        
-        week_ago = today - timedelta(days=7)
-        watermarks_this_week = db.query(Watermark).filter(
-            Watermark.created_at >= week_ago
-        ).count()
-        
-        month_ago = today - timedelta(days=30)
-        watermarks_this_month = db.query(Watermark).filter(
-            Watermark.created_at >= month_ago
-        ).count()
-        
-        # Revenue statistics (completed payments only)
-        total_revenue = db.query(func.sum(Payment.amount)).filter(
-            Payment.payment_status == PaymentStatus.COMPLETED
-        ).scalar() or 0
-        
-        revenue_this_month = db.query(func.sum(Payment.amount)).filter(
-            and_(
-                Payment.payment_status == PaymentStatus.COMPLETED,
-                Payment.completed_at >= month_ago
-            )
-        ).scalar() or 0
-        
-        # Active users
-        active_users_today = db.query(func.count(func.distinct(Watermark.user_id))).filter(
-            func.date(Watermark.created_at) == today
-        ).scalar() or 0
-        
-        active_users_this_week = db.query(func.count(func.distinct(Watermark.user_id))).filter(
-            Watermark.created_at >= week_ago
-        ).scalar() or 0
-        
-        return AdminStats(
-            total_users=total_users,
-            free_users=free_users,
-            pro_users=pro_users,
-            elite_users=elite_users,
-            total_watermarks=total_watermarks,
-            watermarks_today=watermarks_today,
-            watermarks_this_week=watermarks_this_week,
-            watermarks_this_month=watermarks_this_month,
-            total_revenue=float(total_revenue),
-            revenue_this_month=float(revenue_this_month),
-            active_users_today=active_users_today,
-            active_users_this_week=active_users_this_week
-        )
+        # One query against the daily rollup, cached for a few seconds
+        return AdminStats(**await StatsService().summary(db))
     except Exception as e:
         logger.error(f"Error fetching admin stats: {e}")
         raise HTTPException(
@@ -159,23 +108,61 @@ async def get_admin_stats(
         )
 
 
+@router.get("/stats/daily", response_model=List[DailyStatsView])
+@query_budget(2)
+async def get_daily_stats(
+    days: int = Query(30, ge=1, le=365),
+    admin_user: UserSnapshot = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Per-day watermarks, active users and revenue for charts"""
+    try:
+        return [DailyStatsView(**day) for day in await StatsService().daily(db, days)]
+    except Exception as e:
+        logger.error(f"Error fetching daily stats: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch statistics"
+        )
+
+
+def _with_counts(query):
+    """Add each user's watermark and payment counts as correlated subqueries;
+    they run only for the returned rows (watermarks via the user_id index)"""
+    watermarks_count = (
+        select(func.count(Watermark.id)).where(Watermark.user_id == User.id).scalar_subquery()
+    )
+    payments_count = (
+        select(func.count(Payment.id)).where(Payment.user_id == User.id).scalar_subquery()
+    )
+    return query.add_columns(watermarks_count, payments_count)
+
+
+def _user_admin_view(user: User, watermarks_count: int, payments_count: int) -> UserAdminView:
+    view = UserAdminView.model_validate(user)
+    view.watermarks_count = watermarks_count
+    view.payments_count = payments_count
+    return view
+
+
 @router.get("/users", response_model=List[UserAdminView])
+@query_budget(2)
 async def list_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),  # Max 100 to prevent DOS
     search: Optional[str] = Query(None, max_length=100),
     subscription_tier: Optional[str] = Query(None),
-    admin_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    admin_user: UserSnapshot = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """List users with pagination and filtering"""
     try:
-        query = db.query(User)
+        query = select(User)
         
         # Apply search filter
         if search:
             search_term = f"%{search.strip()}%"
-            query = query.filter(
+            query = query.where(
                 or_(
                     User.email.ilike(search_term),
                     User.username.ilike(search_term)
@@ -185,24 +172,14 @@ async def list_users(
         # Apply subscription filter
         if subscription_tier:
             if subscription_tier in ["free", "pro", "elite"]:
-                query = query.filter(User.subscription_tier == subscription_tier)
-        
-        # Get users with counts
-        users = query.offset(skip).limit(limit).all()
+                query = query.where(User.subscription_tier == subscription_tier)
         
-        # Add watermark and payment counts
-        result = []
-        for user in users:
-            user_dict = UserAdminView.model_validate(user).model_dump()
-            user_dict["watermarks_count"] = db.query(Watermark).filter(
-                Watermark.user_id == user.id
-            ).count()
-            user_dict["payments_count"] = db.query(Payment).filter(
-                Payment.user_id == user.id
-            ).count()
-            result.append(UserAdminView(**user_dict))
+        # Users with their counts in one statement
+        rows = (await db.execute(
+            _with_counts(query).order_by(User.id).offset(skip).limit(limit)
+        )).all()
         
-        return result
+        return [_user_admin_view(*row) for row in rows]
     except Exception as e:
         logger.error(f"Error listing users: {e}")
         raise HTTPException(
@@ -214,9 +191,9 @@ async def list_users(
 @router.post("/grant-subscription")
 async def grant_subscription(
     request: GrantSubscriptionRequest,
-    admin_user: User = Depends(get_admin_user),
+    admin_user: UserSnapshot = Depends(get_admin_user),
     req: Request = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Grant free subscription to user - High security operation
@@ -233,7 +210,7 @@ async def grant_subscription(
         )
     
     # Validate target user exists
-    target_user = db.query(User).filter(User.email == request.email).first()
+    target_user = await db.scalar(select(User).where(User.email == request.email))
     if not target_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -256,7 +233,7 @@ async def grant_subscription(
         target_user.subscription_end_date = datetime.utcnow() + timedelta(days=request.duration_days)
         
         # Log the action with full details
-        log_admin_action(
+        await log_admin_action(
             db=db,
             admin=admin_user,
             action_type="grant_subscription",
@@ -273,7 +250,7 @@ async def grant_subscription(
             request=req
         )
         
-        db.commit()
+        await db.commit()
         
         # Log success
         logger.info(
@@ -293,7 +270,7 @@ async def grant_subscription(
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error granting subscription: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -302,38 +279,31 @@ async def grant_subscription(
 
 
 @router.get("/users/{user_id}", response_model=UserAdminView)
+@query_budget(2)
 async def get_user_details(
     user_id: int,
-    admin_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    admin_user: UserSnapshot = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get detailed user information"""
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    row = (await db.execute(_with_counts(select(User)).where(User.id == user_id))).first()
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    # Add counts
-    user_data = UserAdminView.model_validate(user).model_dump()
-    user_data["watermarks_count"] = db.query(Watermark).filter(
-        Watermark.user_id == user.id
-    ).count()
-    user_data["payments_count"] = db.query(Payment).filter(
-        Payment.user_id == user.id
-    ).count()
-    
-    return UserAdminView(**user_data)
+    return _user_admin_view(*row)
 
 
 @router.get("/logs", response_model=List[AdminActionLog])
+@query_budget(2)
 async def get_admin_logs(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     action_type: Optional[str] = None,
-    admin_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    admin_user: UserSnapshot = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get admin action logs for auditing"""
     # Only super admin can view logs
@@ -343,12 +313,17 @@ async def get_admin_logs(
             detail="Only super admin can view logs"
         )
     
-    query = db.query(AdminAction)
+    # Both users are joined in, so a page is a single query
+    query = select(AdminAction).options(
+        joinedload(AdminAction.admin), joinedload(AdminAction.target_user)
+    )
     
     if action_type:
-        query = query.filter(AdminAction.action_type == action_type)
+        query = query.where(AdminAction.action_type == action_type)
     
-    logs = query.order_by(AdminAction.created_at.desc()).offset(skip).limit(limit).all()
+    logs = (await db.scalars(
+        query.order_by(AdminAction.created_at.desc()).offset(skip).limit(limit)
+    )).all()
     
     # Format logs with user emails
     result = []
@@ -373,9 +348,9 @@ async def get_admin_logs(
 async def revoke_subscription(
     user_id: int,
     reason: str = Query(..., max_length=500),
-    admin_user: User = Depends(get_admin_user),
+    admin_user: UserSnapshot = Depends(get_admin_user),
     req: Request = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Revoke user subscription - Super admin only"""
     if admin_user.email != SUPER_ADMIN_EMAIL:
@@ -384,7 +359,7 @@ async def revoke_subscription(
             detail="Only super admin can revoke subscriptions"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -401,7 +376,7 @@ async def revoke_subscription(
     user.stripe_subscription_id = None
     
     # Log action
-    log_admin_action(
+    await log_admin_action(
         db=db,
         admin=admin_user,
         action_type="revoke_subscription",
@@ -415,7 +390,7 @@ async def revoke_subscription(
         request=req
     )
     
-    db.commit()
+    await db.commit()
     
     return {
         "success": True,
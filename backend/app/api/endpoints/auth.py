@@ -2,11 +2,12 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
 from ...core.database import get_db
-from ...core.security import verify_password, get_password_hash, create_access_token
+from ...core.security import verify_and_update_password, get_password_hash, create_access_token
 from ...core.config import settings
 from ...models.user import User
 from ...schemas.user import UserCreate, UserResponse, Token
@@ -16,21 +17,21 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register new user"""
     # Check if email exists
-    if db.query(User).filter(User.email == user_data.email).first():
+    if await db.scalar(select(User.id).where(User.email == user_data.email)):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # Check if username exists
-    if db.query(User).filter(User.username == user_data.username).first():
+    if await db.scalar(select(User.id).where(User.username == user_data.username)):
         raise HTTPException(status_code=400, detail="Username already taken")
 
     # Create user
     user = User(
         email=user_data.email,
         username=user_data.username,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash(user_data.password),
     )
 
     # Create Stripe customer if API key is configured
@@ -45,26 +46,34 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
             # Continue without Stripe customer ID
 
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
 
     return UserResponse.model_validate(user)
 
 
 @router.post("/login", response_model=Token)
 async def login(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
 ):
     """Login with email and password"""
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await db.scalar(select(User).where(User.email == form_data.username))
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = (
+        await verify_and_update_password(form_data.password, user.hashed_password)
+        if user else (False, None)
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Hash made with an older BCRYPT_ROUNDS: store the re-hashed password
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
@@ -93,7 +102,7 @@ async def google_login():
 
 
 @router.get("/google/callback")
-async def google_callback(code: str, db: Session = Depends(get_db)):
+async def google_callback(code: str, db: AsyncSession = Depends(get_db)):
     """Handle Google OAuth callback"""
     if not settings.GOOGLE_CLIENT_SECRET or settings.GOOGLE_CLIENT_SECRET == "dummy-client-secret":
         raise HTTPException(
@@ -145,10 +154,10 @@ async def google_callback(code: str, db: Session = Depends(get_db)):
         )
 
     # Find or create user
-    user = db.query(User).filter(User.google_id == user_info["id"]).first()
+    user = await db.scalar(select(User).where(User.google_id == user_info["id"]))
 
     if not user:
-        user = db.query(User).filter(User.email == user_info["email"]).first()
+        user = await db.scalar(select(User).where(User.email == user_info["email"]))
 
         if not user:
             # Create new user
@@ -175,8 +184,7 @@ async def google_callback(code: str, db: Session = Depends(get_db)):
             user.google_id = user_info["id"]
             user.is_verified = True
 
-        db.commit()
-        db.refresh(user)
+        await db.commit()
 
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -0,0 +1,50 @@
+# File: backend/app/api/endpoints/jobs.py
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.database import get_db
+from ...core.security import get_current_active_snapshot
+from ...core.user_cache import UserSnapshot
+from ...models.watermark import Watermark
+from ...schemas.job import JobStatusResponse
+from ...services.job_queue import SUCCEEDED, get_job_queue
+from .watermarks import to_watermark_response
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(
+    job_id: str,
+    current_user: UserSnapshot = Depends(get_current_active_snapshot),
+    db: AsyncSession = Depends(get_db),
+):
+    """Poll a background watermark job; includes the watermark once done"""
+    record = await get_job_queue().get(job_id)
+    if not record or record["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    response = JobStatusResponse(
+        id=record["id"],
+        status=record["status"],
+        attempts=record["attempts"],
+        error=record["error"],
+        created_at=datetime.utcfromtimestamp(record["created_at"]),
+        updated_at=datetime.utcfromtimestamp(record["updated_at"]),
+    )
+
+    if record["status"] == SUCCEEDED and record["result"]:
+        response.watermark_id = record["result"]["watermark_id"]
+        watermark = await db.scalar(
+            select(Watermark).where(
+                Watermark.id == response.watermark_id, Watermark.user_id == current_user.id
+            )
+        )
+        if watermark:
+            response.watermark = to_watermark_response(watermark)
+
+    return response
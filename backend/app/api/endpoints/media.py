@@ -0,0 +1,51 @@
+# File: backend/app/api/endpoints/media.py
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import FileResponse
+
+from ...core.config import settings
+from ...core.security import verify_media_signature
+from ...services.storage_service import (
+    CONTENT_KEY_PATTERN, get_storage, LocalStorageBackend, StorageError,
+)
+
+router = APIRouter()
+
+
+def media_file_response(key: str, download_name: str = None) -> Response:
+    """Serve a locally stored object, handing the transfer to nginx when enabled"""
+    storage = get_storage()
+    if not isinstance(storage, LocalStorageBackend):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    headers = {}
+    # Content-addressed files never change; signed links keep them private
+    if CONTENT_KEY_PATTERN.match(key):
+        headers["Cache-Control"] = "private, max-age=31536000, immutable"
+    if download_name:
+        headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+
+    if settings.MEDIA_DELIVERY == "accel":
+        # nginx streams the file with sendfile from its internal location
+        headers["X-Accel-Redirect"] = f"{settings.ACCEL_REDIRECT_PREFIX}{key}"
+        return Response(status_code=200, headers=headers)
+
+    try:
+        path = storage.path_for(key)
+    except StorageError:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="File not found")
+    return FileResponse(path, headers=headers)
+
+
+@router.get("/{key:path}")
+async def get_signed_media(
+    key: str,
+    md5: str = Query(...),
+    expires: int = Query(...),
+):
+    """Serve a signed media URL when nginx secure_link is not in front"""
+    if not verify_media_signature(f"/media/{key}", md5, expires):
+        raise HTTPException(status_code=403, detail="Invalid or expired link")
+    return media_file_response(key)
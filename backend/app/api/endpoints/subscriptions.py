@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Header, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 import json
 from typing import Dict
 
 from ...core.database import get_db
-from ...core.security import get_current_active_user
+from ...core.security import get_current_active_user, get_current_active_snapshot
+from ...core.user_cache import UserSnapshot
 from ...core.config import settings
 from ...models.user import User, SubscriptionTier
 from ...models.payment import Payment, PaymentStatus, PaymentMethod
@@ -25,7 +26,7 @@ router = APIRouter()
 async def create_stripe_checkout(
     data: SubscriptionCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create Stripe checkout session"""
     if not current_user.stripe_customer_id:
@@ -34,7 +35,7 @@ async def create_stripe_checkout(
         current_user.stripe_customer_id = await stripe_service.create_customer(
             current_user.email, current_user.username
         )
-        db.commit()
+        await db.commit()
 
     # Get price ID based on plan
     price_map = {"pro": settings.STRIPE_PRICE_PRO, "elite": settings.STRIPE_PRICE_ELITE}
@@ -61,7 +62,7 @@ async def create_stripe_checkout(
         subscription_months=1,
     )
     db.add(payment)
-    db.commit()
+    await db.commit()
 
     return PaymentSessionResponse(session_id=session["session_id"], url=session["url"])
 
@@ -70,7 +71,7 @@ async def create_stripe_checkout(
 async def create_crypto_payment(
     data: CryptoPaymentCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create OxaPay crypto payment"""
     oxapay_service = OxaPayService()
@@ -86,7 +87,7 @@ async def create_crypto_payment(
         subscription_months=1,
     )
     db.add(payment)
-    db.commit()
+    await db.commit()
 
     # Create OxaPay payment
     payment_data = await oxapay_service.create_payment(
@@ -99,7 +100,7 @@ async def create_crypto_payment(
 
     # Update payment with provider ID
     payment.provider_payment_id = payment_data["payment_id"]
-    db.commit()
+    await db.commit()
 
     return {
         "payment_id": payment_data["payment_id"],
@@ -109,7 +110,7 @@ async def create_crypto_payment(
 
 @router.post("/cancel")
 async def cancel_subscription(
-    current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)
 ):
     """Cancel subscription"""
     if not current_user.stripe_subscription_id:
@@ -131,7 +132,7 @@ async def cancel_subscription(
 
 @router.get("/current", response_model=SubscriptionResponse)
 async def get_current_subscription(
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserSnapshot = Depends(get_current_active_snapshot),
 ):
     """Get current subscription details"""
     return SubscriptionResponse(
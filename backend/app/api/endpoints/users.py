@@ -1,22 +1,31 @@
 # File: backend/app/api/endpoints/users.py
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
 from datetime import datetime, timedelta
 from typing import Dict
+import itertools
+from collections import Counter
 
 from ...core.database import get_db
-from ...core.security import get_current_active_user, verify_password, get_password_hash
+from ...core.query_stats import query_budget
+from ...core.security import (
+    get_current_active_user, get_current_active_snapshot, verify_password, get_password_hash,
+)
+from ...core.user_cache import UserSnapshot
 from ...models.user import User
 from ...models.watermark import Watermark
 from ...schemas.user import UserResponse, UserUpdate, PasswordChange, UserStats
+from ...services.stats_service import StatsService
+from ...services.storage_service import ContentAddressedStore
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(current_user: User = Depends(get_current_active_user)):
+@query_budget(1)
+async def get_current_user(current_user: UserSnapshot = Depends(get_current_active_snapshot)):
     """Get current user information"""
     return UserResponse.model_validate(current_user)
 
@@ -25,12 +34,12 @@ async def get_current_user(current_user: User = Depends(get_current_active_user)
 async def update_user(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update user profile"""
     # Check if username is taken
     if user_update.username and user_update.username != current_user.username:
-        if db.query(User).filter(User.username == user_update.username).first():
+        if await db.scalar(select(User.id).where(User.username == user_update.username)):
             raise HTTPException(status_code=400, detail="Username already taken")
 
     # Update fields
@@ -40,12 +49,11 @@ async def update_user(
     # Only allow email update for non-OAuth users
     if user_update.email and not current_user.google_id:
         if user_update.email != current_user.email:
-            if db.query(User).filter(User.email == user_update.email).first():
+            if await db.scalar(select(User.id).where(User.email == user_update.email)):
                 raise HTTPException(status_code=400, detail="Email already registered")
             current_user.email = user_update.email
 
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
 
     return UserResponse.model_validate(current_user)
 
@@ -54,7 +62,7 @@ async def update_user(
 async def change_password(
     password_data: PasswordChange,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Change user password"""
     # Check if user has password (not OAuth)
@@ -64,45 +72,41 @@ async def change_password(
         )
 
     # Verify current password
-    if not verify_password(
+    if not await verify_password(
         password_data.current_password, current_user.hashed_password
     ):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
 
     # Update password
-    current_user.hashed_password = get_password_hash(password_data.new_password)
-    db.commit()
+    current_user.hashed_password = await get_password_hash(password_data.new_password)
+    await db.commit()
 
     return {"message": "Password updated successfully"}
 
 
 @router.get("/stats", response_model=UserStats)
 async def get_user_stats(
-    current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)
 ):
     """Get user statistics"""
     # Total watermarks
-    total_watermarks = (
-        db.query(func.count(Watermark.id))
-        .filter(Watermark.user_id == current_user.id)
-        .scalar()
+    total_watermarks = await db.scalar(
+        select(func.count(Watermark.id)).where(Watermark.user_id == current_user.id)
     )
 
     # Today's watermarks
     today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_watermarks = (
-        db.query(func.count(Watermark.id))
-        .filter(
+    today_watermarks = await db.scalar(
+        select(func.count(Watermark.id)).where(
             Watermark.user_id == current_user.id, Watermark.created_at >= today_start
         )
-        .scalar()
     )
 
     # Reset daily usage if needed
     if current_user.last_usage_reset.date() < datetime.utcnow().date():
         current_user.daily_usage = 0
         current_user.last_usage_reset = datetime.utcnow()
-        db.commit()
+        await db.commit()
 
     # Calculate remaining today for free tier
     remaining_today = None
@@ -119,11 +123,27 @@ async def get_user_stats(
 
 @router.delete("/me")
 async def delete_account(
-    current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)
 ):
     """Delete user account and all associated data"""
+    # Drop the stored files' references; shared content stays until its
+    # last reference goes
+    store = ContentAddressedStore()
+    rows = (await db.execute(
+        select(Watermark.original_image_url, Watermark.watermarked_image_url, Watermark.created_at)
+        .where(Watermark.user_id == current_user.id)
+    )).all()
+    for url in itertools.chain.from_iterable((original, watermarked) for original, watermarked, _ in rows):
+        await store.release(db, url)
+
+    # Take the watermarks out of the daily rollup, as a single delete does
+    per_day = Counter(created_at.date() for _, _, created_at in rows if created_at)
+    for day, count in per_day.items():
+        await StatsService().record_watermarks(db, current_user.id, -count, day=day)
+
     # This will cascade delete all user's watermarks and payments
-    db.delete(current_user)
-    db.commit()
+    # (the cascade loads the related rows inside the awaited delete)
+    await db.delete(current_user)
+    await store.commit(db)
 
     return {"message": "Account deleted successfully"}
\ No newline at end of file
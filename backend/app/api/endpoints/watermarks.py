@@ -1,65 +1,129 @@
 # File: backend/app/api/endpoints/watermarks.py
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import RedirectResponse, FileResponse, JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, raiseload
+from typing import Any, BinaryIO, List, Optional, Dict, Tuple
+import asyncio
+import copy
+import json
 import uuid
-import os
-from datetime import datetime, timedelta
-from pathlib import Path
+from datetime import date, datetime, timedelta
 
 from ...core.database import get_db
-from ...core.security import get_current_active_user
+from ...core.query_stats import query_budget
+from ...core.security import get_current_active_user, get_current_active_snapshot
+from ...core.user_cache import UserSnapshot
 from ...core.config import settings
+from ...core.metrics import metrics
 from ...models.user import User, SubscriptionTier
+from ...models.storage import StoredObject
 from ...models.watermark import Watermark
-from ...schemas.watermark import WatermarkCreate, WatermarkResponse
+from ...schemas.watermark import (
+    WatermarkCreate,
+    WatermarkResponse,
+    WatermarkSummary,
+    WatermarkPage,
+    WatermarkSettings,
+    WatermarkRerenderRequest,
+    PreviewRenderRequest,
+    PreviewSessionResponse,
+)
+from ...schemas.job import JobSubmitResponse
 from ...services.watermark_service import WatermarkService
-from ...utils.validators import validate_image_file, sanitize_watermark_text
+from ...services.preview_service import PreviewService
+from ...services.batch_service import BatchService
+from ...services.job_queue import QUEUED, get_job_queue
+from ...services.job_events import JobProgress
+from ...services.storage_service import (
+    ContentAddressedStore,
+    LocalStorageBackend,
+    IMMUTABLE_CACHE_CONTROL,
+    get_storage,
+)
+from ...services.derivative_service import DerivativeService
+from ...services.render_pool import set_render_context
+from ...services.admission import get_admission_controller
+from ...services.analysis_store import get_analysis_store
+from ...services.stats_service import StatsService
+from ...services.usage_service import UsageService
+from .media import media_file_response
+from ...utils.validators import validate_image_file, validate_image_probe, sanitize_watermark_text
+from ...utils.uploads import SpooledUpload, spool_upload
+from ...utils.image_processor import ImageProbe
+from ...utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
+_SIZE_BUCKETS = (1024, 4 * 1024, 16 * 1024, 64 * 1024, 256 * 1024, 1024 ** 2, 4 * 1024 ** 2)
+watermark_response_bytes = metrics.histogram(
+    "watermark_response_bytes", "Serialized watermark list/detail responses", buckets=_SIZE_BUCKETS
+)
+watermark_loaded_bytes = metrics.histogram(
+    "watermark_loaded_bytes", "Estimated column bytes read from the database per response",
+    buckets=_SIZE_BUCKETS,
+)
 
-def secure_filename(filename: str) -> str:
-    """Generate a secure filename"""
-    # Get file extension
-    ext = filename.split('.')[-1] if '.' in filename else 'png'
-    # Only allow alphanumeric extensions
-    ext = ''.join(c for c in ext if c.isalnum()).lower()
-    # Limit extension length
-    ext = ext[:10]
-    # Validate against allowed extensions
-    allowed_exts = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
-    if ext not in allowed_exts:
-        ext = 'png'
-    return ext
 
+def _thumbnail_fields(watermarked_image_url: str) -> Dict[str, Any]:
+    thumbnails = DerivativeService().urls_for(watermarked_image_url)
+    if not thumbnails:
+        return {}
+    return {
+        "thumbnails": thumbnails,
+        "srcset": ", ".join(f"{url} {width}w" for width, url in thumbnails.items()),
+    }
 
-@router.post("/create", response_model=WatermarkResponse)
-async def create_watermark(
-    watermark_text: str = Form(...),
-    image: UploadFile = File(...),
-    # Position parameters
-    text_position: str = Form("bottom-right"),
-    # Size and opacity
-    text_size: str = Form("medium"),
-    text_opacity: float = Form(0.7),
-    auto_opacity: bool = Form(False),
-    # Multiple watermarks
-    multiple_watermarks: bool = Form(False),
-    watermark_pattern: str = Form("diagonal"),
-    # Font and styling
-    font_family: Optional[str] = Form(None),
-    text_color: str = Form("#FFFFFF"),
-    text_shadow: bool = Form(False),
-    # Protection mode
-    protection_mode: str = Form("standard"),
-    # User dependency
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
-):
-    """Create a new watermarked image with enhanced AI protection"""
-    
+
+def _media_url(image_url: str) -> Optional[str]:
+    """Signed, expiring link to a stored image"""
+    storage = get_storage()
+    key = storage.key_from_url(image_url)
+    return storage.signed_url(key, settings.MEDIA_URL_TTL_SECONDS) if key else None
+
+
+def _derived_fields(watermark: Watermark, wanted) -> Dict[str, Any]:
+    """Response fields computed from the stored URLs (only the ones wanted,
+    so list queries need not load the other URL column)"""
+    derived: Dict[str, Any] = {}
+    if "original_media_url" in wanted:
+        derived["original_media_url"] = _media_url(watermark.original_image_url)
+    if "watermarked_media_url" in wanted:
+        derived["watermarked_media_url"] = _media_url(watermark.watermarked_image_url)
+    if "thumbnails" in wanted or "srcset" in wanted:
+        derived.update(_thumbnail_fields(watermark.watermarked_image_url))
+    return derived
+
+
+def to_watermark_response(watermark: Watermark) -> WatermarkResponse:
+    """Serialize a watermark with signed image links and srcset-ready
+    thumbnail URLs"""
+    response = WatermarkResponse.model_validate(watermark)
+    for name, value in _derived_fields(watermark, DERIVED_FIELDS).items():
+        setattr(response, name, value)
+    return response
+
+
+VALID_POSITIONS = [
+    "top-left", "top-center", "top-right",
+    "left-center", "center", "right-center",
+    "bottom-left", "bottom-center", "bottom-right",
+    "auto"  # AI-selected position
+]
+VALID_SIZES = ["small", "medium", "large"]
+VALID_PATTERNS = ["diagonal", "grid", "random"]
+VALID_PROTECTION_MODES = ["standard", "contextual", "multilayer"]
+
+
+def _validate_watermark_request(
+    watermark_text: str, options: WatermarkSettings, current_user: User
+) -> str:
+    """Validate text and render options for the user's tier; returns the
+    sanitized text"""
     # Validate and sanitize watermark text
     watermark_text = sanitize_watermark_text(watermark_text)
     if not watermark_text:
@@ -69,238 +133,958 @@ async def create_watermark(
         raise HTTPException(status_code=400, detail="Watermark text must be 100 characters or less")
     
     # Validate position
-    valid_positions = [
-        "top-left", "top-center", "top-right",
-        "left-center", "center", "right-center",
-        "bottom-left", "bottom-center", "bottom-right",
-        "auto"  # AI-selected position
-    ]
-    if text_position not in valid_positions:
-        raise HTTPException(status_code=400, detail=f"Invalid position. Must be one of: {valid_positions}")
+    if options.text_position not in VALID_POSITIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid position. Must be one of: {VALID_POSITIONS}")
     
     # Validate size
-    valid_sizes = ["small", "medium", "large"]
-    if text_size not in valid_sizes:
-        raise HTTPException(status_code=400, detail=f"Invalid size. Must be one of: {valid_sizes}")
+    if options.text_size not in VALID_SIZES:
+        raise HTTPException(status_code=400, detail=f"Invalid size. Must be one of: {VALID_SIZES}")
     
     # Validate opacity
-    if not auto_opacity and not 0.1 <= text_opacity <= 1.0:
+    if not options.auto_opacity and not 0.1 <= options.text_opacity <= 1.0:
         raise HTTPException(status_code=400, detail="Opacity must be between 0.1 and 1.0")
     
     # Validate pattern
-    valid_patterns = ["diagonal", "grid", "random"]
-    if multiple_watermarks and watermark_pattern not in valid_patterns:
-        raise HTTPException(status_code=400, detail=f"Invalid pattern. Must be one of: {valid_patterns}")
+    if options.multiple_watermarks and options.watermark_pattern not in VALID_PATTERNS:
+        raise HTTPException(status_code=400, detail=f"Invalid pattern. Must be one of: {VALID_PATTERNS}")
     
     # Validate protection mode
-    valid_protection_modes = ["standard", "contextual", "multilayer"]
-    if protection_mode not in valid_protection_modes:
-        raise HTTPException(status_code=400, detail=f"Invalid protection mode. Must be one of: {valid_protection_modes}")
+    if options.protection_mode not in VALID_PROTECTION_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid protection mode. Must be one of: {VALID_PROTECTION_MODES}")
     
     # Check if advanced features require higher tier
-    if protection_mode == "multilayer" and current_user.subscription_tier == SubscriptionTier.FREE:
+    if options.protection_mode == "multilayer" and current_user.subscription_tier == SubscriptionTier.FREE:
         raise HTTPException(
             status_code=403,
             detail="Multilayer protection is available for Pro and Elite users only"
         )
     
-    if text_position == "auto" and current_user.subscription_tier == SubscriptionTier.FREE:
+    if options.text_position == "auto" and current_user.subscription_tier == SubscriptionTier.FREE:
         raise HTTPException(
             status_code=403,
             detail="AI-powered auto positioning is available for Pro and Elite users only"
         )
     
     # Validate color format
-    if not text_color.startswith("#") or len(text_color) != 7:
+    if not options.text_color.startswith("#") or len(options.text_color) != 7:
         raise HTTPException(status_code=400, detail="Color must be in hex format (e.g., #FFFFFF)")
     
     # Additional hex color validation
     try:
-        int(text_color[1:], 16)
+        int(options.text_color[1:], 16)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid hex color format")
 
-    # Check usage limits for free tier
-    if current_user.subscription_tier == SubscriptionTier.FREE:
-        # Reset daily usage if needed
-        if current_user.last_usage_reset.date() < datetime.utcnow().date():
-            current_user.daily_usage = 0
-            current_user.last_usage_reset = datetime.utcnow()
+    return watermark_text
+
+
+def _render_options(options: WatermarkSettings, user_tier: str) -> Dict:
+    """Service kwargs with tier-gated styling applied"""
+    return dict(
+        text_position=options.text_position,
+        text_size=options.text_size,
+        text_opacity=options.text_opacity,
+        auto_opacity=options.auto_opacity,
+        multiple_watermarks=options.multiple_watermarks,
+        watermark_pattern=options.watermark_pattern,
+        font_family=options.font_family if user_tier in ["pro", "elite"] else None,
+        text_color=options.text_color if user_tier in ["pro", "elite"] else "#FFFFFF",
+        text_shadow=options.text_shadow and user_tier == "elite",
+        protection_mode=options.protection_mode,
+    )
+
+
+def _placement_data(options: WatermarkSettings) -> Dict:
+    """Requested settings as stored in Watermark.placement_data"""
+    return {
+        "position": options.text_position,
+        "size": options.text_size,
+        "opacity": options.text_opacity,
+        "auto_opacity": options.auto_opacity,
+        "multiple": options.multiple_watermarks,
+        "pattern": options.watermark_pattern if options.multiple_watermarks else None,
+        "color": options.text_color,
+        "font": options.font_family,
+        "shadow": options.text_shadow,
+        "protection_mode": options.protection_mode
+    }
+
+
+def _settings_from_placement(placement_data: Optional[Dict]) -> WatermarkSettings:
+    """Inverse of _placement_data; missing keys fall back to the defaults"""
+    data = placement_data or {}
+    defaults = WatermarkSettings()
+    return WatermarkSettings(
+        text_position=data.get("position") or defaults.text_position,
+        text_size=data.get("size") or defaults.text_size,
+        text_opacity=data.get("opacity", defaults.text_opacity),
+        auto_opacity=data.get("auto_opacity", defaults.auto_opacity),
+        multiple_watermarks=data.get("multiple", defaults.multiple_watermarks),
+        watermark_pattern=data.get("pattern") or defaults.watermark_pattern,
+        font_family=data.get("font"),
+        text_color=data.get("color") or defaults.text_color,
+        text_shadow=data.get("shadow", defaults.text_shadow),
+        protection_mode=data.get("protection_mode") or defaults.protection_mode,
+    )
+
 
-        if current_user.daily_usage >= settings.FREE_DAILY_LIMIT:
+async def _reserve_usage(db: AsyncSession, current_user: User, count: int) -> date:
+    """Charge `count` uses up front (limited on the free tier); returns the
+    day to refund against if the work fails"""
+    limit = settings.FREE_DAILY_LIMIT if current_user.subscription_tier == SubscriptionTier.FREE else None
+    usage = UsageService()
+    day = await usage.reserve(db, current_user.id, count, limit)
+    if day is None:
+        remaining = max(0, limit - await usage.used_today(db, current_user.id))
+        if remaining == 0:
             raise HTTPException(
                 status_code=403,
                 detail=f"Daily limit of {settings.FREE_DAILY_LIMIT} watermarks reached. Upgrade to Pro for unlimited watermarks.",
             )
+        raise HTTPException(
+            status_code=403,
+            detail=f"Only {remaining} watermarks left today. Upgrade to Pro for unlimited watermarks.",
+        )
+    return day
 
-    # Validate file
-    validate_image_file(image)
 
-    # Read image
-    image_bytes = await image.read()
+def _set_degradation_header(http_response: Response, ai_analysis: Dict) -> None:
+    """Expose the load-degradation level the render ran at"""
+    level = (ai_analysis.get("degradation") or {}).get("level", 0)
+    http_response.headers["X-Degradation-Level"] = str(level)
 
-    # Process watermark with enhanced features
-    watermark_service = WatermarkService()
-    start_time = datetime.utcnow()
 
+async def _store_watermarks(
+    db: AsyncSession,
+    current_user: User,
+    original: BinaryIO,
+    original_sha256: str,
+    original_size: int,
+    probe: ImageProbe,
+    watermark_text: str,
+    results: List[Tuple[memoryview, Dict, WatermarkSettings]],
+    processing_time: int,
+    variant_group: Optional[str] = None,
+) -> List[Watermark]:
+    """Store the original and each (output, analysis, settings) result and
+    insert one row per result (usage was reserved by the caller)"""
+    # Content-addressed storage: identical originals/outputs are stored once;
+    # the original is written once and referenced by every row
+    store = ContentAddressedStore()
+    original_ext = "jpg" if probe.format == "jpeg" else probe.format
     try:
-        watermarked_bytes, ai_analysis = (
-            await watermark_service.apply_intelligent_watermark(
-                image_bytes, 
-                watermark_text, 
-                current_user.subscription_tier.value,
-                text_position=text_position,
-                text_size=text_size,
-                text_opacity=text_opacity,
-                auto_opacity=auto_opacity,
-                multiple_watermarks=multiple_watermarks,
-                watermark_pattern=watermark_pattern,
-                font_family=font_family if current_user.subscription_tier.value in ["pro", "elite"] else None,
-                text_color=text_color if current_user.subscription_tier.value in ["pro", "elite"] else "#FFFFFF",
-                text_shadow=text_shadow and current_user.subscription_tier.value == "elite",
-                protection_mode=protection_mode
-            )
+        original_url, *watermarked_urls = await asyncio.gather(
+            store.put(
+                db, original, original_ext, f"image/{probe.format}",
+                sha256=original_sha256, size=original_size, refs=len(results),
+            ),
+            *[store.put(db, output, "png", "image/png") for output, _, _ in results],
         )
+        # Identical analyses (variants of one upload, the default analysis)
+        # are stored once
+        analyses = get_analysis_store()
+        analysis_columns = [await analyses.columns(db, ai_analysis) for _, ai_analysis, _ in results]
     except Exception as e:
-        print(f"Watermark processing error: {e}")
-        raise HTTPException(status_code=500, detail="Error processing watermark")
+        print(f"Error saving files: {e}")
+        await store.rollback(db)
+        raise HTTPException(status_code=500, detail="Error saving watermarked image")
 
-    processing_time = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+    # Save to database
+    watermarks = [
+        Watermark(
+            user_id=current_user.id,
+            original_image_url=original_url,
+            watermarked_image_url=watermarked_url,
+            watermark_text=watermark_text,
+            placement_data=_placement_data(options),
+            image_width=probe.width,
+            image_height=probe.height,
+            file_size=output.nbytes,
+            processing_time=processing_time,
+            variant_group=variant_group,
+            **columns,
+        )
+        for (output, _, options), watermarked_url, columns in zip(
+            results, watermarked_urls, analysis_columns
+        )
+    ]
+    db.add_all(watermarks)
 
-    # Generate secure filenames
-    file_id = str(uuid.uuid4())
-    original_ext = secure_filename(image.filename)
-    
-    # Create safe paths
-    upload_dir = Path(settings.UPLOAD_DIR).resolve()
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    original_filename = f"{file_id}_original.{original_ext}"
-    watermarked_filename = f"{file_id}_watermarked.png"
-    
-    original_path = upload_dir / original_filename
-    watermarked_path = upload_dir / watermarked_filename
-    
-    # Verify paths are within upload directory
-    if not str(original_path).startswith(str(upload_dir)) or not str(watermarked_path).startswith(str(upload_dir)):
-        raise HTTPException(status_code=400, detail="Invalid file path")
+    await StatsService().record_watermarks(db, current_user.id, len(watermarks))
+
+    try:
+        await store.commit(db)
+    except Exception as e:
+        print(f"Error saving watermarks: {e}")
+        await store.rollback(db)
+        raise HTTPException(status_code=500, detail="Error saving watermarked image")
+    # One reload for all rows (with their shared analyses) instead of a
+    # refresh per row
+    await db.execute(
+        select(Watermark)
+        .where(Watermark.id.in_([w.id for w in watermarks]))
+        .execution_options(populate_existing=True)
+    )
+    return watermarks
+
+
+def _parse_variants(
+    variants: Optional[str], base: WatermarkSettings, watermark_text: str, current_user: User
+) -> List[WatermarkSettings]:
+    """JSON list of setting overrides -> validated settings per variant"""
+    if not variants:
+        return [base]
 
-    # Save images
     try:
-        # Save original
-        with open(original_path, "wb") as f:
-            f.write(image_bytes)
+        overrides = json.loads(variants)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Variants must be a JSON list")
+    if not isinstance(overrides, list) or not overrides or not all(isinstance(o, dict) for o in overrides):
+        raise HTTPException(status_code=400, detail="Variants must be a non-empty list of objects")
+    if len(overrides) > settings.MAX_VARIANTS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.MAX_VARIANTS} variants per image")
+
+    result = []
+    for override in overrides:
+        try:
+            options = WatermarkSettings.model_validate({**base.model_dump(), **override})
+        except ValidationError:
+            raise HTTPException(status_code=400, detail="Invalid variant settings")
+        _validate_watermark_request(watermark_text, options, current_user)
+        result.append(options)
+    return result
+
 
-        # Save watermarked
-        with open(watermarked_path, "wb") as f:
-            f.write(watermarked_bytes)
+async def _submit_watermark_job(
+    db: AsyncSession,
+    current_user: User,
+    upload: SpooledUpload,
+    probe: ImageProbe,
+    watermark_text: str,
+    options: WatermarkSettings,
+) -> JSONResponse:
+    """Store the original and queue the render for a worker.
+
+    The use is reserved here, so queued jobs count toward the daily limit;
+    the worker hands it back if the job is dead-lettered.
+    """
+    usage_day = await _reserve_usage(db, current_user, 1)
+    store = ContentAddressedStore()
+    original_ext = "jpg" if probe.format == "jpeg" else probe.format
+    try:
+        # The job holds this reference until its Watermark row takes it over
+        original_url = await store.put(
+            db, upload.rewind(), original_ext, f"image/{probe.format}",
+            sha256=upload.sha256, size=upload.size,
+        )
+        await store.commit(db)
     except Exception as e:
         print(f"Error saving files: {e}")
-        raise HTTPException(status_code=500, detail="Error saving watermarked image")
+        await store.rollback(db)
+        await UsageService().refund(db, current_user.id, 1, usage_day)
+        raise HTTPException(status_code=500, detail="Error saving image")
 
-    # Save to database
-    watermark = Watermark(
-        user_id=current_user.id,
-        original_image_url=f"/static/watermarks/{original_filename}",
-        watermarked_image_url=f"/static/watermarks/{watermarked_filename}",
-        watermark_text=watermark_text,
-        ai_analysis=ai_analysis,
-        placement_data={
-            "position": text_position,
-            "size": text_size,
-            "opacity": text_opacity,
-            "auto_opacity": auto_opacity,
-            "multiple": multiple_watermarks,
-            "pattern": watermark_pattern if multiple_watermarks else None,
-            "color": text_color,
-            "font": font_family,
-            "shadow": text_shadow,
-            "protection_mode": protection_mode
+    user_tier = current_user.subscription_tier.value
+    payload = {
+        "user_id": current_user.id,
+        "user_tier": user_tier,
+        "original_url": original_url,
+        "watermark_text": watermark_text,
+        "options": _render_options(options, user_tier),
+        "placement_data": _placement_data(options),
+        "image_width": probe.width,
+        "image_height": probe.height,
+        "usage_day": usage_day.isoformat(),
+    }
+    try:
+        job_id = await get_job_queue().enqueue(payload, current_user.id)
+    except Exception as e:
+        print(f"Error queueing job: {e}")
+        await store.release(db, original_url)
+        await store.commit(db)
+        await UsageService().refund(db, current_user.id, 1, usage_day)
+        raise HTTPException(status_code=503, detail="Job queue unavailable, please retry")
+
+    await JobProgress(current_user.id, job_id)("queued", status="queued")
+    upload.record(extra_bytes=upload.size)
+    response = JobSubmitResponse(job_id=job_id, status=QUEUED, status_url=f"/api/jobs/{job_id}")
+    return JSONResponse(status_code=202, content=response.model_dump())
+
+
+@router.post("/create", response_model=WatermarkResponse)
+async def create_watermark(
+    http_response: Response,
+    watermark_text: str = Form(...),
+    image: UploadFile = File(...),
+    # Position parameters
+    text_position: str = Form("bottom-right"),
+    # Size and opacity
+    text_size: str = Form("medium"),
+    text_opacity: float = Form(0.7),
+    auto_opacity: bool = Form(False),
+    # Multiple watermarks
+    multiple_watermarks: bool = Form(False),
+    watermark_pattern: str = Form("diagonal"),
+    # Font and styling
+    font_family: Optional[str] = Form(None),
+    text_color: str = Form("#FFFFFF"),
+    text_shadow: bool = Form(False),
+    # Protection mode
+    protection_mode: str = Form("standard"),
+    # Optional JSON list of setting overrides, one Watermark row per entry
+    variants: Optional[str] = Form(None),
+    # Queue the render and return a job id (202) instead of waiting
+    async_job: bool = Form(False),
+    # User dependency
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Create a new watermarked image with enhanced AI protection.
+
+    With `variants`, every entry is rendered from the same decode and
+    analysis and the rows are linked by a shared variant_group. With
+    `async_job`, the original is stored and a background job is queued;
+    poll /api/jobs/{job_id} for the result.
+    """
+    options = WatermarkSettings(
+        text_position=text_position,
+        text_size=text_size,
+        text_opacity=text_opacity,
+        auto_opacity=auto_opacity,
+        multiple_watermarks=multiple_watermarks,
+        watermark_pattern=watermark_pattern,
+        font_family=font_family,
+        text_color=text_color,
+        text_shadow=text_shadow,
+        protection_mode=protection_mode,
+    )
+    watermark_text = _validate_watermark_request(watermark_text, options, current_user)
+    variant_options = _parse_variants(variants, options, watermark_text, current_user)
+    variant_group = uuid.uuid4().hex if variants else None
+    if async_job and variant_group:
+        raise HTTPException(status_code=400, detail="Variants are not supported for background jobs")
+
+    # Validate file
+    validate_image_file(image)
+
+    # Size-check and hash the upload in chunks; the decoder gets the file handle
+    upload = await spool_upload(image, settings.MAX_FILE_SIZE)
+
+    # Check real format and pixel dimensions from the header before any decode
+    probe = validate_image_probe(
+        upload.file, upload.content_type, current_user.subscription_tier.value
+    )
+
+    if async_job:
+        return await _submit_watermark_job(db, current_user, upload, probe, watermark_text, options)
+
+    # Charged before rendering so concurrent requests can't both fit in the
+    # limit; handed back if the render or the save fails
+    usage_day = await _reserve_usage(db, current_user, len(variant_options))
+    try:
+        # Process watermark with enhanced features
+        watermark_service = WatermarkService()
+        user_tier = current_user.subscription_tier.value
+        set_render_context(current_user.id, user_tier)
+        start_time = datetime.utcnow()
+
+        # Every variant renders its own full-size copy
+        pixels = probe.width * probe.height * len(variant_options)
+        async with get_admission_controller().admit(pixels):
+            try:
+                if variant_group:
+                    # One decode and one analysis for all variants
+                    outputs = await watermark_service.apply_variants(
+                        upload.file,
+                        watermark_text,
+                        user_tier,
+                        [_render_options(o, user_tier) for o in variant_options],
+                        probe=probe
+                    )
+                else:
+                    outputs = [
+                        await watermark_service.apply_intelligent_watermark(
+                            upload.file, 
+                            watermark_text, 
+                            user_tier,
+                            probe=probe,
+                            **_render_options(options, user_tier)
+                        )
+                    ]
+            except Exception as e:
+                print(f"Watermark processing error: {e}")
+                raise HTTPException(status_code=500, detail="Error processing watermark")
+        results = [
+            (output, ai_analysis, o) for (output, ai_analysis), o in zip(outputs, variant_options)
+        ]
+
+        processing_time = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+
+        watermarks = await _store_watermarks(
+            db, current_user, upload.rewind(), upload.sha256, upload.size, probe,
+            watermark_text, results, processing_time, variant_group,
+        )
+    except Exception:
+        await UsageService().refund(db, current_user.id, len(variant_options), usage_day)
+        raise
+    upload.record(extra_bytes=upload.size + sum(output.nbytes for output, _, _ in results))
+    _set_degradation_header(http_response, results[0][1])
+
+    response = to_watermark_response(watermarks[0])
+    if variant_group:
+        response.variants = [to_watermark_response(w) for w in watermarks]
+    return response
+
+
+@router.post("/batch")
+async def create_watermark_batch(
+    watermark_text: str = Form(...),
+    images: List[UploadFile] = File(...),
+    # One settings block (WatermarkSettings as JSON) for every image
+    batch_settings: str = Form("{}", alias="settings"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Watermark many images with the same settings.
+
+    Returns a ZIP streamed as images finish; manifest.json at the end lists
+    each file with its watermark id or the reason it failed.
+    """
+    try:
+        options = WatermarkSettings.model_validate_json(batch_settings)
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="Invalid settings")
+
+    watermark_text = _validate_watermark_request(watermark_text, options, current_user)
+
+    if len(images) > settings.BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files. Maximum is {settings.BATCH_MAX_FILES} per batch",
+        )
+
+    # Items wait for render capacity once streaming; refuse outright only
+    # when the server is already saturated
+    get_admission_controller().ensure_capacity()
+
+    user_tier = current_user.subscription_tier.value
+    service = BatchService()
+    items = await service.prepare(images, user_tier)
+    # Every valid item is charged up front; the batch refunds the ones
+    # that are not delivered
+    reserved = sum(1 for item in items if item.error is None)
+    try:
+        usage_day = await _reserve_usage(db, current_user, reserved)
+    except HTTPException:
+        for item in items:
+            item.close()
+        raise
+
+    # Clients can follow per-item progress on /ws/jobs with this id
+    batch_id = uuid.uuid4().hex
+    stream = service.stream_zip(
+        batch_id,
+        items,
+        current_user.id,
+        watermark_text,
+        user_tier,
+        _render_options(options, user_tier),
+        _placement_data(options),
+        usage_day,
+    )
+    return StreamingResponse(
+        stream,
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": 'attachment; filename="watermarks.zip"',
+            "X-Batch-Id": batch_id,
         },
-        file_size=len(watermarked_bytes),
-        processing_time=processing_time,
     )
 
-    db.add(watermark)
 
-    # Update usage
-    current_user.daily_usage += 1
+@router.post("/preview", response_model=PreviewSessionResponse)
+async def create_preview_session(
+    image: UploadFile = File(...),
+    watermark_text: str = Form(""),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Upload once for interactive previews: the image is decoded to a
+    downscaled proxy kept in memory for PREVIEW_SESSION_TTL seconds.
+
+    The session's AI analysis counts as one use of the daily limit; its
+    commit is then not counted again.
+    """
+    validate_image_file(image)
+    upload = await spool_upload(image, settings.MAX_FILE_SIZE)
+    probe = validate_image_probe(
+        upload.file, upload.content_type, current_user.subscription_tier.value
+    )
+
+    usage_day = await _reserve_usage(db, current_user, 1)
+    set_render_context(current_user.id, current_user.subscription_tier.value)
+    try:
+        async with get_admission_controller().admit(probe.width * probe.height):
+            try:
+                session = await PreviewService().create_session(
+                    upload, probe, current_user.id, current_user.subscription_tier.value,
+                    sanitize_watermark_text(watermark_text),
+                )
+            except Exception as e:
+                print(f"Preview session error: {e}")
+                raise HTTPException(status_code=500, detail="Error processing image")
+    except Exception:
+        await UsageService().refund(db, current_user.id, 1, usage_day)
+        raise
+
+    return PreviewSessionResponse(
+        session_id=session.id,
+        expires_in=settings.PREVIEW_SESSION_TTL,
+        image_width=probe.width,
+        image_height=probe.height,
+        proxy_width=session.proxy.width,
+        proxy_height=session.proxy.height,
+    )
+
+
+def _get_preview_session(service: PreviewService, session_id: str, current_user: User):
+    session = service.get_session(session_id, current_user.id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Preview session not found or expired")
+    return session
+
+
+@router.post("/preview/{session_id}/render")
+async def render_preview(
+    session_id: str,
+    request: PreviewRenderRequest,
+    current_user: User = Depends(get_current_active_user),
+):
+    """JPEG preview of the given settings, drawn on the session proxy"""
+    watermark_text = _validate_watermark_request(request.watermark_text, request, current_user)
+
+    service = PreviewService()
+    session = _get_preview_session(service, session_id, current_user)
+    set_render_context(current_user.id, session.user_tier)
+    try:
+        preview = await service.render_preview(
+            session, watermark_text, _render_options(request, session.user_tier)
+        )
+    except Exception as e:
+        print(f"Preview render error: {e}")
+        raise HTTPException(status_code=500, detail="Error rendering preview")
+
+    return Response(content=bytes(preview), media_type="image/jpeg", headers={"Cache-Control": "no-store"})
+
+
+@router.post("/preview/{session_id}/commit", response_model=WatermarkResponse)
+async def commit_preview(
+    session_id: str,
+    request: PreviewRenderRequest,
+    http_response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Render full resolution from the cached original and save it like
+    /create (the use was counted when the session was created); the session
+    is closed afterwards"""
+    watermark_text = _validate_watermark_request(request.watermark_text, request, current_user)
 
-    db.commit()
-    db.refresh(watermark)
+    service = PreviewService()
+    session = _get_preview_session(service, session_id, current_user)
+    set_render_context(current_user.id, session.user_tier)
 
-    return WatermarkResponse.model_validate(watermark)
+    # A double-clicked commit must not create two watermarks; the pin keeps
+    # the original open if the session is evicted mid-render
+    async with session.commit_lock:
+        if not service.get_session(session_id, current_user.id):
+            raise HTTPException(status_code=404, detail="Preview session not found or expired")
 
+        with service.pinned(session):
+            start_time = datetime.utcnow()
+            async with get_admission_controller().admit(session.probe.width * session.probe.height):
+                try:
+                    watermarked_bytes, ai_analysis = await service.render_full(
+                        session, watermark_text, _render_options(request, session.user_tier)
+                    )
+                except Exception as e:
+                    print(f"Watermark processing error: {e}")
+                    raise HTTPException(status_code=500, detail="Error processing watermark")
 
-@router.get("/my-watermarks", response_model=List[WatermarkResponse])
+            processing_time = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+
+            watermark, = await _store_watermarks(
+                db, current_user, session.original, session.sha256, session.size, session.probe,
+                watermark_text, [(watermarked_bytes, ai_analysis, request)], processing_time,
+            )
+            service.close_session(session_id)
+
+    _set_degradation_header(http_response, ai_analysis)
+    return to_watermark_response(watermark)
+
+
+# Matches ix_watermarks_user_created_id, so pages are read straight off the index
+HISTORY_ORDER = (Watermark.created_at.desc(), Watermark.id.asc())
+
+# Signed links and thumbnails/srcset are derived from the stored URLs
+DERIVED_FIELDS = {"original_media_url", "watermarked_media_url", "thumbnails", "srcset"}
+# Response fields that are not a column of the same name
+FIELD_COLUMNS = {
+    "original_media_url": ("original_image_url",),
+    "watermarked_media_url": ("watermarked_image_url",),
+    "thumbnails": ("watermarked_image_url",),
+    "srcset": ("watermarked_image_url",),
+    "ai_analysis": ("analysis_id", "render_info"),
+}
+SUMMARY_FIELDS = list(WatermarkSummary.model_fields)
+# What fields= may ask for on list endpoints (variants only exist on /create)
+SPARSE_FIELDS = [f for f in WatermarkResponse.model_fields if f != "variants"]
+
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    """fields=id,watermark_text,... -> validated field list (summary if unset)"""
+    if not fields:
+        return SUMMARY_FIELDS
+    wanted = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in wanted if f not in SPARSE_FIELDS]
+    if unknown or not wanted:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown) or fields}. Allowed: {', '.join(SPARSE_FIELDS)}",
+        )
+    return wanted
+
+
+def _history_query(user_id: int, wanted: List[str]):
+    """Newest-first history loading only the columns behind `wanted`.
+
+    Everything else is deferred with raiseload, so an accidental access to
+    e.g. ai_analysis fails loudly instead of costing a query per row.
+    """
+    columns = {"id", "created_at"}  # ordering and the cursor
+    for name in wanted:
+        columns.update(FIELD_COLUMNS.get(name, (name,)))
+    options = [load_only(*[getattr(Watermark, c) for c in columns], raiseload=True)]
+    if "ai_analysis" not in wanted:
+        options.append(raiseload(Watermark.analysis))
+    return (
+        select(Watermark)
+        .options(*options)
+        .where(Watermark.user_id == user_id)
+        .order_by(*HISTORY_ORDER)
+    )
+
+
+def _project(watermark: Watermark, wanted: List[str]) -> Dict[str, Any]:
+    item = {name: getattr(watermark, name) for name in wanted if name not in DERIVED_FIELDS}
+    if DERIVED_FIELDS.intersection(wanted):
+        derived = _derived_fields(watermark, wanted)
+        item.update({name: derived.get(name) for name in wanted if name in DERIVED_FIELDS})
+    return item
+
+
+def _loaded_bytes(items: List[Dict[str, Any]]) -> int:
+    """Rough size of the column values read (JSON-encoded, derived fields skipped)"""
+    return sum(
+        len(json.dumps(value, default=str))
+        for item in items
+        for name, value in item.items()
+        if name not in DERIVED_FIELDS
+    )
+
+
+def _measured_response(content: Any, endpoint: str, projection: str, loaded: int) -> JSONResponse:
+    response = JSONResponse(content=jsonable_encoder(content))
+    watermark_response_bytes.observe(len(response.body), endpoint=endpoint, projection=projection)
+    watermark_loaded_bytes.observe(loaded, endpoint=endpoint, projection=projection)
+    return response
+
+
+@router.get("/my-watermarks", response_model=List[WatermarkSummary])
+@query_budget(3)
 async def get_my_watermarks(
     skip: int = 0,
     limit: int = 20,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    current_user: UserSnapshot = Depends(get_current_active_snapshot),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Get user's watermarked images"""
+    """Get user's watermarked images (summaries; full analysis via GET /{id}
+    or fields=ai_analysis,...)"""
     # Validate pagination
     if skip < 0:
         skip = 0
     if limit < 1 or limit > 100:
         limit = 20
-        
-    watermarks = (
-        db.query(Watermark)
-        .filter(Watermark.user_id == current_user.id)
-        .order_by(Watermark.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    wanted = _parse_fields(fields)
+
+    watermarks = (await db.scalars(
+        _history_query(current_user.id, wanted).offset(skip).limit(limit)
+    )).all()
+
+    items = [_project(w, wanted) for w in watermarks]
+    return _measured_response(
+        items, "my-watermarks", "sparse" if fields else "summary", _loaded_bytes(items)
+    )
+
+
+@router.get("/my-watermarks/page", response_model=WatermarkPage)
+@query_budget(3)
+async def get_my_watermarks_page(
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    fields: Optional[str] = None,
+    current_user: UserSnapshot = Depends(get_current_active_snapshot),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get user's watermarked images, paginated by cursor.
+
+    Unlike skip/limit, each page seeks to the position after the previous
+    one, so deep pages cost the same as the first.
+    """
+    if limit < 1 or limit > 100:
+        limit = 20
+    wanted = _parse_fields(fields)
+
+    query = _history_query(current_user.id, wanted)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.where(
+            Watermark.created_at <= created_at,
+            or_(
+                Watermark.created_at < created_at,
+                and_(Watermark.created_at == created_at, Watermark.id > last_id),
+            ),
+        )
+
+    # One extra row tells us whether there is a next page
+    watermarks = (await db.scalars(query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(watermarks) > limit:
+        watermarks = watermarks[:limit]
+        last = watermarks[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    items = [_project(w, wanted) for w in watermarks]
+    return _measured_response(
+        {"items": items, "next_cursor": next_cursor},
+        "my-watermarks/page",
+        "sparse" if fields else "summary",
+        _loaded_bytes(items),
     )
 
-    return [WatermarkResponse.model_validate(w) for w in watermarks]
+
+@router.get("/thumbnails/{width}/{key:path}")
+async def get_thumbnail(
+    width: int, key: str, request: Request, db: AsyncSession = Depends(get_db)
+):
+    """Width-bucketed WebP derivative, rendered on first request and served
+    from the disk LRU afterwards.
+
+    Thumbnails are loaded by <img> tags, so there is no auth; like the
+    images themselves they are addressed by content hash, and only objects
+    that are actually stored can be rendered.
+    """
+    if not DerivativeService.is_content_key(key):
+        raise HTTPException(status_code=404, detail="Image not found")
+    if not await db.scalar(select(StoredObject.id).where(StoredObject.key == key)):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    bucket = DerivativeService.bucket_width(width)
+    if bucket != width:
+        return RedirectResponse(DerivativeService.url_for(key, bucket), status_code=301)
+
+    service = DerivativeService()
+    try:
+        path = await service.get_thumbnail(key, width)
+    except Exception as e:
+        print(f"Thumbnail error for {key}: {e}")
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    headers = {"ETag": f'"{path.stem}"', "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="image/webp", headers=headers)
 
 
 @router.delete("/{watermark_id}")
 async def delete_watermark(
     watermark_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_snapshot),
+    db: AsyncSession = Depends(get_db),
 ):
     """Delete a watermarked image"""
-    watermark = (
-        db.query(Watermark)
-        .filter(Watermark.id == watermark_id, Watermark.user_id == current_user.id)
-        .first()
+    watermark = await db.scalar(
+        select(Watermark).where(Watermark.id == watermark_id, Watermark.user_id == current_user.id)
     )
 
     if not watermark:
         raise HTTPException(status_code=404, detail="Watermark not found")
 
-    # Create safe paths for deletion
-    upload_dir = Path(settings.UPLOAD_DIR).resolve()
-    
-    # Delete files safely
+    # Release stored files; shared content stays until its last reference goes
+    store = ContentAddressedStore()
     for url in [watermark.original_image_url, watermark.watermarked_image_url]:
-        if url.startswith("/static/watermarks/"):
-            filename = url.replace("/static/watermarks/", "")
-            # Sanitize filename
-            filename = os.path.basename(filename)
-            file_path = upload_dir / filename
-            
-            # Verify path is within upload directory
-            if str(file_path).startswith(str(upload_dir)) and file_path.exists():
-                try:
-                    os.remove(file_path)
-                except Exception as e:
-                    print(f"Error deleting file {file_path}: {e}")
+        try:
+            await store.release(db, url)
+        except Exception as e:
+            print(f"Error deleting file {url}: {e}")
 
-    db.delete(watermark)
-    db.commit()
+    await db.delete(watermark)
+    if watermark.created_at:
+        await StatsService().record_watermarks(
+            db, current_user.id, -1, day=watermark.created_at.date()
+        )
+    # Files go only once the row is gone for good
+    await store.commit(db)
 
     return {"message": "Watermark deleted successfully"}
 
 
+@router.post("/{watermark_id}/rerender", response_model=WatermarkResponse)
+async def rerender_watermark(
+    watermark_id: int,
+    request: WatermarkRerenderRequest,
+    http_response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Re-render an existing watermark with changed settings.
+
+    Reuses the stored original (decoded once and cached) and the stored AI
+    analysis; the output is replaced and placement_data.version bumped.
+    Counts as one use of the daily limit.
+    """
+    watermark = await db.scalar(
+        select(Watermark).where(Watermark.id == watermark_id, Watermark.user_id == current_user.id)
+    )
+
+    if not watermark:
+        raise HTTPException(status_code=404, detail="Watermark not found")
+
+    changes = request.model_dump(exclude_unset=True)
+    watermark_text = changes.pop("watermark_text", None) or watermark.watermark_text
+    options = _settings_from_placement(watermark.placement_data).model_copy(update=changes)
+    watermark_text = _validate_watermark_request(watermark_text, options, current_user)
+
+    original_key = get_storage().key_from_url(watermark.original_image_url)
+    if not original_key:
+        raise HTTPException(status_code=404, detail="Original image not found")
+
+    # A re-render is a full render: it counts like a create
+    usage_day = await _reserve_usage(db, current_user, 1)
+    try:
+        user_tier = current_user.subscription_tier.value
+        set_render_context(current_user.id, user_tier)
+        pixels = (watermark.image_width or 0) * (watermark.image_height or 0)
+        async with get_admission_controller().admit(pixels):
+            try:
+                watermarked_bytes, ai_analysis = await WatermarkService().rerender(
+                    original_key,
+                    watermark_text,
+                    user_tier,
+                    copy.deepcopy(watermark.ai_analysis or {}),
+                    **_render_options(options, user_tier)
+                )
+            except Exception as e:
+                print(f"Watermark re-render error: {e}")
+                raise HTTPException(status_code=500, detail="Error processing watermark")
+
+        # Take the new reference before dropping the old one, so an unchanged
+        # output is never deleted in between
+        store = ContentAddressedStore()
+        old_url = watermark.watermarked_image_url
+        try:
+            watermarked_url = await store.put(db, watermarked_bytes, "png", "image/png")
+            await store.release(db, old_url)
+        except Exception as e:
+            print(f"Error saving files: {e}")
+            await store.rollback(db)
+            raise HTTPException(status_code=500, detail="Error saving watermarked image")
+
+        version = (watermark.placement_data or {}).get("version", 1) + 1
+        try:
+            watermark.watermarked_image_url = watermarked_url
+            watermark.watermark_text = watermark_text
+            for name, value in (await get_analysis_store().columns(db, ai_analysis)).items():
+                setattr(watermark, name, value)
+            watermark.placement_data = {**_placement_data(options), "version": version}
+            watermark.file_size = watermarked_bytes.nbytes
+            watermark.processing_time = ai_analysis["processing_time"]
+
+            await store.commit(db)
+        except Exception as e:
+            print(f"Error saving watermark: {e}")
+            await store.rollback(db)
+            raise HTTPException(status_code=500, detail="Error saving watermarked image")
+        await db.refresh(watermark)
+    except Exception:
+        await UsageService().refund(db, current_user.id, 1, usage_day)
+        raise
+
+    _set_degradation_header(http_response, ai_analysis)
+    return to_watermark_response(watermark)
+
+
+async def _get_owned_image_key(
+    db: AsyncSession, watermark_id: int, user_id: int, variant: str
+) -> str:
+    """Cheap ownership check: fetch only the requested URL column"""
+    columns = {
+        "original": Watermark.original_image_url,
+        "watermarked": Watermark.watermarked_image_url,
+    }
+    if variant not in columns:
+        raise HTTPException(status_code=400, detail="Variant must be 'original' or 'watermarked'")
+
+    url = await db.scalar(
+        select(columns[variant]).where(Watermark.id == watermark_id, Watermark.user_id == user_id)
+    )
+    if not url:
+        raise HTTPException(status_code=404, detail="Watermark not found")
+
+    key = get_storage().key_from_url(url)
+    if not key:
+        raise HTTPException(status_code=404, detail="File not found")
+    return key
+
+
+@router.get("/{watermark_id}/file/{variant}")
+async def download_watermark_file(
+    watermark_id: int,
+    variant: str,
+    download: bool = False,
+    current_user: UserSnapshot = Depends(get_current_active_snapshot),
+    db: AsyncSession = Depends(get_db),
+):
+    """Authorize a download; the bytes are sent by nginx (X-Accel-Redirect)
+    or the object store, not by this worker"""
+    key = await _get_owned_image_key(db, watermark_id, current_user.id, variant)
+
+    storage = get_storage()
+    if not isinstance(storage, LocalStorageBackend):
+        return RedirectResponse(storage.signed_url(key, settings.MEDIA_URL_TTL_SECONDS))
+
+    ext = key.rsplit(".", 1)[-1]
+    download_name = f"watermark-{watermark_id}-{variant}.{ext}" if download else None
+    return media_file_response(key, download_name)
+
+
+@router.get("/{watermark_id}/signed-url")
+async def get_watermark_signed_url(
+    watermark_id: int,
+    variant: str = "watermarked",
+    current_user: UserSnapshot = Depends(get_current_active_snapshot),
+    db: AsyncSession = Depends(get_db),
+):
+    """Expiring URL (nginx secure_link compatible) for sharing or <img> tags"""
+    key = await _get_owned_image_key(db, watermark_id, current_user.id, variant)
+    ttl = settings.MEDIA_URL_TTL_SECONDS
+    return {"url": get_storage().signed_url(key, ttl), "expires_in": ttl}
+
+
 @router.get("/fonts", response_model=List[Dict[str, str]])
 async def get_available_fonts(
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserSnapshot = Depends(get_current_active_snapshot),
 ):
     """Get list of available fonts based on user tier"""
     
@@ -334,4 +1118,24 @@ async def get_available_fonts(
             "available": "true" if current_user.subscription_tier.value == "elite" else "false"
         })
     
-    return available_fonts
\ No newline at end of file
+    return available_fonts
+
+
+# Registered last so that the static GET routes above (/fonts, ...) win
+@router.get("/{watermark_id}", response_model=WatermarkResponse)
+@query_budget(3)
+async def get_watermark(
+    watermark_id: int,
+    current_user: UserSnapshot = Depends(get_current_active_snapshot),
+    db: AsyncSession = Depends(get_db),
+):
+    """Full watermark including the AI analysis and placement data"""
+    watermark = await db.scalar(
+        select(Watermark).where(Watermark.id == watermark_id, Watermark.user_id == current_user.id)
+    )
+    if not watermark:
+        raise HTTPException(status_code=404, detail="Watermark not found")
+
+    response = to_watermark_response(watermark)
+    loaded = _loaded_bytes([response.model_dump(include=set(SPARSE_FIELDS))])
+    return _measured_response(response, "detail", "full", loaded)
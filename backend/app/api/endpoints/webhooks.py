@@ -1,7 +1,8 @@
 # File: backend/app/api/endpoints/webhooks.py
 
 from fastapi import APIRouter, Request, HTTPException, Header, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 import hmac
 import hashlib
@@ -12,6 +13,7 @@ from ...models.user import User, SubscriptionTier
 from ...models.payment import Payment, PaymentStatus
 from ...services.stripe_service import StripeService
 from ...services.oxapay_service import OxaPayService
+from ...services.stats_service import StatsService
 
 router = APIRouter()
 
@@ -20,7 +22,7 @@ router = APIRouter()
 async def stripe_webhook(
     request: Request,
     stripe_signature: str = Header(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Handle Stripe webhooks"""
     payload = await request.body()
@@ -33,18 +35,14 @@ async def stripe_webhook(
 
         if event["type"] == "subscription_created":
             # Find user and update subscription
-            user = (
-                db.query(User)
-                .filter(User.stripe_customer_id == event["customer_id"])
-                .first()
+            user = await db.scalar(
+                select(User).where(User.stripe_customer_id == event["customer_id"])
             )
 
             if user:
                 # Determine tier from subscription
-                payment = (
-                    db.query(Payment)
-                    .filter(Payment.provider_session_id == event.get("session_id"))
-                    .first()
+                payment = await db.scalar(
+                    select(Payment).where(Payment.provider_session_id == event.get("session_id"))
                 )
 
                 if payment:
@@ -52,23 +50,24 @@ async def stripe_webhook(
                     user.subscription_end_date = datetime.utcnow() + timedelta(days=30)
                     user.stripe_subscription_id = event["subscription_id"]
 
+                    # Redelivered webhooks must not count the revenue twice
+                    if payment.payment_status != PaymentStatus.COMPLETED:
+                        await StatsService().record_payment(db, payment.amount)
                     payment.payment_status = PaymentStatus.COMPLETED
                     payment.completed_at = datetime.utcnow()
 
-                    db.commit()
+                    await db.commit()
 
         elif event["type"] == "subscription_cancelled":
             # Find user and downgrade to free
-            user = (
-                db.query(User)
-                .filter(User.stripe_customer_id == event["customer_id"])
-                .first()
+            user = await db.scalar(
+                select(User).where(User.stripe_customer_id == event["customer_id"])
             )
 
             if user:
                 user.subscription_tier = SubscriptionTier.FREE
                 user.stripe_subscription_id = None
-                db.commit()
+                await db.commit()
 
         return {"received": True}
 
@@ -77,7 +76,7 @@ async def stripe_webhook(
 
 
 @router.post("/oxapay")
-async def oxapay_webhook(request: Request, db: Session = Depends(get_db)):
+async def oxapay_webhook(request: Request, db: AsyncSession = Depends(get_db)):
     """Handle OxaPay webhooks"""
     payload = await request.json()
     signature = request.headers.get("X-OxaPay-Signature")
@@ -96,33 +95,31 @@ async def oxapay_webhook(request: Request, db: Session = Depends(get_db)):
 
         if event["type"] == "payment_completed":
             # Find payment record
-            payment = (
-                db.query(Payment).filter(Payment.id == int(event["order_id"])).first()
-            )
+            payment = await db.get(Payment, int(event["order_id"]))
 
             if payment:
+                if payment.payment_status != PaymentStatus.COMPLETED:
+                    await StatsService().record_payment(db, payment.amount)
                 payment.payment_status = PaymentStatus.COMPLETED
                 payment.completed_at = datetime.utcnow()
                 payment.provider_payment_id = event["payment_id"]
 
                 # Update user subscription
-                user = db.query(User).filter(User.id == payment.user_id).first()
+                user = await db.get(User, payment.user_id)
                 if user:
                     user.subscription_tier = SubscriptionTier(payment.subscription_tier)
                     user.subscription_end_date = datetime.utcnow() + timedelta(days=30)
 
-                db.commit()
+                await db.commit()
 
         elif event["type"] == "payment_failed":
-            payment = (
-                db.query(Payment)
-                .filter(Payment.provider_payment_id == event["payment_id"])
-                .first()
+            payment = await db.scalar(
+                select(Payment).where(Payment.provider_payment_id == event["payment_id"])
             )
 
             if payment:
                 payment.payment_status = PaymentStatus.FAILED
-                db.commit()
+                await db.commit()
 
         return {"received": True}
 
@@ -0,0 +1,61 @@
+# File: backend/app/api/endpoints/ws.py
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Query, WebSocket, status
+
+from ...core.database import AsyncSessionLocal
+from ...core.metrics import metrics
+from ...core.security import get_user_from_token
+from ...services.job_events import get_event_broker
+
+router = APIRouter()
+
+ws_connections = metrics.gauge("ws_job_connections", "Open job progress WebSockets")
+
+
+@router.websocket("/jobs")
+async def job_events(
+    websocket: WebSocket,
+    token: str = Query(...),
+    job_id: Optional[str] = Query(None),
+):
+    """Push progress events for the user's background and batch jobs.
+
+    Connect with ?token=<access token>; ?job_id= limits the stream to one
+    job. Each message is a JSON event: job_id, stage (queued, processing,
+    analyzed, decoded, rendered, encoded, stored, succeeded, failed),
+    stage_ms and elapsed_ms.
+    """
+    async with AsyncSessionLocal() as db:
+        user = await get_user_from_token(token, db)
+        user_id = user.id if user and user.is_active else None
+
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    ws_connections.inc()
+
+    async def forward():
+        async for event in get_event_broker().subscribe(user_id):
+            if job_id is None or event.get("job_id") == job_id:
+                await websocket.send_json(event)
+
+    async def wait_for_disconnect():
+        # Clients don't send anything; this only notices the close
+        while True:
+            await websocket.receive_text()
+
+    sender = asyncio.create_task(forward())
+    receiver = asyncio.create_task(wait_for_disconnect())
+    try:
+        # Either the client went away or sending failed
+        await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (sender, receiver):
+            task.cancel()
+        await asyncio.gather(sender, receiver, return_exceptions=True)
+        ws_connections.dec()
@@ -0,0 +1,82 @@
+# File: backend/app/core/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds.
+
+    `on_evict(key, value)` is called for entries dropped by expiry, capacity
+    or explicit removal (e.g. to close file handles).
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        on_evict: Optional[Callable[[Hashable, V], Any]] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def _drop(self, key: Hashable) -> None:
+        _, value = self._data.pop(key)
+        if self.on_evict:
+            self.on_evict(key, value)
+
+    def _expire(self, now: float) -> None:
+        for key in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+            self._drop(key)
+
+    def get(self, key: Hashable, touch: bool = False) -> Optional[V]:
+        """Return a live entry; `touch` also extends its TTL"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                self._drop(key)
+                return None
+            self._data.move_to_end(key)
+            if touch:
+                self._data[key] = (now + self.ttl, value)
+            return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (now + (ttl if ttl is not None else self.ttl), value)
+            self._expire(now)
+            while len(self._data) > self.maxsize:
+                self._drop(next(iter(self._data)))
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            if key not in self._data:
+                return None
+            value = self._data[key][1]
+            self._drop(key)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._data):
+                self._drop(key)
@@ -1,7 +1,7 @@
 # backend/app/core/config.py
 
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 import json
 import os
 
@@ -15,9 +15,23 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "default-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Password hashing: bcrypt cost (existing hashes are upgraded on login),
+    # threads doing it and how many calls may wait before we answer 503
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
 
     # Database
     DATABASE_URL: str = ""
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800  # seconds; below typical server/proxy idle cutoffs
+    DB_POOL_PRE_PING: bool = True
+    # Query profiling: statements slower than this are logged; per-request
+    # counts/timings are metrics (and response headers with DEBUG)
+    DB_SLOW_QUERY_SECONDS: float = 0.2
+    DB_PROFILE_SLOWEST: int = 3
 
     # CORS
     CORS_ORIGINS: List[str] = []
@@ -43,14 +57,99 @@ class Settings(BaseSettings):
     OXAPAY_WEBHOOK_SECRET: str = "dummy-webhook-secret"
 
     # Storage
+    STORAGE_BACKEND: str = "local"  # local or s3
     UPLOAD_DIR: str = "static/watermarks"
+    S3_BUCKET: str = ""
+    S3_ENDPOINT_URL: str = ""  # e.g. http://minio:9000 for MinIO
+    S3_REGION: str = ""
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_PUBLIC_URL: str = ""  # public base URL of the bucket, if different
+
+    # Media delivery
+    MEDIA_DELIVERY: str = "python"  # python (FileResponse) or accel (nginx X-Accel-Redirect)
+    ACCEL_REDIRECT_PREFIX: str = "/protected/"
+    MEDIA_SIGNING_SECRET: str = ""  # required; nginx.conf.template gets the same value
+    MEDIA_URL_TTL_SECONDS: int = 3600
+
+    # Thumbnails / responsive derivatives
+    DERIVATIVE_WIDTHS: List[int] = [160, 320, 640, 1024]
+    DERIVATIVE_CACHE_DIR: str = "cache/derivatives"
+    DERIVATIVE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    DERIVATIVE_WEBP_QUALITY: int = 80
     MAX_FILE_SIZE: int = 10 * 1024 * 1024
+    UPLOAD_FORM_OVERHEAD: int = 64 * 1024  # multipart boundaries + form fields
 
     # Subscription Limits
     FREE_DAILY_LIMIT: int = 2
     FREE_MAX_RESOLUTION: int = 720
     PRO_MAX_RESOLUTION: int = 1080
     ELITE_MAX_RESOLUTION: int = 2160
+    # Decoded pixel budgets (checked from the header before decoding)
+    FREE_MAX_PIXELS: int = 25_000_000
+    PRO_MAX_PIXELS: int = 50_000_000
+    ELITE_MAX_PIXELS: int = 100_000_000
+    MAX_IMAGE_FRAMES: int = 100
+
+    # Rendering
+    RENDER_WORKERS: int = 4  # threads for decode/render/encode
+    PREVIEW_PROXY_SIZE: int = 1024  # longest side of the preview proxy
+    PREVIEW_SESSION_TTL: int = 15 * 60
+    PREVIEW_MAX_SESSIONS: int = 64
+    PREVIEW_MAX_SESSIONS_PER_USER: int = 3  # a new session closes the user's oldest
+    PREVIEW_JPEG_QUALITY: int = 80
+    DECODE_CACHE_SIZE: int = 8  # decoded originals kept for re-renders
+    DECODE_CACHE_TTL: int = 10 * 60
+    MAX_VARIANTS: int = 8  # settings combinations per /create
+    # Render scheduling: pool share per tier under contention, slots one user
+    # may hold, and seconds after which a waiting step jumps the weights
+    RENDER_TIER_WEIGHTS: Dict[str, float] = {"elite": 6, "pro": 3, "free": 1}
+    RENDER_USER_MAX_CONCURRENCY: int = 2
+    RENDER_MAX_QUEUE_WAIT: float = 10.0
+    # Admission control: renders in flight and their estimated decode memory
+    # (pixels x bytes per pixel); beyond that requests get 503 + Retry-After
+    ADMISSION_MAX_INFLIGHT: int = 16
+    ADMISSION_MEMORY_BUDGET: int = 1536 * 1024 * 1024
+    ADMISSION_BYTES_PER_PIXEL: int = 12  # RGBA image + overlay + composite
+    ADMISSION_MAX_RETRY_AFTER: int = 30
+    # Load-aware degradation: reaching the n-th queue depth or p95 latency
+    # (seconds, analysis to encoded output) selects level n, see
+    # services/degradation.py for what each level skips
+    DEGRADATION_ENABLED: bool = True
+    DEGRADATION_QUEUE_DEPTHS: List[int] = [8, 16, 24, 32]
+    DEGRADATION_P95_SECONDS: List[float] = [5.0, 10.0, 15.0, 20.0]
+    DEGRADATION_HOLD_SECONDS: float = 30.0
+    # p95 covers only renders finished this recently; none -> no latency signal
+    DEGRADATION_P95_WINDOW_SECONDS: float = 60.0
+    DEGRADATION_MAX_PATTERN_MARKS: int = 4
+
+    # Batch uploads
+    BATCH_MAX_FILES: int = 100
+    BATCH_MAX_BODY_SIZE: int = 500 * 1024 * 1024
+    BATCH_CONCURRENCY: int = 4  # images in flight per batch request
+
+    # Background jobs (in-memory queue with an in-process worker if unset)
+    REDIS_URL: str = ""
+    JOB_QUEUE_NAME: str = "watermark"
+    JOB_VISIBILITY_TIMEOUT: int = 300
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RESULT_TTL: int = 24 * 60 * 60
+    JOB_WORKER_CONCURRENCY: int = 2
+    JOB_POLL_TIMEOUT: int = 5
+    JOB_REAP_INTERVAL: int = 30
+
+    # Authenticated-user snapshots (in Redis when REDIS_URL is set)
+    USER_CACHE_TTL: int = 30
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_REDIS: bool = True
+
+    # Prometheus /metrics: scrapers from these addresses, or with the token
+    # as a bearer credential; everyone else gets 403
+    METRICS_ALLOWED_IPS: List[str] = ["127.0.0.1", "::1"]
+    METRICS_TOKEN: str = ""
+
+    # Admin dashboard (served from the daily_stats rollup)
+    ADMIN_STATS_CACHE_TTL: int = 30
 
     # URLs
     FRONTEND_URL: str = ""
@@ -91,6 +190,12 @@ class Settings(BaseSettings):
         if not self.GOOGLE_REDIRECT_URI:
             self.GOOGLE_REDIRECT_URI = f"{self.API_URL}/api/auth/google/callback"
         
+        # Shared with nginx, so it must not double as the JWT key
+        if not self.MEDIA_SIGNING_SECRET:
+            raise ValueError("MEDIA_SIGNING_SECRET must be set")
+        if self.MEDIA_SIGNING_SECRET == self.SECRET_KEY:
+            raise ValueError("MEDIA_SIGNING_SECRET must differ from SECRET_KEY")
+        
         # Ensure DATABASE_URL is set
         if not self.DATABASE_URL:
             self.DATABASE_URL = os.getenv("DATABASE_URL", "")
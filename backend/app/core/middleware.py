@@ -0,0 +1,143 @@
+# File: backend/app/core/middleware.py
+
+import json
+from typing import Dict, Optional, Tuple
+
+from .query_stats import capture_queries, finish_request
+
+
+class UploadSizeLimitMiddleware:
+    """Reject oversized request bodies while they stream in.
+
+    Requests announcing a larger Content-Length are refused before any body
+    is read; chunked bodies are counted and cut off as soon as they cross
+    the limit, so an oversized upload is never fully spooled. `overrides`
+    maps more specific path prefixes (e.g. the batch endpoint) to their own
+    limits.
+    """
+
+    def __init__(
+        self,
+        app,
+        max_body_size: int,
+        path_prefixes: Tuple[str, ...],
+        overrides: Optional[Dict[str, int]] = None,
+    ):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_prefixes = path_prefixes
+        # Longest prefix wins
+        self.overrides = sorted((overrides or {}).items(), key=lambda item: -len(item[0]))
+
+    def _limit_for(self, path: str) -> int:
+        for prefix, limit in self.overrides:
+            if path.startswith(prefix):
+                return limit
+        return self.max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("POST", "PUT")
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        max_body_size = self._limit_for(scope["path"])
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None:
+            try:
+                if int(content_length) > max_body_size:
+                    await self._reject(send, max_body_size)
+                    return
+            except ValueError:
+                pass
+
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_size and not rejected:
+                    rejected = True
+                    await self._reject(send, max_body_size)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            if not rejected:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # The app sees a disconnect once we have answered with 413
+            if not rejected:
+                raise
+
+    async def _reject(self, send, max_body_size: int):
+        body = json.dumps({
+            "detail": f"Request body too large. Maximum size is {max_body_size // (1024 * 1024)}MB"
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class QueryStatsMiddleware:
+    """Count SQL statements and time spent in the database per request.
+
+    Totals go to per-endpoint metrics and are checked against the
+    endpoint's `query_budget`. With `expose_headers` (DEBUG) responses also
+    carry X-DB-Query-Count, X-DB-Time-Ms, X-DB-Query-Budget and a
+    Server-Timing entry, so tests and the browser dev tools can see them.
+    Statements that run after the response has started (streamed bodies)
+    are in the metrics but not in the headers.
+    """
+
+    def __init__(self, app, expose_headers: bool = False):
+        self.app = app
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with capture_queries() as stats:
+            async def send_with_stats(message):
+                if message["type"] == "http.response.start" and self.expose_headers:
+                    headers = [*message.get("headers", []), *self._headers(scope, stats)]
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                # The router has put the matched endpoint into the scope
+                finish_request(scope.get("endpoint"), stats)
+
+    def _headers(self, scope, stats):
+        ms = stats.seconds * 1000
+        headers = [
+            (b"x-db-query-count", str(stats.count).encode()),
+            (b"x-db-time-ms", f"{ms:.1f}".encode()),
+            (b"server-timing", f'db;dur={ms:.1f};desc="{stats.count} queries"'.encode()),
+        ]
+        budget = getattr(scope.get("endpoint"), "query_budget", None)
+        if budget is not None:
+            headers.append((b"x-db-query-budget", str(budget).encode()))
+        return headers
@@ -0,0 +1,119 @@
+# File: backend/app/core/query_stats.py
+
+import contextlib
+import heapq
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+db_queries = metrics.histogram(
+    "db_queries_per_request", "SQL statements per request, by endpoint",
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100),
+)
+db_seconds = metrics.histogram("db_seconds_per_request", "Time spent in SQL per request, by endpoint")
+db_slow_queries = metrics.counter(
+    "db_slow_queries_total", "Statements slower than DB_SLOW_QUERY_SECONDS"
+)
+db_budget_exceeded = metrics.counter(
+    "db_query_budget_exceeded_total", "Requests that ran more statements than their endpoint's budget"
+)
+
+
+@dataclass
+class QueryStats:
+    """Statements run while this collector is current (see capture_queries)"""
+
+    count: int = 0
+    seconds: float = 0.0
+    keep: int = 3
+    parent: Optional["QueryStats"] = None
+    _slowest: List[Tuple[float, str]] = field(default_factory=list)  # min-heap
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        entry = (seconds, statement)
+        if len(self._slowest) < self.keep:
+            heapq.heappush(self._slowest, entry)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+        # A test capturing around a request also sees the request's statements
+        if self.parent is not None:
+            self.parent.record(statement, seconds)
+
+    @property
+    def slowest(self) -> List[Tuple[float, str]]:
+        """(seconds, statement), slowest first"""
+        return sorted(self._slowest, reverse=True)
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextlib.contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Collect the statements run in this context, e.g. in tests:
+
+        with capture_queries() as stats:
+            await list_users(...)
+        assert stats.count <= list_users.query_budget
+    """
+    stats = QueryStats(keep=settings.DB_PROFILE_SLOWEST, parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Declare how many statements a request to this endpoint may run,
+    including its dependencies (checked by QueryStatsMiddleware)"""
+    def mark(endpoint: Callable) -> Callable:
+        endpoint.query_budget = max_queries
+        return endpoint
+    return mark
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    if elapsed >= settings.DB_SLOW_QUERY_SECONDS:
+        db_slow_queries.inc()
+        logger.warning(f"Slow query ({elapsed * 1000:.0f} ms): {statement[:500]}")
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def instrument(engine: Engine) -> None:
+    """Time every statement on this engine (for the async engine, pass
+    its sync_engine)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def finish_request(endpoint: Optional[Callable], stats: QueryStats) -> None:
+    """Publish a request's totals and check its endpoint's budget"""
+    name = getattr(endpoint, "__name__", "unmatched")
+    db_queries.observe(stats.count, endpoint=name)
+    db_seconds.observe(stats.seconds, endpoint=name)
+
+    budget = getattr(endpoint, "query_budget", None)
+    if budget is not None and stats.count > budget:
+        db_budget_exceeded.inc(endpoint=name)
+        slowest = "; ".join(f"{s * 1000:.1f} ms {q[:200]}" for s, q in stats.slowest)
+        logger.warning(f"{name} ran {stats.count} queries (budget {budget}); slowest: {slowest}")
@@ -1,25 +1,120 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+import asyncio
+import base64
+import hashlib
+import hmac
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.config import settings
 from ..core.database import get_db
+from ..core.metrics import metrics
+from ..core.user_cache import UserSnapshot, get_user_cache
 from ..models.user import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# min = max = default rounds: hashes made with any other cost are reported by
+# verify_and_update and re-hashed at login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+password_hash_seconds = metrics.histogram(
+    "password_hash_seconds", "bcrypt work per call, by operation"
+)
+password_hash_wait_seconds = metrics.histogram(
+    "password_hash_wait_seconds", "Time a bcrypt call queued for a thread"
+)
+password_hash_pending = metrics.gauge("password_hash_pending", "bcrypt calls queued or running")
+password_hash_rejected = metrics.counter(
+    "password_hash_rejected_total", "bcrypt calls refused because the queue was full"
+)
+
+# bcrypt is ~250ms of CPU per call (the C extension releases the GIL); a
+# small dedicated pool keeps a login storm from stalling the event loop and
+# from starving the render pool
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_pending = 0
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+        )
+    return _hash_executor
+
+
+async def _run_hashing(op: str, fn: Callable[..., T], *args) -> T:
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        password_hash_rejected.inc(op=op)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    queued_at = time.perf_counter()
+
+    def timed() -> T:
+        started = time.perf_counter()
+        password_hash_wait_seconds.observe(started - queued_at, op=op)
+        try:
+            return fn(*args)
+        finally:
+            password_hash_seconds.observe(time.perf_counter() - started, op=op)
+
+    _hash_pending += 1
+    password_hash_pending.set(_hash_pending)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_hash_executor(), timed)
+    finally:
+        _hash_pending -= 1
+        password_hash_pending.set(_hash_pending)
+
+
+async def verify_password(plain_password: str, hashed_password: Optional[str]) -> bool:
+    valid, _ = await verify_and_update_password(plain_password, hashed_password)
+    return valid
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: Optional[str]
+) -> Tuple[bool, Optional[str]]:
+    """(valid, new_hash); new_hash is set when the stored hash uses an
+    outdated scheme or cost and should replace it"""
+    if not hashed_password:
+        # OAuth accounts have no password
+        return False, None
+    return await _run_hashing(
+        "verify", pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def get_password_hash(password: str) -> str:
+    return await _run_hashing("hash", pwd_context.hash, password)
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+def shutdown_hash_pool() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -35,27 +130,66 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def _media_signature(path: str, expires: int) -> str:
+    """nginx secure_link_md5 "$secure_link_expires$uri <secret>" digest"""
+    raw = f"{expires}{path} {settings.MEDIA_SIGNING_SECRET}".encode()
+    return base64.urlsafe_b64encode(hashlib.md5(raw).digest()).decode().rstrip("=")
+
+
+def sign_media_path(path: str, ttl_seconds: Optional[int] = None) -> Tuple[str, int]:
+    """Return a secure_link compatible signed URL and its expiry timestamp.
+
+    Expiry is rounded up to a TTL boundary so the same file gets the same URL
+    for a while and browser caches keep working.
+    """
+    ttl = ttl_seconds or settings.MEDIA_URL_TTL_SECONDS
+    expires = (int(time.time()) // ttl + 2) * ttl
+    signature = _media_signature(path, expires)
+    return f"{path}?md5={signature}&expires={expires}", expires
+
+
+def verify_media_signature(path: str, signature: str, expires: int) -> bool:
+    if expires < int(time.time()):
+        return False
+    return hmac.compare_digest(_media_signature(path, expires), signature)
+
+
+def _email_from_token(token: str) -> Optional[str]:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        return None
+    return payload.get("sub")
+
+
+async def get_user_from_token(token: str, db: AsyncSession) -> Optional[User]:
+    """User for a valid access token, else None (also used for WebSockets,
+    which cannot send an Authorization header from the browser)"""
+    email = _email_from_token(token)
+    if email is None:
+        return None
+    return await db.scalar(select(User).where(User.email == email))
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
-    user = db.query(User).filter(User.email == email).first()
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+):
+    """The user row, attached to the request session (for handlers that
+    change the user or need fields the snapshot doesn't carry)"""
+    user = await get_user_from_token(token, db)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    await get_user_cache().set(UserSnapshot.from_user(user))
     return user
 
 
@@ -63,3 +197,31 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+async def get_current_user_snapshot(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+) -> UserSnapshot:
+    """Cached read-only view of the user; most requests skip the users
+    query entirely (the session only connects if it is used)"""
+    email = _email_from_token(token)
+    if email is None:
+        raise _credentials_exception()
+
+    cache = get_user_cache()
+    snapshot = await cache.get(email)
+    if snapshot is None:
+        user = await db.scalar(select(User).where(User.email == email))
+        if user is None:
+            raise _credentials_exception()
+        snapshot = UserSnapshot.from_user(user)
+        await cache.set(snapshot)
+    return snapshot
+
+
+async def get_current_active_snapshot(
+    snapshot: UserSnapshot = Depends(get_current_user_snapshot),
+) -> UserSnapshot:
+    if not snapshot.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return snapshot
@@ -0,0 +1,170 @@
+# File: backend/app/core/user_cache.py
+
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .cache import TTLCache
+from .config import settings
+from .metrics import metrics
+from ..models.user import SubscriptionTier, User
+
+user_cache_lookups = metrics.counter(
+    "user_cache_lookups_total", "Authenticated user lookups by cache result"
+)
+user_queries_saved = metrics.gauge(
+    "user_cache_db_queries_saved_per_minute", "User SELECTs avoided in the last full minute"
+)
+
+_DATETIME_FIELDS = ("subscription_end_date", "created_at")
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Read-only copy of the user fields needed to authorize a request and to
+    answer the polled profile endpoints (/users/me, /subscriptions/current)"""
+
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    is_verified: bool
+    is_admin: bool
+    subscription_tier: SubscriptionTier
+    subscription_end_date: Optional[datetime]
+    stripe_subscription_id: Optional[str]
+    google_id: Optional[str]
+    daily_usage: int
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(**{f.name: getattr(user, f.name) for f in fields(cls)})
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["subscription_tier"] = self.subscription_tier.value
+        for name in _DATETIME_FIELDS:
+            data[name] = data[name].isoformat() if data[name] else None
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "UserSnapshot":
+        data = json.loads(raw)
+        data["subscription_tier"] = SubscriptionTier(data["subscription_tier"])
+        for name in _DATETIME_FIELDS:
+            data[name] = datetime.fromisoformat(data[name]) if data[name] else None
+        return cls(**data)
+
+
+class _PerMinute:
+    """Counts events per wall-clock minute and publishes the last full one"""
+
+    def __init__(self, gauge):
+        self.gauge = gauge
+        self.minute = 0
+        self.count = 0
+
+    def inc(self) -> None:
+        minute = int(time.time() // 60)
+        if minute != self.minute:
+            self.gauge.set(self.count if minute == self.minute + 1 else 0)
+            self.minute = minute
+            self.count = 0
+        self.count += 1
+
+
+class UserCache:
+    """Snapshots of authenticated users keyed by email (the token subject).
+
+    Per-process LRU by default. With REDIS_URL set (and USER_CACHE_REDIS),
+    snapshots live in Redis instead so that an invalidation is seen by every
+    worker at once; a Redis GET still replaces the database query. Entries
+    expire after USER_CACHE_TTL seconds either way, which bounds staleness
+    for writes that bypass the ORM.
+    """
+
+    def __init__(self, ttl: int, maxsize: int, redis_client=None, prefix: str = "users"):
+        self.ttl = ttl
+        self.redis = redis_client
+        self.prefix = f"{prefix}:snapshot:"
+        self._local: TTLCache[UserSnapshot] = TTLCache(maxsize, ttl)
+        self._saved = _PerMinute(user_queries_saved)
+        self._pending: Set[asyncio.Task] = set()
+
+    async def get(self, email: str) -> Optional[UserSnapshot]:
+        if self.redis is not None:
+            raw = await self.redis.get(self.prefix + email)
+            snapshot = UserSnapshot.from_json(raw) if raw else None
+        else:
+            snapshot = self._local.get(email)
+
+        user_cache_lookups.inc(result="hit" if snapshot else "miss")
+        if snapshot:
+            self._saved.inc()
+        return snapshot
+
+    async def set(self, snapshot: UserSnapshot) -> None:
+        if self.redis is not None:
+            await self.redis.set(self.prefix + snapshot.email, snapshot.to_json(), ex=self.ttl)
+        else:
+            self._local.set(snapshot.email, snapshot)
+
+    def invalidate(self, *emails: str) -> None:
+        """Drop snapshots; callable from sync code such as session events"""
+        if self.redis is None:
+            for email in emails:
+                self._local.pop(email)
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop (scripts); the TTL takes care of it
+        task = loop.create_task(self.redis.delete(*[self.prefix + e for e in emails]))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+
+_cache: Optional[UserCache] = None
+
+
+def get_user_cache() -> UserCache:
+    global _cache
+    if _cache is None:
+        client = None
+        if settings.REDIS_URL and settings.USER_CACHE_REDIS:
+            import redis.asyncio as redis
+
+            client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        _cache = UserCache(settings.USER_CACHE_TTL, settings.USER_CACHE_SIZE, client)
+    return _cache
+
+
+# Invalidate on every committed ORM change to a user (tier, flags, usage,
+# email), including changes made through the async session
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            stale = session.info.setdefault("stale_user_emails", set())
+            stale.add(obj.email)
+            # An email change must also drop the entry under the old address
+            stale.update(inspect(obj).attrs.email.history.deleted or ())
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    stale = session.info.pop("stale_user_emails", None)
+    if stale:
+        get_user_cache().invalidate(*stale)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop("stale_user_emails", None)
@@ -0,0 +1,65 @@
+# backend/app/models/analysis.py
+
+import json
+import zlib
+from datetime import datetime
+from typing import Dict, Tuple
+
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+
+from ..core.cache import TTLCache
+from ..core.database import Base
+
+try:
+    import zstandard
+except ImportError:  # zlib fallback; every row records its codec
+    zstandard = None
+
+# Analysis keys that describe one render rather than the image; they stay on
+# the watermark row so that identical analyses can be shared
+RENDER_KEYS = ("processing_time", "degradation", "custom_settings")
+
+# Decoded documents by hash; the default analysis is read constantly
+_documents: TTLCache[Dict] = TTLCache(256, 600)
+
+
+def canonical_json(document: Dict) -> bytes:
+    return json.dumps(document, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def compress(raw: bytes) -> Tuple[str, bytes]:
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=9).compress(raw)
+    return "zlib", zlib.compress(raw, 9)
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed analyses")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class Analysis(Base):
+    """AI analysis document shared by every watermark with the same content,
+    keyed by the sha256 of its canonical JSON and stored compressed"""
+    __tablename__ = "analyses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, index=True, nullable=False)
+    codec = Column(String(8), nullable=False)  # zstd or zlib
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)  # uncompressed bytes
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    @property
+    def document(self) -> Dict:
+        """Decoded analysis (shared between callers; copy before mutating)"""
+        document = _documents.get(self.sha256)
+        if document is None:
+            document = json.loads(decompress(self.codec, self.data))
+            _documents.set(self.sha256, document)
+        return document
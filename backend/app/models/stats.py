@@ -0,0 +1,25 @@
+# backend/app/models/stats.py
+
+from sqlalchemy import Column, Integer, Date, Numeric
+
+from ..core.database import Base
+
+
+class DailyStats(Base):
+    """Per-day rollup behind the admin dashboard, bumped as watermarks and
+    payments are written (see services/stats_service.py)"""
+    __tablename__ = "daily_stats"
+
+    day = Column(Date, primary_key=True)
+    watermarks = Column(Integer, default=0, nullable=False)
+    payments = Column(Integer, default=0, nullable=False)  # completed
+    revenue = Column(Numeric(12, 2), default=0, nullable=False)
+
+
+class DailyActiveUser(Base):
+    """One row per user and day with at least one watermark; distinct users
+    over a range can't be summed from daily counts"""
+    __tablename__ = "daily_active_users"
+
+    day = Column(Date, primary_key=True)
+    user_id = Column(Integer, primary_key=True)
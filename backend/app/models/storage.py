@@ -0,0 +1,21 @@
+# backend/app/models/storage.py
+
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+
+from ..core.database import Base
+
+
+class StoredObject(Base):
+    """Reference count for a content-addressed object in storage"""
+    __tablename__ = "stored_objects"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, unique=True, index=True, nullable=False)  # ab/cd/<sha256>.ext
+    sha256 = Column(String(64), nullable=False, index=True)
+    size = Column(Integer, nullable=True)  # in bytes
+    content_type = Column(String, nullable=True)
+    ref_count = Column(Integer, default=0, nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
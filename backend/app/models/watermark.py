@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import Dict, Optional
 
 from ..core.database import Base
+from .analysis import Analysis
 
 
 class Watermark(Base):
@@ -16,8 +18,12 @@ class Watermark(Base):
     watermarked_image_url = Column(String, nullable=False)
     watermark_text = Column(String, nullable=False)
 
-    # AI analysis data
-    ai_analysis = Column(JSON, nullable=True)  # Stores Gemini Vision analysis
+    # AI analysis data: the image analysis is shared between rows with the
+    # same content, the per-render keys (timing, degradation, applied
+    # settings) stay here. Rows from before migration 0003 hold the whole
+    # document in render_info; read both through `ai_analysis`.
+    analysis_id = Column(Integer, ForeignKey("analyses.id"), nullable=True, index=True)
+    render_info = Column("ai_analysis", JSON, nullable=True)
     placement_data = Column(JSON, nullable=True)  # Stores watermark placement info
 
     # Metadata
@@ -26,8 +32,28 @@ class Watermark(Base):
     file_size = Column(Integer)  # in bytes
     processing_time = Column(Integer)  # in milliseconds
 
+    # Variants rendered from one upload share a group id
+    variant_group = Column(String(32), nullable=True, index=True)
+
+    # Background job that created the row; a re-delivered job finds it
+    # instead of inserting a duplicate
+    job_id = Column(String(32), nullable=True, unique=True, index=True)
+
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
     user = relationship("User", back_populates="watermarks")
+    analysis = relationship(Analysis, lazy="selectin")
+
+    # Serves the per-user history in newest-first order (keyset pagination)
+    __table_args__ = (
+        Index("ix_watermarks_user_created_id", user_id, created_at.desc(), id),
+    )
+
+    @property
+    def ai_analysis(self) -> Optional[Dict]:
+        """Gemini Vision analysis merged with this row's render info"""
+        if self.analysis_id is None:
+            return self.render_info
+        return {**self.analysis.document, **(self.render_info or {})}
@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 
@@ -63,6 +63,15 @@ class AdminStats(BaseModel):
     revenue_this_month: float
     active_users_today: int
     active_users_this_week: int
+
+
+class DailyStatsView(BaseModel):
+    """One day of the admin time series"""
+    day: date
+    watermarks: int
+    active_users: int
+    payments: int
+    revenue: float
     
     
 class AdminActionLog(BaseModel):
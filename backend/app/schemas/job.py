@@ -0,0 +1,24 @@
+# File: backend/app/schemas/job.py
+
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+from .watermark import WatermarkResponse
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+
+class JobStatusResponse(BaseModel):
+    id: str
+    status: str  # queued, processing, succeeded, dead
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    watermark_id: Optional[int] = None
+    watermark: Optional[WatermarkResponse] = None
@@ -1,7 +1,7 @@
 # File: backend/app/schemas/watermark.py
 
 from pydantic import BaseModel, field_validator
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
@@ -18,19 +18,84 @@ class WatermarkCreate(BaseModel):
         return v.strip()
 
 
-class WatermarkResponse(BaseModel):
+class WatermarkSettings(BaseModel):
+    """Render options shared by /create and preview sessions"""
+    text_position: str = "bottom-right"
+    text_size: str = "medium"
+    text_opacity: float = 0.7
+    auto_opacity: bool = False
+    multiple_watermarks: bool = False
+    watermark_pattern: str = "diagonal"
+    font_family: Optional[str] = None
+    text_color: str = "#FFFFFF"
+    text_shadow: bool = False
+    protection_mode: str = "standard"
+
+
+class PreviewRenderRequest(WatermarkSettings):
+    watermark_text: str
+
+
+class WatermarkRerenderRequest(BaseModel):
+    """Changed parameters only; anything omitted keeps its stored value"""
+    watermark_text: Optional[str] = None
+    text_position: Optional[str] = None
+    text_size: Optional[str] = None
+    text_opacity: Optional[float] = None
+    auto_opacity: Optional[bool] = None
+    multiple_watermarks: Optional[bool] = None
+    watermark_pattern: Optional[str] = None
+    font_family: Optional[str] = None
+    text_color: Optional[str] = None
+    text_shadow: Optional[bool] = None
+    protection_mode: Optional[str] = None
+
+
+class PreviewSessionResponse(BaseModel):
+    session_id: str
+    expires_in: int
+    image_width: int
+    image_height: int
+    proxy_width: int
+    proxy_height: int
+
+
+class WatermarkSummary(BaseModel):
+    """List item: everything the gallery shows, without the analysis JSON"""
     id: int
     user_id: int
     original_image_url: str
     watermarked_image_url: str
     watermark_text: str
-    ai_analysis: Optional[Dict[str, Any]]
-    placement_data: Optional[Dict[str, Any]]
     image_width: Optional[int]
     image_height: Optional[int]
     file_size: Optional[int]
     processing_time: Optional[int]
     created_at: datetime
+    variant_group: Optional[str] = None
+    # Signed, expiring links to fetch the images (the *_image_url fields
+    # identify the stored objects and are not served publicly)
+    original_media_url: Optional[str] = None
+    watermarked_media_url: Optional[str] = None
+    # Responsive thumbnails: width -> URL, plus a ready-made srcset
+    thumbnails: Optional[Dict[int, str]] = None
+    srcset: Optional[str] = None
 
     class Config:
-        from_attributes = True  # Fixed: removed orm_mode
\ No newline at end of file
+        from_attributes = True
+
+
+class WatermarkResponse(WatermarkSummary):
+    ai_analysis: Optional[Dict[str, Any]]
+    placement_data: Optional[Dict[str, Any]]
+    # All rows of a multi-variant /create, in request order
+    variants: Optional[List["WatermarkResponse"]] = None
+
+    class Config:
+        from_attributes = True  # Fixed: removed orm_mode
+
+
+class WatermarkPage(BaseModel):
+    items: List[WatermarkSummary]
+    # Pass back as ?cursor= for the next page; None on the last page
+    next_cursor: Optional[str] = None
@@ -0,0 +1,142 @@
+# File: backend/app/services/admission.py
+
+import asyncio
+import contextlib
+import math
+import time
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+
+from ..core.config import settings
+from ..core.metrics import metrics
+
+admission_inflight = metrics.gauge("admission_inflight", "Renders admitted and not yet finished")
+admission_reserved_bytes = metrics.gauge(
+    "admission_reserved_bytes", "Estimated decode memory held by admitted renders"
+)
+admission_limit = metrics.gauge("admission_limit", "Admission limits by kind")
+admission_rejected = metrics.counter("admission_rejected_total", "Requests turned away with 503")
+admission_drain_rate = metrics.gauge(
+    "admission_drain_rate", "Smoothed admitted renders finished per second"
+)
+
+
+class AdmissionController:
+    """Caps concurrent renders by count and by estimated decode memory.
+
+    The cost of a render is its probed pixel count times
+    ADMISSION_BYTES_PER_PIXEL (RGBA image, overlay and composite). Requests
+    use `admit`, which fails fast with 503 and a Retry-After derived from a
+    moving average of how fast admitted renders finish; batch items and
+    background jobs use `reserve`, which waits for capacity instead.
+    """
+
+    def __init__(
+        self,
+        max_inflight: int,
+        memory_budget: int,
+        bytes_per_pixel: int,
+        smoothing: float = 0.2,
+    ):
+        self.max_inflight = max_inflight
+        self.memory_budget = memory_budget
+        self.bytes_per_pixel = bytes_per_pixel
+        self.smoothing = smoothing
+        self.inflight = 0
+        self.reserved = 0
+        self.drain_rate = 0.0
+        self._last_release: Optional[float] = None
+        self._changed: Optional[asyncio.Condition] = None
+        admission_limit.set(max_inflight, kind="inflight")
+        admission_limit.set(memory_budget, kind="memory_bytes")
+
+    def cost(self, pixels: int) -> int:
+        return pixels * self.bytes_per_pixel
+
+    def _fits(self, cost: int) -> bool:
+        if self.inflight >= self.max_inflight:
+            return False
+        # An image larger than the whole budget still runs, but alone
+        return self.inflight == 0 or self.reserved + cost <= self.memory_budget
+
+    def _acquire(self, cost: int) -> None:
+        self.inflight += 1
+        self.reserved += cost
+        admission_inflight.set(self.inflight)
+        admission_reserved_bytes.set(self.reserved)
+
+    async def _release(self, cost: int) -> None:
+        self.inflight -= 1
+        self.reserved -= cost
+        admission_inflight.set(self.inflight)
+        admission_reserved_bytes.set(self.reserved)
+
+        now = time.monotonic()
+        if self._last_release is not None:
+            rate = 1.0 / max(now - self._last_release, 1e-3)
+            self.drain_rate += self.smoothing * (rate - self.drain_rate)
+            admission_drain_rate.set(self.drain_rate)
+        self._last_release = now
+
+        if self._changed is not None:
+            async with self._changed:
+                self._changed.notify_all()
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free at the current drain rate"""
+        if self.drain_rate <= 0:
+            return settings.ADMISSION_MAX_RETRY_AFTER
+        ahead = max(self.inflight - self.max_inflight + 1, 1)
+        seconds = math.ceil(ahead / self.drain_rate)
+        return min(max(seconds, 1), settings.ADMISSION_MAX_RETRY_AFTER)
+
+    def reject(self, reason: str) -> HTTPException:
+        admission_rejected.inc(reason=reason)
+        return HTTPException(
+            status_code=503,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": str(self.retry_after())},
+        )
+
+    def ensure_capacity(self, pixels: int = 0) -> None:
+        """Raise 503 now if a render of this size would not be admitted"""
+        if not self._fits(self.cost(pixels)):
+            raise self.reject("inflight" if self.inflight >= self.max_inflight else "memory")
+
+    @contextlib.asynccontextmanager
+    async def admit(self, pixels: int) -> AsyncIterator[None]:
+        cost = self.cost(pixels)
+        self.ensure_capacity(pixels)
+        self._acquire(cost)
+        try:
+            yield
+        finally:
+            await self._release(cost)
+
+    @contextlib.asynccontextmanager
+    async def reserve(self, pixels: int) -> AsyncIterator[None]:
+        cost = self.cost(pixels)
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._fits(cost))
+            self._acquire(cost)
+        try:
+            yield
+        finally:
+            await self._release(cost)
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            max_inflight=settings.ADMISSION_MAX_INFLIGHT,
+            memory_budget=settings.ADMISSION_MEMORY_BUDGET,
+            bytes_per_pixel=settings.ADMISSION_BYTES_PER_PIXEL,
+        )
+    return _controller
@@ -0,0 +1,116 @@
+# File: backend/app/services/analysis_store.py
+
+import hashlib
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..core.cache import TTLCache
+from ..core.metrics import metrics
+from ..models.analysis import RENDER_KEYS, Analysis, canonical_json, compress
+
+analyses_stored = metrics.counter(
+    "analyses_stored_total", "Analysis documents stored, by whether the content already existed"
+)
+analysis_bytes = metrics.counter(
+    "analysis_bytes_total", "Bytes of newly stored analyses, raw and compressed"
+)
+
+# hash -> id of analyses written in a session's open transaction; they only
+# become cacheable once that transaction commits
+_PENDING_KEY = "pending_analysis_ids"
+
+
+class AnalysisStore:
+    """Content-addressed storage for AI analysis documents.
+
+    Identical documents (most notably the default analysis used whenever
+    Gemini is unavailable) are stored once and referenced by id. Rows are
+    written in the caller's transaction, like stored_objects, so a create
+    needs one connection and a rollback takes the new analysis with it.
+    Ids are cached per process only after the transaction commits.
+    """
+
+    def __init__(self, cache_size: int = 1024, cache_ttl: int = 3600):
+        self._ids: TTLCache[int] = TTLCache(cache_size, cache_ttl)
+
+    def _insert(self, db: AsyncSession):
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(Analysis)
+        if dialect == "sqlite":
+            return sqlite.insert(Analysis)
+        return None
+
+    async def intern(self, db: AsyncSession, document: Dict) -> int:
+        raw = canonical_json(document)
+        sha256 = hashlib.sha256(raw).hexdigest()
+        analysis_id = self._ids.get(sha256)
+        if analysis_id is not None:
+            analyses_stored.inc(result="cached")
+            return analysis_id
+        pending = db.info.setdefault(_PENDING_KEY, {})
+        if sha256 in pending:
+            analyses_stored.inc(result="existing")
+            return pending[sha256]
+
+        codec, data = compress(raw)
+        values = dict(sha256=sha256, codec=codec, data=data, size=len(raw))
+        insert = self._insert(db)
+        if insert is not None:
+            # Concurrent identical documents: the second insert is a no-op
+            result = await db.execute(
+                insert.values(**values).on_conflict_do_nothing(index_elements=[Analysis.sha256])
+            )
+            inserted = result.rowcount == 1
+            analysis_id = await db.scalar(select(Analysis.id).where(Analysis.sha256 == sha256))
+        else:
+            analysis_id = await db.scalar(select(Analysis.id).where(Analysis.sha256 == sha256))
+            inserted = analysis_id is None
+            if inserted:
+                row = Analysis(**values)
+                db.add(row)
+                await db.flush()
+                analysis_id = row.id
+
+        if inserted:
+            analyses_stored.inc(result="new")
+            analysis_bytes.inc(len(raw), kind="raw")
+            analysis_bytes.inc(len(data), kind="compressed")
+        else:
+            analyses_stored.inc(result="existing")
+        pending[sha256] = analysis_id
+        return analysis_id
+
+    async def columns(self, db: AsyncSession, analysis: Dict) -> Dict[str, Any]:
+        """Watermark column values for a pipeline analysis dict"""
+        document = {k: v for k, v in analysis.items() if k not in RENDER_KEYS}
+        render_info = {k: analysis[k] for k in RENDER_KEYS if k in analysis}
+        return {"analysis_id": await self.intern(db, document), "render_info": render_info}
+
+
+_store: Optional[AnalysisStore] = None
+
+
+def get_analysis_store() -> AnalysisStore:
+    global _store
+    if _store is None:
+        _store = AnalysisStore()
+    return _store
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_committed_analyses(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        store = get_analysis_store()
+        for sha256, analysis_id in pending.items():
+            store._ids.set(sha256, analysis_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_analyses(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,279 @@
+# File: backend/app/services/batch_service.py
+
+import asyncio
+import json
+import os
+import re
+import time
+import zipfile
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import insert
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..core.metrics import metrics
+from ..models.watermark import Watermark
+from ..utils.image_processor import ImageProbe
+from ..utils.uploads import copy_to_tempfile, spool_upload
+from ..utils.validators import validate_image_file, validate_image_probe
+from .admission import get_admission_controller
+from .analysis_store import get_analysis_store
+from .job_events import JobProgress
+from .render_pool import set_render_context
+from .stats_service import StatsService
+from .storage_service import ContentAddressedStore
+from .usage_service import UsageService
+from .watermark_service import WatermarkService
+
+batch_items = metrics.counter("batch_items_total", "Batch items by outcome")
+
+
+@dataclass
+class BatchItem:
+    """One file of a batch; `error` is set as soon as the item fails"""
+
+    index: int
+    filename: str
+    file: Optional[BinaryIO] = None
+    probe: Optional[ImageProbe] = None
+    sha256: Optional[str] = None
+    size: int = 0
+    error: Optional[str] = None
+    row: Optional[Dict] = None
+    analysis: Optional[Dict] = None
+    output: Optional[memoryview] = None
+    archive_name: Optional[str] = None
+    watermark_id: Optional[int] = None
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class _ZipSink:
+    """Write-only target for zipfile. Without seek/tell, zipfile writes data
+    descriptors instead of patching headers, so finished entries can be sent
+    right away."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _archive_name(index: int, filename: str) -> str:
+    stem = os.path.splitext(os.path.basename(filename or ""))[0]
+    stem = re.sub(r"[^A-Za-z0-9._-]+", "_", stem).strip("._") or "image"
+    return f"{index + 1:03d}_{stem[:60]}_watermarked.png"
+
+
+class BatchService:
+    """Watermark many uploads with one settings block.
+
+    Items run through the shared render pool with at most
+    BATCH_CONCURRENCY in flight; results are streamed as ZIP entries in
+    completion order and all rows are inserted with a single statement at
+    the end. A manifest.json entry lists every item and its outcome.
+    """
+
+    def __init__(self):
+        self.watermark_service = WatermarkService()
+        self.store = ContentAddressedStore()
+        self.analyses = get_analysis_store()
+
+    async def prepare(self, images: List[UploadFile], user_tier: str) -> List[BatchItem]:
+        """Validate each upload and copy it out of the request (the spooled
+        form files are closed before the ZIP is streamed)"""
+        items = []
+        for index, image in enumerate(images):
+            item = BatchItem(index=index, filename=image.filename or "")
+            try:
+                validate_image_file(image)
+                upload = await spool_upload(image, settings.MAX_FILE_SIZE)
+                item.probe = validate_image_probe(upload.file, upload.content_type, user_tier)
+                item.sha256 = upload.sha256
+                item.size = upload.size
+                item.file = await asyncio.to_thread(copy_to_tempfile, upload.rewind())
+            except HTTPException as e:
+                item.error = e.detail
+            items.append(item)
+        return items
+
+    async def _process(
+        self,
+        db,
+        item: BatchItem,
+        semaphore: asyncio.Semaphore,
+        progress: JobProgress,
+        user_id: int,
+        watermark_text: str,
+        user_tier: str,
+        options: Dict,
+        placement_data: Dict,
+    ) -> BatchItem:
+        pixels = item.probe.width * item.probe.height
+        async with semaphore, get_admission_controller().reserve(pixels):
+            start_time = time.time()
+            try:
+                watermarked_bytes, ai_analysis = await self.watermark_service.apply_intelligent_watermark(
+                    item.file, watermark_text, user_tier, probe=item.probe,
+                    on_stage=progress, **options
+                )
+                original_ext = "jpg" if item.probe.format == "jpeg" else item.probe.format
+                original_url, watermarked_url = await asyncio.gather(
+                    self.store.put(
+                        db, item.file, original_ext, f"image/{item.probe.format}",
+                        sha256=item.sha256, size=item.size,
+                    ),
+                    self.store.put(db, watermarked_bytes, "png", "image/png"),
+                )
+            except Exception as e:
+                print(f"Batch item {item.index} error: {e}")
+                item.error = "Error processing watermark"
+                await progress("failed", status="failed", error=item.error)
+                return item
+            finally:
+                item.close()
+        await progress("stored")
+
+        item.archive_name = _archive_name(item.index, item.filename)
+        item.row = {
+            "user_id": user_id,
+            "original_image_url": original_url,
+            "watermarked_image_url": watermarked_url,
+            "watermark_text": watermark_text,
+            "placement_data": placement_data,
+            "image_width": item.probe.width,
+            "image_height": item.probe.height,
+            "file_size": watermarked_bytes.nbytes,
+            "processing_time": int((time.time() - start_time) * 1000),
+            "created_at": datetime.utcnow(),
+        }
+        item.analysis = ai_analysis
+        item.output = watermarked_bytes
+        return item
+
+    async def stream_zip(
+        self,
+        batch_id: str,
+        items: List[BatchItem],
+        user_id: int,
+        watermark_text: str,
+        user_tier: str,
+        options: Dict,
+        placement_data: Dict,
+        usage_day: date,
+    ) -> AsyncIterator[bytes]:
+        """Usage for every valid item was reserved by the caller on
+        `usage_day`; items that are never sent (failures, a client that
+        disconnects) are refunded"""
+        # Runs after the request's own session is closed, so it uses its own
+        db = AsyncSessionLocal()
+        sink = _ZipSink()
+        archive = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED)
+        semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+        # Item tasks inherit the context, so every render step is scheduled
+        # under the uploader's tier
+        set_render_context(user_id, user_tier)
+        # Progress events use the batch id as job id, one per item and stage
+        tasks = [
+            asyncio.create_task(self._process(
+                db, item, semaphore,
+                JobProgress(user_id, batch_id, item=item.index, filename=item.filename),
+                user_id, watermark_text, user_tier, options, placement_data,
+            ))
+            for item in items if item.error is None
+        ]
+        reserved = len(tasks)
+        delivered = 0
+        committed = False
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                if item.error is None:
+                    # PNGs are already compressed; store them as-is
+                    archive.writestr(item.archive_name, item.output)
+                    item.output = None
+                    delivered += 1
+                    yield sink.drain()
+
+            done = [item for item in items if item.row is not None]
+            if done:
+                try:
+                    # Interned here, once the items are done with the shared session
+                    for item in done:
+                        item.row.update(await self.analyses.columns(db, item.analysis))
+                    ids = (await db.scalars(
+                        insert(Watermark).returning(Watermark.id, sort_by_parameter_order=True),
+                        [item.row for item in done],
+                    )).all()
+                    await StatsService().record_watermarks(db, user_id, len(done))
+                    await self.store.commit(db)
+                    committed = True
+                    for item, watermark_id in zip(done, ids):
+                        item.watermark_id = watermark_id
+                except Exception as e:
+                    print(f"Batch insert error: {e}")
+                    for item in done:
+                        item.error = "Error saving watermark"
+
+            for item in items:
+                batch_items.inc(status="failed" if item.error else "succeeded")
+            manifest = self._manifest(items)
+            await JobProgress(user_id, batch_id)(
+                "succeeded", status="succeeded",
+                succeeded=manifest["succeeded"], failed=manifest["failed"],
+            )
+
+            archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+            archive.close()
+            yield sink.drain()
+        finally:
+            for task in tasks:
+                task.cancel()
+            try:
+                # Let cancelled items finish unwinding before their writes
+                # are rolled back
+                await asyncio.gather(*tasks, return_exceptions=True)
+                for item in items:
+                    item.close()
+                if not committed:
+                    # Nothing references what the items wrote
+                    await self.store.rollback(db)
+                await UsageService().refund(db, user_id, reserved - delivered, usage_day)
+            except Exception as e:
+                print(f"Batch cleanup error: {e}")
+            await db.close()
+
+    @staticmethod
+    def _manifest(items: List[BatchItem]) -> Dict:
+        entries = []
+        for item in items:
+            entry = {"index": item.index, "filename": item.filename}
+            if item.error:
+                entry.update(status="failed", error=item.error)
+            else:
+                entry.update(status="succeeded", watermark_id=item.watermark_id, file=item.archive_name)
+            entries.append(entry)
+        return {
+            "total": len(items),
+            "succeeded": sum(1 for e in entries if e["status"] == "succeeded"),
+            "failed": sum(1 for e in entries if e["status"] == "failed"),
+            "items": entries,
+        }
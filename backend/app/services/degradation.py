@@ -0,0 +1,95 @@
+# File: backend/app/services/degradation.py
+
+import bisect
+import time
+from typing import Dict, List, Optional
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from .render_pool import get_render_scheduler
+
+# Levels are cumulative: each one also applies everything below it
+NORMAL = 0
+LOCAL_ANALYSIS = 1  # default analysis instead of the Gemini call
+NO_BLUR = 2  # multilayer mode without the blurred second layer pass
+FAST_ENCODE = 3  # PNG at compress_level 1
+CAPPED_PATTERN = 4  # at most DEGRADATION_MAX_PATTERN_MARKS tiled marks
+
+LEVEL_NAMES = ("normal", "local_analysis", "no_blur", "fast_encode", "capped_pattern")
+
+watermark_pipeline_seconds = metrics.histogram(
+    "watermark_pipeline_seconds", "Analysis to encoded output, per watermark"
+)
+degradation_level = metrics.gauge("degradation_level", "Current quality degradation level")
+degraded_renders = metrics.counter("degraded_renders_total", "Renders by degradation level")
+
+
+class DegradationController:
+    """Picks a degradation level from render queue depth and p95 latency.
+
+    Each list of thresholds maps a signal to a level: reaching the n-th
+    value selects level n. The higher of the two wins. Latency is the p95
+    of renders finished in the last `latency_window` seconds, so an idle
+    server has no latency signal and drifts back to normal. The level rises
+    immediately and steps down one level per `hold_seconds`, so it does not
+    flap while the cheaper renders drain the queue.
+    """
+
+    def __init__(
+        self,
+        depth_thresholds: List[int],
+        latency_thresholds: List[float],
+        hold_seconds: float,
+        latency_window: float = 60.0,
+        enabled: bool = True,
+    ):
+        self.depth_thresholds = sorted(depth_thresholds)
+        self.latency_thresholds = sorted(latency_thresholds)
+        self.hold_seconds = hold_seconds
+        self.latency_window = latency_window
+        self.enabled = enabled
+        self.level = NORMAL
+        self._changed_at = time.monotonic()
+
+    def _target(self) -> int:
+        depth = get_render_scheduler().queued
+        p95 = watermark_pipeline_seconds.percentile(95, max_age=self.latency_window) or 0.0
+        target = max(
+            bisect.bisect_right(self.depth_thresholds, depth),
+            bisect.bisect_right(self.latency_thresholds, p95),
+        )
+        return min(target, len(LEVEL_NAMES) - 1)
+
+    def current(self) -> int:
+        if not self.enabled:
+            return NORMAL
+        target = self._target()
+        now = time.monotonic()
+        if target > self.level:
+            self.level = target
+            self._changed_at = now
+        elif target < self.level and now - self._changed_at >= self.hold_seconds:
+            self.level -= 1
+            self._changed_at = now
+        degradation_level.set(self.level)
+        return self.level
+
+
+def describe_level(level: int) -> Dict:
+    return {"level": level, "name": LEVEL_NAMES[level]}
+
+
+_controller: Optional[DegradationController] = None
+
+
+def get_degradation_controller() -> DegradationController:
+    global _controller
+    if _controller is None:
+        _controller = DegradationController(
+            depth_thresholds=settings.DEGRADATION_QUEUE_DEPTHS,
+            latency_thresholds=settings.DEGRADATION_P95_SECONDS,
+            hold_seconds=settings.DEGRADATION_HOLD_SECONDS,
+            latency_window=settings.DEGRADATION_P95_WINDOW_SECONDS,
+            enabled=settings.DEGRADATION_ENABLED,
+        )
+    return _controller
@@ -0,0 +1,176 @@
+# File: backend/app/services/derivative_service.py
+
+import asyncio
+import io
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from PIL import Image
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from .storage_service import CONTENT_KEY_PATTERN, get_storage
+
+derivative_requests = metrics.counter(
+    "derivative_requests_total", "Thumbnail requests by cache result"
+)
+derivative_cache_bytes = metrics.gauge(
+    "derivative_cache_bytes", "Bytes currently held in the derivative disk cache"
+)
+
+
+class DiskLRUCache:
+    """Size-capped directory of files evicted least-recently-used first.
+
+    Recency is kept in memory and mirrored to file mtimes, so the order
+    survives a restart.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        files = [p for p in self.directory.iterdir() if p.is_file() and not p.name.startswith(".")]
+        for path in sorted(files, key=lambda p: p.stat().st_mtime):
+            size = path.stat().st_size
+            self._entries[path.name] = size
+            self._total += size
+        self._evict()
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                (self.directory / name).unlink()
+            except FileNotFoundError:
+                pass
+        derivative_cache_bytes.set(self._total)
+
+    def get(self, name: str) -> Optional[Path]:
+        with self._lock:
+            if name not in self._entries:
+                return None
+            self._entries.move_to_end(name)
+        path = self.directory / name
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._total -= self._entries.pop(name, 0)
+            return None
+        return path
+
+    def put(self, name: str, data: bytes) -> Path:
+        path = self.directory / name
+        tmp_path = self.directory / f".{name}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total -= self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            self._total += len(data)
+            self._evict()
+        return path
+
+
+def _render_webp(source: bytes, width: int) -> bytes:
+    image = Image.open(io.BytesIO(source))
+    if image.format == "JPEG":
+        image.draft("RGB", (width, width * 4))
+
+    image = image.convert("RGBA")
+    if image.width > width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    output = io.BytesIO()
+    image.save(output, format="WEBP", quality=settings.DERIVATIVE_WEBP_QUALITY, method=4)
+    return output.getvalue()
+
+
+_cache: Optional[DiskLRUCache] = None
+_inflight: Dict[str, asyncio.Lock] = {}
+
+
+def get_derivative_cache() -> DiskLRUCache:
+    global _cache
+    if _cache is None:
+        _cache = DiskLRUCache(settings.DERIVATIVE_CACHE_DIR, settings.DERIVATIVE_CACHE_MAX_BYTES)
+    return _cache
+
+
+class DerivativeService:
+    """Width-bucketed WebP thumbnails generated on first request"""
+
+    def __init__(self):
+        self.storage = get_storage()
+        self.cache = get_derivative_cache()
+
+    @staticmethod
+    def bucket_width(requested: int) -> int:
+        """Smallest configured width that covers the request"""
+        widths = sorted(settings.DERIVATIVE_WIDTHS)
+        for width in widths:
+            if width >= requested:
+                return width
+        return widths[-1]
+
+    @staticmethod
+    def is_content_key(key: str) -> bool:
+        """Only content-addressed objects get derivatives"""
+        return bool(CONTENT_KEY_PATTERN.match(key))
+
+    @staticmethod
+    def cache_name(key: str, width: int) -> str:
+        return f"{CONTENT_KEY_PATTERN.match(key).group(1)}_{width}.webp"
+
+    @staticmethod
+    def url_for(key: str, width: int) -> str:
+        return f"/api/watermarks/thumbnails/{width}/{key}"
+
+    def urls_for(self, image_url: str) -> Dict[int, str]:
+        key = self.storage.key_from_url(image_url)
+        if not key or not self.is_content_key(key):
+            return {}
+        return {width: self.url_for(key, width) for width in sorted(settings.DERIVATIVE_WIDTHS)}
+
+    async def get_thumbnail(self, key: str, width: int) -> Path:
+        """Path of the cached derivative, rendering it on a miss. The key must
+        be a content key the caller has checked exists."""
+        name = self.cache_name(key, width)
+
+        path = self.cache.get(name)
+        if path:
+            derivative_requests.inc(result="hit")
+            return path
+
+        # Single flight: concurrent misses for the same derivative render once
+        lock = _inflight.setdefault(name, asyncio.Lock())
+        try:
+            async with lock:
+                path = self.cache.get(name)
+                if path:
+                    derivative_requests.inc(result="hit")
+                    return path
+
+                source = await self.storage.read(key)
+                data = await asyncio.to_thread(_render_webp, source, width)
+                path = await asyncio.to_thread(self.cache.put, name, data)
+                derivative_requests.inc(result="miss")
+                return path
+        finally:
+            # Also on errors, so failed renders don't pile up locks
+            _inflight.pop(name, None)
@@ -0,0 +1,234 @@
+# File: backend/app/services/font_coverage.py
+
+import json
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from fontTools.ttLib import TTFont
+from PIL import ImageDraw, ImageFont
+
+INDEX_VERSION = 1
+
+# Characters that never start a new run: they belong to the glyph before them
+# (combining marks, ZWJ, variation selectors, ...)
+_ATTACHING_CATEGORIES = {"Mn", "Me", "Cf"}
+
+
+def _fingerprint(path: Path) -> str:
+    """Cheap identity of a font file so a stale index can be detected"""
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _to_ranges(codepoints: Iterable[int]) -> List[List[int]]:
+    """Compress a codepoint set into inclusive [start, end] ranges"""
+    ranges: List[List[int]] = []
+    for cp in sorted(codepoints):
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ranges
+
+
+def _from_ranges(ranges: List[List[int]]) -> Set[int]:
+    codepoints: Set[int] = set()
+    for start, end in ranges:
+        codepoints.update(range(start, end + 1))
+    return codepoints
+
+
+class FontCoverageIndex:
+    """Codepoint coverage of every installed font, built from their cmap tables.
+
+    Lookups are two hash probes: the preferred font's coverage set, then a
+    precomputed codepoint -> first covering fallback font map.
+    """
+
+    def __init__(
+        self,
+        fonts: Dict[str, Dict],
+        fallback_order: List[str],
+    ):
+        # font_key -> {"path": str, "fingerprint": str, "codepoints": Set[int]}
+        self.fonts = fonts
+        self.fallback_order = [key for key in fallback_order if key in fonts]
+        self._path_to_key = {
+            str(Path(info["path"]).resolve()): key for key, info in fonts.items()
+        }
+
+        self._fallback_map: Dict[int, str] = {}
+        for font_key in self.fallback_order:
+            for cp in fonts[font_key]["codepoints"]:
+                self._fallback_map.setdefault(cp, font_key)
+
+    @classmethod
+    def build(cls, font_paths: Dict[str, Path], fallback_order: List[str]) -> "FontCoverageIndex":
+        """Read the cmap of every font file"""
+        fonts = {}
+        for font_key, font_path in font_paths.items():
+            try:
+                font = TTFont(str(font_path), lazy=True)
+                cmap = font.getBestCmap() or {}
+                font.close()
+            except Exception as e:
+                print(f"Could not read cmap of '{font_key}': {e}")
+                continue
+
+            fonts[font_key] = {
+                "path": str(font_path),
+                "fingerprint": _fingerprint(font_path),
+                "codepoints": set(cmap.keys()),
+            }
+
+        return cls(fonts, fallback_order)
+
+    @classmethod
+    def load(
+        cls,
+        index_file: Path,
+        font_paths: Dict[str, Path],
+        fallback_order: List[str],
+    ) -> Optional["FontCoverageIndex"]:
+        """Load a serialized index, or None if it is missing or stale"""
+        if not index_file.exists():
+            return None
+
+        try:
+            with open(index_file, "r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if data.get("version") != INDEX_VERSION:
+            return None
+
+        stored = data.get("fonts", {})
+        if set(stored.keys()) != set(font_paths.keys()):
+            return None
+
+        fonts = {}
+        for font_key, font_path in font_paths.items():
+            entry = stored[font_key]
+            if entry.get("fingerprint") != _fingerprint(font_path):
+                return None
+            fonts[font_key] = {
+                "path": str(font_path),
+                "fingerprint": entry["fingerprint"],
+                "codepoints": _from_ranges(entry["ranges"]),
+            }
+
+        return cls(fonts, fallback_order)
+
+    def save(self, index_file: Path) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "fonts": {
+                font_key: {
+                    "fingerprint": info["fingerprint"],
+                    "ranges": _to_ranges(info["codepoints"]),
+                }
+                for font_key, info in self.fonts.items()
+            },
+        }
+        with open(index_file, "w") as f:
+            json.dump(data, f)
+
+    def key_for_path(self, font_path: Path) -> Optional[str]:
+        return self._path_to_key.get(str(Path(font_path).resolve()))
+
+    def path_for_key(self, font_key: str) -> Path:
+        return Path(self.fonts[font_key]["path"])
+
+    def font_for(self, codepoint: int, preferred: Optional[str]) -> Optional[str]:
+        """Font key that renders a codepoint, preferring the requested font"""
+        if preferred in self.fonts and codepoint in self.fonts[preferred]["codepoints"]:
+            return preferred
+        return self._fallback_map.get(codepoint)
+
+    def split_runs(self, text: str, preferred: Optional[str]) -> List[Tuple[str, Optional[str]]]:
+        """Split text into (substring, font_key) runs"""
+        runs: List[Tuple[str, Optional[str]]] = []
+        current_font = preferred
+        current_chars: List[str] = []
+
+        for char in text:
+            font_key = self.font_for(ord(char), preferred)
+
+            # Uncovered characters and attaching marks stay in the current run
+            if font_key is None or unicodedata.category(char) in _ATTACHING_CATEGORIES:
+                font_key = current_font
+
+            if font_key != current_font and current_chars:
+                runs.append(("".join(current_chars), current_font))
+                current_chars = []
+            current_font = font_key
+            current_chars.append(char)
+
+        if current_chars:
+            runs.append(("".join(current_chars), current_font))
+
+        return runs
+
+
+@lru_cache(maxsize=128)
+def load_truetype(font_path: str, size: int) -> ImageFont.ImageFont:
+    """Load (and cache) a font face at a given size"""
+    try:
+        return ImageFont.truetype(font_path, size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+class TextRunLayout:
+    """Text split into per-font runs that is measured and drawn in one pass"""
+
+    def __init__(self, runs: List[Tuple[str, ImageFont.ImageFont]]):
+        self.runs = runs
+
+    @property
+    def is_single_run(self) -> bool:
+        return len(self.runs) == 1
+
+    def _baseline(self) -> int:
+        ascents = [
+            font.getmetrics()[0] for _, font in self.runs if hasattr(font, "getmetrics")
+        ]
+        return max(ascents) if ascents else 0
+
+    def _advance(self, text: str, font: ImageFont.ImageFont) -> float:
+        return font.getlength(text)
+
+    def textbbox(self, draw: ImageDraw.ImageDraw) -> Tuple[int, int, int, int]:
+        """Bounding box of the whole line drawn at (0, 0)"""
+        if self.is_single_run:
+            text, font = self.runs[0]
+            return draw.textbbox((0, 0), text, font=font)
+
+        baseline = self._baseline()
+        offset = 0.0
+        left, top, right, bottom = None, None, None, None
+        for text, font in self.runs:
+            box = draw.textbbox((offset, baseline), text, font=font, anchor="ls")
+            left = box[0] if left is None else min(left, box[0])
+            top = box[1] if top is None else min(top, box[1])
+            right = box[2] if right is None else max(right, box[2])
+            bottom = box[3] if bottom is None else max(bottom, box[3])
+            offset += self._advance(text, font)
+
+        return (int(left), int(top), int(right), int(bottom))
+
+    def draw(self, draw: ImageDraw.ImageDraw, xy: Tuple[int, int], fill) -> None:
+        """Draw all runs on a shared baseline"""
+        if self.is_single_run:
+            text, font = self.runs[0]
+            draw.text(xy, text, font=font, fill=fill)
+            return
+
+        x, y = xy
+        baseline = y + self._baseline()
+        for text, font in self.runs:
+            draw.text((x, baseline), text, font=font, fill=fill, anchor="ls")
+            x += self._advance(text, font)
@@ -3,10 +3,15 @@
 import os
 import requests
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import json
 from datetime import datetime, timedelta
 
+from .font_coverage import FontCoverageIndex, TextRunLayout, load_truetype
+
+# Process-wide coverage index, built once at startup
+_coverage_index: Optional[FontCoverageIndex] = None
+
 class FontManager:
     """Modern font management system using Google Fonts API"""
     
@@ -71,13 +76,38 @@ class FontManager:
             "name": "Lato",
             "url": "https://raw.githubusercontent.com/googlefonts/LatoGFVersion/main/fonts/Lato-Regular.ttf",
             "fallback": "https://fonts.gstatic.com/s/lato/v24/S6uyw4BMUTPHjx4wXiWtFCc.ttf"
+        },
+        # Script fallbacks (not user selectable)
+        "Noto Sans": {
+            "name": "Noto Sans",
+            "url": "https://github.com/google/fonts/raw/main/ofl/notosans/NotoSans%5Bwdth,wght%5D.ttf",
+            "fallback": "https://raw.githubusercontent.com/google/fonts/main/ofl/notosans/NotoSans%5Bwdth,wght%5D.ttf"
+        },
+        "Noto Sans Arabic": {
+            "name": "Noto Sans Arabic",
+            "url": "https://github.com/google/fonts/raw/main/ofl/notosansarabic/NotoSansArabic%5Bwdth,wght%5D.ttf",
+            "fallback": "https://raw.githubusercontent.com/google/fonts/main/ofl/notosansarabic/NotoSansArabic%5Bwdth,wght%5D.ttf"
+        },
+        "Noto Sans SC": {
+            "name": "Noto Sans SC",
+            "url": "https://github.com/google/fonts/raw/main/ofl/notosanssc/NotoSansSC%5Bwght%5D.ttf",
+            "fallback": "https://raw.githubusercontent.com/google/fonts/main/ofl/notosanssc/NotoSansSC%5Bwght%5D.ttf"
+        },
+        "Noto Emoji": {
+            "name": "Noto Emoji",
+            "url": "https://github.com/google/fonts/raw/main/ofl/notoemoji/NotoEmoji%5Bwght%5D.ttf",
+            "fallback": "https://raw.githubusercontent.com/google/fonts/main/ofl/notoemoji/NotoEmoji%5Bwght%5D.ttf"
         }
     }
+
+    # Order in which fonts are tried for glyphs the selected font lacks
+    FALLBACK_CHAIN = ["Open Sans", "Noto Sans", "Noto Sans Arabic", "Noto Sans SC", "Noto Emoji"]
     
     def __init__(self, fonts_dir: str = "fonts"):
         self.fonts_dir = Path(fonts_dir)
         self.fonts_dir.mkdir(exist_ok=True)
         self.cache_file = self.fonts_dir / "font_cache.json"
+        self.coverage_file = self.fonts_dir / "coverage_index.json"
         self._load_cache()
         
         # Download essential fonts on init
@@ -119,6 +149,7 @@ class FontManager:
             return font_path
         
         print(f"Downloading font '{font_key}'...")
+        was_installed = font_path.exists()
         
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -144,6 +175,10 @@ class FontManager:
                     }
                     self._save_cache()
                     
+                    # A refreshed file keeps its cmap; only new fonts need re-indexing
+                    if not was_installed:
+                        self._invalidate_coverage_index()
+                    
                     print(f"✅ Successfully downloaded '{font_key}' from {url_type}")
                     return font_path
                     
@@ -203,6 +238,62 @@ class FontManager:
         
         return fonts_status
 
+    def installed_fonts(self) -> Dict[str, Path]:
+        """Font files present on disk, keyed by registry name"""
+        installed = {}
+        for font_key in self.FONT_URLS:
+            font_path = self.fonts_dir / f"{font_key.replace(' ', '')}.ttf"
+            if font_path.exists():
+                installed[font_key] = font_path
+        return installed
+
+    def load_coverage_index(self, rebuild: bool = False) -> FontCoverageIndex:
+        """Load the serialized coverage index, rebuilding it when fonts changed"""
+        global _coverage_index
+
+        if _coverage_index is not None and not rebuild:
+            return _coverage_index
+
+        font_paths = self.installed_fonts()
+        fallback_order = self.FALLBACK_CHAIN + [
+            font_key for font_key in font_paths if font_key not in self.FALLBACK_CHAIN
+        ]
+
+        index = None
+        if not rebuild:
+            index = FontCoverageIndex.load(self.coverage_file, font_paths, fallback_order)
+
+        if index is None:
+            index = FontCoverageIndex.build(font_paths, fallback_order)
+            try:
+                index.save(self.coverage_file)
+            except OSError as e:
+                print(f"Could not save font coverage index: {e}")
+
+        _coverage_index = index
+        return index
+
+    def _invalidate_coverage_index(self):
+        global _coverage_index
+        _coverage_index = None
+
+    def layout_text(self, text: str, font_path: Path, font_size: int) -> TextRunLayout:
+        """Split text into runs of fonts that actually cover each character.
+
+        Each run is shaped by Pillow (with libraqm: Arabic joining and
+        right-to-left order inside the run). Runs themselves are laid out
+        left to right, so a line is always treated as left-to-right text.
+        """
+        index = self.load_coverage_index()
+        preferred = index.key_for_path(font_path)
+
+        runs: List[Tuple[str, object]] = []
+        for run_text, font_key in index.split_runs(text, preferred):
+            run_path = index.path_for_key(font_key) if font_key else font_path
+            runs.append((run_text, load_truetype(str(run_path), font_size)))
+
+        return TextRunLayout(runs or [(text, load_truetype(str(font_path), font_size))])
+
 
 # Standalone script zum Fonts herunterladen
 if __name__ == "__main__":
@@ -1,14 +1,17 @@
 # File: backend/app/services/gemini_service.py
 
+import asyncio
 import google.generativeai as genai
 from PIL import Image
 import io
 import base64
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union, BinaryIO
 import json
 
 from ..core.config import settings
 
+ANALYSIS_MAX_SIZE = 1536
+
 
 class GeminiService:
     def __init__(self):
@@ -20,17 +23,29 @@ class GeminiService:
             print("Warning: Gemini API key not configured. Using default analysis.")
 
     async def analyze_image_for_watermark(
-        self, image_bytes: bytes, watermark_text: str
+        self, image_source: Union[bytes, BinaryIO], watermark_text: str, use_model: bool = True
     ) -> Dict:
-        """Enhanced image analysis for optimal watermark placement"""
+        """Enhanced image analysis for optimal watermark placement.
+        `use_model=False` returns the local default analysis without an API call."""
         
         # If no API key configured, return default analysis
-        if not self.model:
+        if not self.model or not use_model:
             return self._get_default_analysis()
 
-        # Convert bytes to PIL Image
+        # Open as PIL Image (bytes or spooled upload handle)
         try:
-            image = Image.open(io.BytesIO(image_bytes))
+            if isinstance(image_source, (bytes, bytearray, memoryview)):
+                image = Image.open(io.BytesIO(image_source))
+            else:
+                image_source.seek(0)
+                image = Image.open(image_source)
+            # The analysis never needs more than a preview-sized image; let
+            # libjpeg scale during decode instead of decoding full size
+            if image.format == "JPEG":
+                image.draft("RGB", (ANALYSIS_MAX_SIZE, ANALYSIS_MAX_SIZE))
+            # Decode now so the shared handle is free for the renderer afterwards
+            image.load()
+            image.thumbnail((ANALYSIS_MAX_SIZE, ANALYSIS_MAX_SIZE))
         except Exception as e:
             print(f"Error opening image: {e}")
             return self._get_default_analysis()
@@ -107,7 +122,8 @@ class GeminiService:
         """
 
         try:
-            response = self.model.generate_content([prompt, image])
+            # Blocking HTTP call; keep it off the event loop
+            response = await asyncio.to_thread(self.model.generate_content, [prompt, image])
 
             # Parse JSON from response
             response_text = response.text
@@ -0,0 +1,128 @@
+# File: backend/app/services/job_events.py
+
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+from ..core.config import settings
+from ..core.metrics import metrics
+
+job_events_published = metrics.counter(
+    "job_events_published_total", "Job progress events published by stage"
+)
+
+StageCallback = Callable[[str], Awaitable[None]]
+
+
+class JobEventBroker(ABC):
+    """Fan-out of job progress events to a user's WebSocket connections"""
+
+    @abstractmethod
+    async def publish(self, user_id: int, event: Dict) -> None:
+        """Send an event to every subscriber of the user"""
+
+    @abstractmethod
+    def subscribe(self, user_id: int) -> AsyncIterator[Dict]:
+        """Events for the user until the iterator is closed"""
+
+
+class InProcessEventBroker(JobEventBroker):
+    """Stand-in for Redis pub/sub when API and workers share one process"""
+
+    def __init__(self, max_queued: int = 256):
+        self.max_queued = max_queued
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+
+    async def publish(self, user_id: int, event: Dict) -> None:
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A stalled client loses events rather than holding memory
+                pass
+
+    async def subscribe(self, user_id: int) -> AsyncIterator[Dict]:
+        queue: asyncio.Queue = asyncio.Queue(self.max_queued)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+
+class RedisEventBroker(JobEventBroker):
+    """Redis pub/sub, one channel per user, so events from any worker reach
+    the API process holding the user's socket"""
+
+    def __init__(self, client=None, prefix: Optional[str] = None):
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.redis = client
+        self.prefix = f"{prefix or settings.JOB_QUEUE_NAME}:events:"
+
+    async def publish(self, user_id: int, event: Dict) -> None:
+        await self.redis.publish(f"{self.prefix}{user_id}", json.dumps(event))
+
+    async def subscribe(self, user_id: int) -> AsyncIterator[Dict]:
+        channel = f"{self.prefix}{user_id}"
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield json.loads(message["data"])
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.close()
+
+
+_broker: Optional[JobEventBroker] = None
+
+
+def get_event_broker() -> JobEventBroker:
+    global _broker
+    if _broker is None:
+        _broker = RedisEventBroker() if settings.REDIS_URL else InProcessEventBroker()
+    return _broker
+
+
+class JobProgress:
+    """Publishes stage events for one job (or batch item) with timings.
+
+    Called as `await progress("decoded")`; each event carries the time spent
+    in that stage and since the job started. Publishing never fails the job.
+    """
+
+    def __init__(self, user_id: int, job_id: str, **fields):
+        self.user_id = user_id
+        self.job_id = job_id
+        self.fields = fields
+        self.started = time.perf_counter()
+        self._last = self.started
+
+    async def __call__(self, stage: str, **extra) -> None:
+        now = time.perf_counter()
+        event = {
+            "job_id": self.job_id,
+            "stage": stage,
+            "stage_ms": int((now - self._last) * 1000),
+            "elapsed_ms": int((now - self.started) * 1000),
+            "timestamp": time.time(),
+            **self.fields,
+            **extra,
+        }
+        self._last = now
+        try:
+            await get_event_broker().publish(self.user_id, event)
+            job_events_published.inc(stage=stage)
+        except Exception as e:
+            print(f"Error publishing job event: {e}")
@@ -0,0 +1,300 @@
+# File: backend/app/services/job_queue.py
+
+import asyncio
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from ..core.config import settings
+from ..core.metrics import metrics
+
+jobs_total = metrics.counter("jobs_total", "Watermark jobs by final or retry outcome")
+
+# Job states
+QUEUED = "queued"
+PROCESSING = "processing"
+SUCCEEDED = "succeeded"
+DEAD = "dead"  # gave up after JOB_MAX_ATTEMPTS
+
+
+@dataclass
+class Job:
+    id: str
+    payload: Dict
+    attempts: int = 0
+
+
+class JobQueue(ABC):
+    """At-least-once work queue with visibility timeouts.
+
+    A reserved job must be acked or failed before its visibility timeout
+    runs out; otherwise `requeue_expired` hands it to another worker. Failed
+    jobs are retried until JOB_MAX_ATTEMPTS and then dead-lettered.
+    """
+
+    def __init__(self, visibility_timeout: Optional[int] = None, max_attempts: Optional[int] = None):
+        self.visibility_timeout = visibility_timeout or settings.JOB_VISIBILITY_TIMEOUT
+        self.max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+
+    @abstractmethod
+    async def enqueue(self, payload: Dict, user_id: int) -> str:
+        """Store a new job and make it available; returns the job id"""
+
+    @abstractmethod
+    async def reserve(self, timeout: float = 5) -> Optional[Job]:
+        """Take the next job, waiting up to `timeout` seconds"""
+
+    @abstractmethod
+    async def extend(self, job_id: str) -> None:
+        """Push the job's visibility deadline out again (heartbeat)"""
+
+    @abstractmethod
+    async def ack(self, job_id: str, result: Dict) -> None:
+        """Mark a reserved job done"""
+
+    @abstractmethod
+    async def fail(self, job_id: str, error: str) -> bool:
+        """Retry or dead-letter a reserved job; True if it will be retried"""
+
+    @abstractmethod
+    async def requeue_expired(self) -> int:
+        """Return jobs whose visibility timeout ran out; returns the count"""
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict]:
+        """Status record of a job (None once expired or unknown)"""
+
+    @staticmethod
+    def _new_record(payload: Dict, user_id: int) -> Dict:
+        now = time.time()
+        return {
+            "id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "status": QUEUED,
+            "attempts": 0,
+            "payload": payload,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+
+class RedisJobQueue(JobQueue):
+    """Redis lists + a sorted set of visibility deadlines.
+
+    pending -> (BLMOVE) -> processing, with the deadline in `inflight`.
+    Job records are hashes that expire JOB_RESULT_TTL seconds after the job
+    finishes. Any redis.asyncio-compatible client works (fakeredis in tests).
+    """
+
+    def __init__(self, client=None, name: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.redis = client
+        prefix = name or settings.JOB_QUEUE_NAME
+        self.pending_key = f"{prefix}:pending"
+        self.processing_key = f"{prefix}:processing"
+        self.inflight_key = f"{prefix}:inflight"
+        self.dead_key = f"{prefix}:dead"
+        self.job_prefix = f"{prefix}:job:"
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.job_prefix}{job_id}"
+
+    async def enqueue(self, payload: Dict, user_id: int) -> str:
+        record = self._new_record(payload, user_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._job_key(record["id"]), mapping=self._encode(record))
+            pipe.lpush(self.pending_key, record["id"])
+            await pipe.execute()
+        return record["id"]
+
+    async def reserve(self, timeout: float = 5) -> Optional[Job]:
+        job_id = await self.redis.blmove(
+            self.pending_key, self.processing_key, timeout, "RIGHT", "LEFT"
+        )
+        if job_id is None:
+            return None
+
+        key = self._job_key(job_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.inflight_key, {job_id: time.time() + self.visibility_timeout})
+            pipe.hincrby(key, "attempts", 1)
+            pipe.hset(key, mapping={"status": PROCESSING, "updated_at": time.time()})
+            pipe.hget(key, "payload")
+            _, attempts, _, payload = await pipe.execute()
+
+        if payload is None:
+            # Record expired or was removed; drop the orphaned id
+            await self._release(job_id)
+            return None
+        return Job(id=job_id, payload=json.loads(payload), attempts=attempts)
+
+    async def extend(self, job_id: str) -> None:
+        await self.redis.zadd(
+            self.inflight_key, {job_id: time.time() + self.visibility_timeout}, xx=True
+        )
+
+    async def _release(self, job_id: str) -> bool:
+        """Remove a job from processing; False if someone else already did"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.inflight_key, job_id)
+            pipe.lrem(self.processing_key, 1, job_id)
+            removed, _ = await pipe.execute()
+        return bool(removed)
+
+    async def ack(self, job_id: str, result: Dict) -> None:
+        await self._release(job_id)
+        key = self._job_key(job_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={
+                "status": SUCCEEDED,
+                "result": json.dumps(result),
+                "updated_at": time.time(),
+            })
+            pipe.expire(key, settings.JOB_RESULT_TTL)
+            await pipe.execute()
+        jobs_total.inc(outcome=SUCCEEDED)
+
+    async def fail(self, job_id: str, error: str) -> bool:
+        if not await self._release(job_id):
+            # The reaper already took the job back after its timeout
+            return True
+        return await self._retry_or_bury(job_id, error)
+
+    async def _retry_or_bury(self, job_id: str, error: str) -> bool:
+        key = self._job_key(job_id)
+        attempts = int(await self.redis.hget(key, "attempts") or 0)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if attempts < self.max_attempts:
+                pipe.hset(key, mapping={"status": QUEUED, "error": error, "updated_at": time.time()})
+                pipe.lpush(self.pending_key, job_id)
+                retry = True
+            else:
+                pipe.hset(key, mapping={"status": DEAD, "error": error, "updated_at": time.time()})
+                pipe.lpush(self.dead_key, job_id)
+                pipe.expire(key, settings.JOB_RESULT_TTL)
+                retry = False
+            await pipe.execute()
+
+        jobs_total.inc(outcome="retried" if retry else DEAD)
+        return retry
+
+    async def requeue_expired(self) -> int:
+        expired = await self.redis.zrangebyscore(self.inflight_key, "-inf", time.time())
+        count = 0
+        for job_id in expired:
+            # _release decides which reaper owns the job when several run at once
+            if await self._release(job_id):
+                await self._retry_or_bury(job_id, "Visibility timeout expired")
+                count += 1
+        return count
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        record = await self.redis.hgetall(self._job_key(job_id))
+        return self._decode(record) if record else None
+
+    async def dead_letters(self, limit: int = 100) -> List[str]:
+        return await self.redis.lrange(self.dead_key, 0, limit - 1)
+
+    @staticmethod
+    def _encode(record: Dict) -> Dict:
+        return {
+            k: json.dumps(v) if k in ("payload", "result") else ("" if v is None else v)
+            for k, v in record.items()
+        }
+
+    @staticmethod
+    def _decode(record: Dict) -> Dict:
+        decoded = dict(record)
+        for k in ("payload", "result"):
+            decoded[k] = json.loads(record[k]) if record.get(k) else None
+        for k in ("user_id", "attempts"):
+            decoded[k] = int(record.get(k) or 0)
+        for k in ("created_at", "updated_at"):
+            decoded[k] = float(record.get(k) or 0)
+        decoded["error"] = record.get("error") or None
+        return decoded
+
+
+class InMemoryJobQueue(JobQueue):
+    """Single-process queue with the same semantics, used when REDIS_URL is
+    not set (development, tests); jobs are lost on restart"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._records: Dict[str, Dict] = {}
+        self._pending: "asyncio.Queue[str]" = asyncio.Queue()
+        self._inflight: Dict[str, float] = {}
+        self._dead: List[str] = []
+
+    async def enqueue(self, payload: Dict, user_id: int) -> str:
+        record = self._new_record(payload, user_id)
+        self._records[record["id"]] = record
+        self._pending.put_nowait(record["id"])
+        return record["id"]
+
+    async def reserve(self, timeout: float = 5) -> Optional[Job]:
+        try:
+            job_id = await asyncio.wait_for(self._pending.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        record = self._records[job_id]
+        record["attempts"] += 1
+        record["status"] = PROCESSING
+        record["updated_at"] = time.time()
+        self._inflight[job_id] = time.time() + self.visibility_timeout
+        return Job(id=job_id, payload=record["payload"], attempts=record["attempts"])
+
+    async def extend(self, job_id: str) -> None:
+        if job_id in self._inflight:
+            self._inflight[job_id] = time.time() + self.visibility_timeout
+
+    async def ack(self, job_id: str, result: Dict) -> None:
+        self._inflight.pop(job_id, None)
+        self._records[job_id].update(status=SUCCEEDED, result=result, updated_at=time.time())
+        jobs_total.inc(outcome=SUCCEEDED)
+
+    async def fail(self, job_id: str, error: str) -> bool:
+        if self._inflight.pop(job_id, None) is None:
+            # The reaper already took the job back after its timeout
+            return True
+        record = self._records[job_id]
+        retry = record["attempts"] < self.max_attempts
+        record.update(status=QUEUED if retry else DEAD, error=error, updated_at=time.time())
+        if retry:
+            self._pending.put_nowait(job_id)
+        else:
+            self._dead.append(job_id)
+        jobs_total.inc(outcome="retried" if retry else DEAD)
+        return retry
+
+    async def requeue_expired(self) -> int:
+        now = time.time()
+        expired = [job_id for job_id, deadline in self._inflight.items() if deadline <= now]
+        for job_id in expired:
+            await self.fail(job_id, "Visibility timeout expired")
+        return len(expired)
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        record = self._records.get(job_id)
+        return dict(record) if record else None
+
+
+_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide queue: Redis when REDIS_URL is set, else in-memory"""
+    global _queue
+    if _queue is None:
+        _queue = RedisJobQueue() if settings.REDIS_URL else InMemoryJobQueue()
+    return _queue
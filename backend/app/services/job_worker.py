@@ -0,0 +1,189 @@
+# File: backend/app/services/job_worker.py
+
+import asyncio
+import contextlib
+import logging
+import time
+from datetime import date
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.user import User
+from ..models.watermark import Watermark
+from .admission import get_admission_controller
+from .analysis_store import get_analysis_store
+from .font_manager import FontManager
+from .job_events import JobProgress
+from .job_queue import Job, JobQueue, get_job_queue
+from .render_pool import set_render_context
+from .stats_service import StatsService
+from .storage_service import ContentAddressedStore, get_storage
+from .usage_service import UsageService
+from .watermark_service import WatermarkService
+
+logger = logging.getLogger(__name__)
+
+
+class WatermarkJobWorker:
+    """Consumes watermark jobs submitted by /create?async_job.
+
+    The job payload points at the original already in storage (the job
+    holds one reference to it, which the new Watermark row takes over) and
+    its use of the daily limit was reserved at submit. Delivery is
+    at-least-once: a worker that dies after committing but before acking
+    leaves the job to be processed again, so the row is keyed by the job id
+    and a re-run returns the existing one.
+    """
+
+    def __init__(self, queue: Optional[JobQueue] = None, concurrency: Optional[int] = None):
+        self.queue = queue or get_job_queue()
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+
+    async def _existing(self, job_id: str) -> Optional[int]:
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(Watermark.id).where(Watermark.job_id == job_id))
+
+    async def handle(self, job: Job, progress: JobProgress) -> Dict:
+        payload = job.payload
+        # Already done by an earlier delivery of this job
+        watermark_id = await self._existing(job.id)
+        if watermark_id is not None:
+            return {"watermark_id": watermark_id}
+
+        start_time = time.time()
+        set_render_context(payload["user_id"], payload["user_tier"])
+
+        storage = get_storage()
+        original_key = storage.key_from_url(payload["original_url"])
+        if not original_key:
+            raise ValueError("Original image is not in storage")
+        data = await storage.read(original_key)
+
+        # Jobs wait for render capacity rather than being turned away
+        pixels = payload["image_width"] * payload["image_height"]
+        async with get_admission_controller().reserve(pixels):
+            output, ai_analysis = await WatermarkService().apply_intelligent_watermark(
+                data, payload["watermark_text"], payload["user_tier"],
+                on_stage=progress, **payload["options"]
+            )
+
+        async with AsyncSessionLocal() as db:
+            user = await db.get(User, payload["user_id"])
+            if not user:
+                raise ValueError("User no longer exists")
+
+            store = ContentAddressedStore()
+            try:
+                watermarked_url = await store.put(db, output, "png", "image/png")
+                analysis_columns = await get_analysis_store().columns(db, ai_analysis)
+            except Exception:
+                await store.rollback(db)
+                raise
+            watermark = Watermark(
+                user_id=user.id,
+                original_image_url=payload["original_url"],
+                watermarked_image_url=watermarked_url,
+                watermark_text=payload["watermark_text"],
+                placement_data=payload["placement_data"],
+                image_width=payload["image_width"],
+                image_height=payload["image_height"],
+                file_size=output.nbytes,
+                processing_time=int((time.time() - start_time) * 1000),
+                job_id=job.id,
+                **analysis_columns,
+            )
+            db.add(watermark)
+            await StatsService().record_watermarks(db, user.id)
+            try:
+                await store.commit(db)
+            except IntegrityError:
+                # Another delivery of the job committed first
+                await store.rollback(db)
+                watermark_id = await self._existing(job.id)
+                if watermark_id is None:
+                    raise
+                return {"watermark_id": watermark_id}
+            except Exception:
+                await store.rollback(db)
+                raise
+            await progress("stored")
+            return {"watermark_id": watermark.id}
+
+    async def _release_original(self, payload: Dict) -> None:
+        """A dead-lettered job gives up its reference to the original and
+        the use reserved for it"""
+        async with AsyncSessionLocal() as db:
+            try:
+                store = ContentAddressedStore()
+                await store.release(db, payload["original_url"])
+                await store.commit(db)
+            except Exception as e:
+                print(f"Error releasing original for dead job: {e}")
+            # Jobs queued before usage was reserved at submit carry no day
+            if payload.get("usage_day"):
+                try:
+                    await UsageService().refund(
+                        db, payload["user_id"], 1, date.fromisoformat(payload["usage_day"])
+                    )
+                except Exception as e:
+                    print(f"Error refunding usage for dead job: {e}")
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.queue.visibility_timeout / 3)
+            await self.queue.extend(job_id)
+
+    async def process(self, job: Job) -> None:
+        progress = JobProgress(job.payload["user_id"], job.id, attempt=job.attempts)
+        await progress("processing")
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            result = await self.handle(job, progress)
+        except Exception as e:
+            logger.warning(f"Job {job.id} attempt {job.attempts} failed: {e}")
+            error = str(e) or type(e).__name__
+            if await self.queue.fail(job.id, error):
+                await progress("queued", status="retrying", error=error)
+            else:
+                await self._release_original(job.payload)
+                await progress("failed", status="dead", error=error)
+        else:
+            await self.queue.ack(job.id, result)
+            await progress("succeeded", status="succeeded", **result)
+        finally:
+            heartbeat.cancel()
+
+    async def _consume(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                job = await self.queue.reserve(timeout=settings.JOB_POLL_TIMEOUT)
+            except Exception as e:
+                logger.error(f"Job queue unavailable: {e}")
+                await asyncio.sleep(settings.JOB_POLL_TIMEOUT)
+                continue
+            if job:
+                await self.process(job)
+
+    async def _reap(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), settings.JOB_REAP_INTERVAL)
+            try:
+                requeued = await self.queue.requeue_expired()
+                if requeued:
+                    logger.info(f"Requeued {requeued} expired jobs")
+            except Exception as e:
+                logger.error(f"Job reaper error: {e}")
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Consume until `stop` is set; jobs in progress are finished"""
+        FontManager().load_coverage_index()
+        logger.info(f"Watermark worker started with {self.concurrency} consumers")
+        await asyncio.gather(
+            self._reap(stop),
+            *[self._consume(stop) for _ in range(self.concurrency)],
+        )
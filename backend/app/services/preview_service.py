@@ -0,0 +1,176 @@
+# File: backend/app/services/preview_service.py
+
+import asyncio
+import contextlib
+import copy
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Hashable, Iterator, Optional, Tuple
+
+from PIL import Image
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..utils.image_processor import ImageProbe
+from ..utils.uploads import SpooledUpload, copy_to_tempfile
+from .render_pool import run_render
+from .watermark_service import WatermarkService
+
+preview_render_seconds = metrics.histogram(
+    "preview_render_seconds", "Time to render a preview from the session proxy"
+)
+preview_sessions_active = metrics.gauge(
+    "preview_sessions_active", "Preview sessions held in memory"
+)
+
+
+@dataclass
+class PreviewSession:
+    """An upload decoded once and kept for repeated parameter-only renders.
+
+    `original` is a private copy of the upload (the request's spooled file is
+    closed once the request ends); `proxy` is the downscaled RGBA decode that
+    previews are drawn on. While a commit has the session pinned, eviction
+    leaves `original` open; the last unpin closes it.
+    """
+
+    id: str
+    user_id: int
+    user_tier: str
+    original: BinaryIO
+    probe: ImageProbe
+    sha256: str
+    size: int
+    proxy: Image.Image
+    analysis: Dict
+    commit_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    pins: int = 0
+    evicted: bool = False
+
+
+def _close_session(_key: Hashable, session: PreviewSession) -> None:
+    owned = _user_sessions.get(session.user_id)
+    if owned is not None:
+        owned.pop(session.id, None)
+        if not owned:
+            del _user_sessions[session.user_id]
+    session.evicted = True
+    if not session.pins:
+        session.original.close()
+    preview_sessions_active.dec()
+
+
+# In-process: with several workers, preview requests need sticky sessions
+_sessions: TTLCache[PreviewSession] = TTLCache(
+    settings.PREVIEW_MAX_SESSIONS, settings.PREVIEW_SESSION_TTL, on_evict=_close_session
+)
+# user id -> that user's session ids, oldest first
+_user_sessions: Dict[int, "OrderedDict[str, None]"] = {}
+
+
+class PreviewService:
+    """Fast previews on a cached proxy; the full-resolution render happens
+    once, on commit, from the cached original"""
+
+    def __init__(self):
+        self.watermark_service = WatermarkService()
+
+    async def create_session(
+        self,
+        upload: SpooledUpload,
+        probe: ImageProbe,
+        user_id: int,
+        user_tier: str,
+        watermark_text: str = "",
+    ) -> PreviewSession:
+        original = await asyncio.to_thread(copy_to_tempfile, upload.rewind())
+        try:
+            proxy = await run_render(
+                self.watermark_service.decode_image,
+                original, user_tier, probe, settings.PREVIEW_PROXY_SIZE,
+            )
+            # One Gemini call per session; previews and the commit reuse it
+            analysis = await self.watermark_service.gemini_service.analyze_image_for_watermark(
+                original, watermark_text
+            )
+        except Exception:
+            original.close()
+            raise
+
+        # One user cannot take over the shared cache: their oldest sessions go first
+        owned = list(_user_sessions.get(user_id, ()))
+        for session_id in owned[:max(0, len(owned) - settings.PREVIEW_MAX_SESSIONS_PER_USER + 1)]:
+            _sessions.pop(session_id)
+
+        session = PreviewSession(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            user_tier=user_tier,
+            original=original,
+            probe=probe,
+            sha256=upload.sha256,
+            size=upload.size,
+            proxy=proxy,
+            analysis=analysis,
+        )
+        _sessions.set(session.id, session)
+        _user_sessions.setdefault(user_id, OrderedDict())[session.id] = None
+        preview_sessions_active.inc()
+        return session
+
+    def get_session(self, session_id: str, user_id: int) -> Optional[PreviewSession]:
+        """Live session owned by the user; access extends its TTL"""
+        session = _sessions.get(session_id, touch=True)
+        if session is None or session.user_id != user_id:
+            return None
+        return session
+
+    def close_session(self, session_id: str) -> None:
+        _sessions.pop(session_id)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def pinned(session: PreviewSession) -> Iterator[PreviewSession]:
+        """Keep the session's original open while it is in use, even if the
+        session is evicted meanwhile"""
+        session.pins += 1
+        try:
+            yield session
+        finally:
+            session.pins -= 1
+            if session.evicted and not session.pins:
+                session.original.close()
+
+    def _render_preview(self, session: PreviewSession, watermark_text: str, options: Dict) -> memoryview:
+        # Renders only read the proxy, so concurrent previews can share it
+        watermarked = self.watermark_service.render(
+            session.proxy, watermark_text, session.user_tier,
+            copy.deepcopy(session.analysis), **options
+        )
+        return self.watermark_service.encode(
+            watermarked, format="JPEG", quality=settings.PREVIEW_JPEG_QUALITY
+        )
+
+    async def render_preview(
+        self, session: PreviewSession, watermark_text: str, options: Dict
+    ) -> memoryview:
+        start = time.perf_counter()
+        preview = await run_render(self._render_preview, session, watermark_text, options)
+        preview_render_seconds.observe(time.perf_counter() - start)
+        return preview
+
+    async def render_full(
+        self, session: PreviewSession, watermark_text: str, options: Dict
+    ) -> Tuple[memoryview, Dict]:
+        """Full-resolution render from the cached original"""
+        return await self.watermark_service.apply_intelligent_watermark(
+            session.original,
+            watermark_text,
+            session.user_tier,
+            probe=session.probe,
+            analysis=copy.deepcopy(session.analysis),
+            **options,
+        )
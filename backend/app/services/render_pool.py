@@ -0,0 +1,197 @@
+# File: backend/app/services/render_pool.py
+
+import asyncio
+import functools
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..models.user import SubscriptionTier
+
+T = TypeVar("T")
+
+render_queue_wait = metrics.histogram(
+    "render_queue_wait_seconds", "Time a render step waited for a worker, by tier"
+)
+render_queue_depth = metrics.gauge("render_queue_depth", "Render steps waiting, by tier")
+render_running = metrics.gauge("render_running", "Render steps running on the pool")
+
+# Decode, draw and encode are CPU bound; Pillow releases the GIL for most of
+# that work, so a thread pool keeps it off the event loop without pickling
+_executor: Optional[ThreadPoolExecutor] = None
+
+# (user_id, tier) of the request a render step belongs to. Set once per
+# request/job; tasks spawned from it (gather, create_task) inherit it.
+_render_context: ContextVar[Tuple[Optional[int], str]] = ContextVar(
+    "render_context", default=(None, SubscriptionTier.FREE.value)
+)
+
+
+def set_render_context(user_id: Optional[int], tier: str) -> None:
+    """Attribute subsequent render steps of this request to a user and tier"""
+    _render_context.set((user_id, tier))
+
+
+def get_render_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.RENDER_WORKERS, thread_name_prefix="render"
+        )
+    return _executor
+
+
+@dataclass
+class _Ticket:
+    tier: str
+    user_id: Optional[int]
+    granted: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class RenderScheduler:
+    """Weighted fair queuing of render steps across subscription tiers.
+
+    Each tier has its own FIFO queue and a virtual clock that advances by
+    1/weight per dispatched step, so under contention tiers get pool slots
+    in proportion to RENDER_TIER_WEIGHTS. A user never holds more than
+    RENDER_USER_MAX_CONCURRENCY slots, and a step that has waited longer than
+    RENDER_MAX_QUEUE_WAIT is served next regardless of weights, so free
+    requests can be slowed down but not starved.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        weights: Dict[str, float],
+        user_limit: int,
+        max_wait: float,
+    ):
+        self.workers = workers
+        self.weights = weights
+        self.user_limit = user_limit
+        self.max_wait = max_wait
+        self.queues: Dict[str, Deque[_Ticket]] = {tier: deque() for tier in weights}
+        self.passes: Dict[str, float] = {tier: 0.0 for tier in weights}
+        self.virtual_time = 0.0
+        self.running = 0
+        self.user_running: Dict[Optional[int], int] = defaultdict(int)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+    def _tier_for(self, tier: str) -> str:
+        if tier in self.queues:
+            return tier
+        # Unknown tiers get the lowest weight
+        return min(self.weights, key=self.weights.get)
+
+    def _eligible(self, ticket: _Ticket) -> bool:
+        return ticket.user_id is None or self.user_running[ticket.user_id] < self.user_limit
+
+    def _next(self) -> Optional[_Ticket]:
+        candidates = []
+        for tier, queue in self.queues.items():
+            ticket = next((t for t in queue if self._eligible(t)), None)
+            if ticket is not None:
+                candidates.append(ticket)
+        if not candidates:
+            return None
+
+        now = time.monotonic()
+        starving = [t for t in candidates if now - t.enqueued_at > self.max_wait]
+        if starving:
+            ticket = min(starving, key=lambda t: t.enqueued_at)
+        else:
+            ticket = min(candidates, key=lambda t: self.passes[t.tier])
+
+        self.queues[ticket.tier].remove(ticket)
+        self.virtual_time = self.passes[ticket.tier]
+        self.passes[ticket.tier] += 1.0 / self.weights[ticket.tier]
+        return ticket
+
+    def _dispatch(self) -> None:
+        while self.running < self.workers:
+            ticket = self._next()
+            if ticket is None:
+                break
+            self.running += 1
+            self.user_running[ticket.user_id] += 1
+            render_queue_depth.set(len(self.queues[ticket.tier]), tier=ticket.tier)
+            render_running.set(self.running)
+            ticket.granted.set_result(None)
+
+    def _release(self, ticket: _Ticket) -> None:
+        self.running -= 1
+        self.user_running[ticket.user_id] -= 1
+        if not self.user_running[ticket.user_id]:
+            del self.user_running[ticket.user_id]
+        render_running.set(self.running)
+        self._dispatch()
+
+    async def run(self, fn: Callable[[], T], tier: str, user_id: Optional[int]) -> T:
+        loop = asyncio.get_running_loop()
+        tier = self._tier_for(tier)
+        ticket = _Ticket(tier=tier, user_id=user_id, granted=loop.create_future())
+
+        queue = self.queues[tier]
+        if not queue:
+            # An idle tier re-enters at the current virtual time instead of
+            # cashing in credit for the time it was idle
+            self.passes[tier] = max(self.passes[tier], self.virtual_time)
+        queue.append(ticket)
+        render_queue_depth.set(len(queue), tier=tier)
+        self._dispatch()
+
+        try:
+            await ticket.granted
+        except asyncio.CancelledError:
+            if ticket in queue:
+                queue.remove(ticket)
+                render_queue_depth.set(len(queue), tier=tier)
+            elif ticket.granted.done() and not ticket.granted.cancelled():
+                self._release(ticket)
+            raise
+
+        render_queue_wait.observe(time.monotonic() - ticket.enqueued_at, tier=tier)
+        try:
+            return await loop.run_in_executor(get_render_executor(), fn)
+        finally:
+            self._release(ticket)
+
+
+_scheduler: Optional[RenderScheduler] = None
+
+
+def get_render_scheduler() -> RenderScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RenderScheduler(
+            workers=settings.RENDER_WORKERS,
+            weights=settings.RENDER_TIER_WEIGHTS,
+            user_limit=settings.RENDER_USER_MAX_CONCURRENCY,
+            max_wait=settings.RENDER_MAX_QUEUE_WAIT,
+        )
+    return _scheduler
+
+
+async def run_render(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking image operation on the render pool, scheduled by the
+    tier and user of the current render context"""
+    user_id, tier = _render_context.get()
+    return await get_render_scheduler().run(
+        functools.partial(fn, *args, **kwargs), tier, user_id
+    )
+
+
+def shutdown_render_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
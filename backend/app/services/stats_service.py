@@ -0,0 +1,148 @@
+# File: backend/app/services/stats_service.py
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select, true
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.stats import DailyActiveUser, DailyStats
+from ..models.user import SubscriptionTier, User
+
+# Admin dashboard responses; a few seconds of staleness is fine there
+_responses: TTLCache[object] = TTLCache(64, settings.ADMIN_STATS_CACHE_TTL)
+
+
+def _insert(db: AsyncSession, model):
+    """INSERT with ON CONFLICT support for the configured database"""
+    dialect = db.get_bind().dialect.name
+    return (postgresql.insert if dialect == "postgresql" else sqlite.insert)(model)
+
+
+class StatsService:
+    """Maintains the daily rollup and answers the admin dashboard from it.
+
+    The record_* calls run in the caller's transaction, so the rollup
+    commits (or rolls back) together with the rows it counts. Days are UTC.
+    """
+
+    async def record_watermarks(
+        self, db: AsyncSession, user_id: int, count: int = 1, day: Optional[date] = None
+    ) -> None:
+        """Count created (or, with a negative count, deleted) watermarks"""
+        day = day or datetime.utcnow().date()
+        stmt = _insert(db, DailyStats).values(day=day, watermarks=count)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[DailyStats.day],
+            set_={"watermarks": DailyStats.watermarks + stmt.excluded.watermarks},
+        ))
+        if count > 0:
+            await db.execute(
+                _insert(db, DailyActiveUser).values(day=day, user_id=user_id).on_conflict_do_nothing()
+            )
+
+    async def record_payment(self, db: AsyncSession, amount: Decimal, day: Optional[date] = None) -> None:
+        day = day or datetime.utcnow().date()
+        stmt = _insert(db, DailyStats).values(day=day, payments=1, revenue=amount)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[DailyStats.day],
+            set_={
+                "payments": DailyStats.payments + stmt.excluded.payments,
+                "revenue": DailyStats.revenue + stmt.excluded.revenue,
+            },
+        ))
+
+    async def summary(self, db: AsyncSession) -> Dict:
+        """Dashboard totals in a single statement (users are counted live)"""
+        cached = _responses.get("summary")
+        if cached is not None:
+            return cached
+
+        today = datetime.utcnow().date()
+        week_ago = today - timedelta(days=7)
+        month_ago = today - timedelta(days=30)
+
+        def tier_count(tier: SubscriptionTier):
+            return func.count().filter(User.subscription_tier == tier)
+
+        def watermarks_since(since: date):
+            return func.coalesce(func.sum(DailyStats.watermarks).filter(DailyStats.day >= since), 0)
+
+        users = select(
+            func.count().label("total_users"),
+            tier_count(SubscriptionTier.FREE).label("free_users"),
+            tier_count(SubscriptionTier.PRO).label("pro_users"),
+            tier_count(SubscriptionTier.ELITE).label("elite_users"),
+        ).subquery()
+        rollup = select(
+            func.coalesce(func.sum(DailyStats.watermarks), 0).label("total_watermarks"),
+            watermarks_since(today).label("watermarks_today"),
+            watermarks_since(week_ago).label("watermarks_this_week"),
+            watermarks_since(month_ago).label("watermarks_this_month"),
+            func.coalesce(func.sum(DailyStats.revenue), 0).label("total_revenue"),
+            func.coalesce(
+                func.sum(DailyStats.revenue).filter(DailyStats.day >= month_ago), 0
+            ).label("revenue_this_month"),
+        ).subquery()
+        active = select(
+            func.count().filter(DailyActiveUser.day == today).label("active_users_today"),
+            func.count(func.distinct(DailyActiveUser.user_id)).label("active_users_this_week"),
+        ).where(DailyActiveUser.day >= week_ago).subquery()
+
+        row = (await db.execute(
+            select(users, rollup, active).select_from(
+                users.join(rollup, true()).join(active, true())
+            )
+        )).mappings().one()
+
+        result = dict(row)
+        result["total_revenue"] = float(result["total_revenue"])
+        result["revenue_this_month"] = float(result["revenue_this_month"])
+        _responses.set("summary", result)
+        return result
+
+    async def daily(self, db: AsyncSession, days: int) -> List[Dict]:
+        """Per-day series for the last `days` days, oldest first, gaps as zeros"""
+        cache_key = ("daily", days)
+        cached = _responses.get(cache_key)
+        if cached is not None:
+            return cached
+
+        today = datetime.utcnow().date()
+        since = today - timedelta(days=days - 1)
+        active = (
+            select(DailyActiveUser.day, func.count().label("active_users"))
+            .where(DailyActiveUser.day >= since)
+            .group_by(DailyActiveUser.day)
+            .subquery()
+        )
+        rows = (await db.execute(
+            select(
+                DailyStats.day,
+                DailyStats.watermarks,
+                DailyStats.payments,
+                DailyStats.revenue,
+                func.coalesce(active.c.active_users, 0).label("active_users"),
+            )
+            .outerjoin(active, active.c.day == DailyStats.day)
+            .where(DailyStats.day >= since)
+        )).all()
+        by_day = {row.day: row for row in rows}
+
+        result = []
+        for offset in range(days):
+            day = since + timedelta(days=offset)
+            row = by_day.get(day)
+            result.append({
+                "day": day,
+                "watermarks": row.watermarks if row else 0,
+                "active_users": row.active_users if row else 0,
+                "payments": row.payments if row else 0,
+                "revenue": float(row.revenue) if row else 0.0,
+            })
+        _responses.set(cache_key, result)
+        return result
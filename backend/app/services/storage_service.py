@@ -0,0 +1,394 @@
+# File: backend/app/services/storage_service.py
+
+import asyncio
+import hashlib
+import io
+import os
+import re
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Union
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..core.config import settings
+from ..core.security import sign_media_path
+from ..models.storage import StoredObject
+
+StorageData = Union[bytes, memoryview, BinaryIO]
+
+COPY_CHUNK_SIZE = 64 * 1024
+
+# Content-addressed objects never change, so they can be cached forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+CONTENT_KEY_PATTERN = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.[a-z0-9]+$")
+
+
+class StorageError(Exception):
+    """Raised when a storage backend cannot complete an operation"""
+
+
+class StorageBackend(ABC):
+    """Where original and watermarked images live.
+
+    Objects are addressed by a relative key (e.g. "abc_watermarked.png"); the
+    public URL stored on a Watermark row is derived from that key.
+    """
+
+    @abstractmethod
+    async def save(
+        self, key: str, data: StorageData, content_type: str, cache_control: Optional[str] = None
+    ) -> str:
+        """Store an object and return its public URL"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove an object; missing objects are ignored"""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Check whether an object is stored"""
+
+    @abstractmethod
+    async def read(self, key: str) -> bytes:
+        """Fetch an object's content"""
+
+    @abstractmethod
+    def url_for(self, key: str) -> str:
+        """Public URL of an object"""
+
+    @abstractmethod
+    def signed_url(self, key: str, ttl_seconds: int) -> str:
+        """Expiring URL that lets a client fetch the object without auth"""
+
+    @abstractmethod
+    def key_from_url(self, url: str) -> Optional[str]:
+        """Inverse of url_for; None for URLs this backend does not own"""
+
+
+class LocalStorageBackend(StorageBackend):
+    """Files under settings.UPLOAD_DIR, delivered through signed /media links
+    and X-Accel-Redirect (the /static URLs only identify them). Blocking file I/O
+    runs in worker threads so the event loop keeps serving requests."""
+
+    def __init__(self, root: Optional[str] = None, url_prefix: str = "/static/watermarks/"):
+        self.root = Path(root or settings.UPLOAD_DIR).resolve()
+        self.url_prefix = url_prefix
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        # Keys must never escape the upload directory
+        if self.root not in path.parents:
+            raise StorageError(f"Invalid storage key: {key}")
+        return path
+
+    def _write(self, path: Path, data: StorageData) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                if isinstance(data, (bytes, bytearray, memoryview)):
+                    f.write(data)
+                else:
+                    data.seek(0)
+                    shutil.copyfileobj(data, f, COPY_CHUNK_SIZE)
+            # Readers never observe a partially written file
+            os.replace(tmp_path, path)
+        except Exception:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+
+    async def save(
+        self, key: str, data: StorageData, content_type: str, cache_control: Optional[str] = None
+    ) -> str:
+        # Cache headers for local files are set by the static file handler
+        await asyncio.to_thread(self._write, self.path_for(key), data)
+        return self.url_for(key)
+
+    async def delete(self, key: str) -> None:
+        path = self.path_for(key)
+        try:
+            await asyncio.to_thread(path.unlink)
+        except FileNotFoundError:
+            pass
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self.path_for(key).exists)
+
+    async def read(self, key: str) -> bytes:
+        return await asyncio.to_thread(self.path_for(key).read_bytes)
+
+    def url_for(self, key: str) -> str:
+        return f"{self.url_prefix}{key}"
+
+    def signed_url(self, key: str, ttl_seconds: int) -> str:
+        # Verified by nginx secure_link (or the /media fallback route)
+        url, _ = sign_media_path(f"/media/{key}", ttl_seconds)
+        return url
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        if not url or not url.startswith(self.url_prefix):
+            return None
+        key = url[len(self.url_prefix):]
+        try:
+            self.path_for(key)
+        except StorageError:
+            return None
+        return key
+
+
+class S3StorageBackend(StorageBackend):
+    """S3-compatible object storage (AWS S3, MinIO, or moto in tests).
+
+    boto3 is synchronous, so every call is offloaded to a worker thread.
+    """
+
+    def __init__(self):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise StorageError("boto3 is required for STORAGE_BACKEND=s3")
+
+        if not settings.S3_BUCKET:
+            raise StorageError("S3_BUCKET must be set for STORAGE_BACKEND=s3")
+
+        self._client_error = ClientError
+        self.bucket = settings.S3_BUCKET
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.S3_REGION or None,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+        )
+
+        if settings.S3_PUBLIC_URL:
+            self.public_url = settings.S3_PUBLIC_URL.rstrip("/")
+        elif settings.S3_ENDPOINT_URL:
+            self.public_url = f"{settings.S3_ENDPOINT_URL.rstrip('/')}/{self.bucket}"
+        else:
+            self.public_url = f"https://{self.bucket}.s3.amazonaws.com"
+
+    def _put(self, key: str, data: StorageData, content_type: str, cache_control: Optional[str]) -> None:
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            body = io.BytesIO(data)
+        else:
+            data.seek(0)
+            body = data
+        extra_args = {"ContentType": content_type}
+        if cache_control:
+            extra_args["CacheControl"] = cache_control
+        self.client.upload_fileobj(body, self.bucket, key, ExtraArgs=extra_args)
+
+    async def save(
+        self, key: str, data: StorageData, content_type: str, cache_control: Optional[str] = None
+    ) -> str:
+        await asyncio.to_thread(self._put, key, data, content_type, cache_control)
+        return self.url_for(key)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._exists, key)
+
+    def _read(self, key: str) -> bytes:
+        response = self.client.get_object(Bucket=self.bucket, Key=key)
+        return response["Body"].read()
+
+    async def read(self, key: str) -> bytes:
+        return await asyncio.to_thread(self._read, key)
+
+    def url_for(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    def signed_url(self, key: str, ttl_seconds: int) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=ttl_seconds,
+        )
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        prefix = f"{self.public_url}/"
+        if not url or not url.startswith(prefix):
+            return None
+        return url[len(prefix):]
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """Process-wide storage backend selected by settings.STORAGE_BACKEND"""
+    global _storage
+    if _storage is None:
+        if settings.STORAGE_BACKEND == "s3":
+            _storage = S3StorageBackend()
+        else:
+            _storage = LocalStorageBackend()
+    return _storage
+
+
+def content_key(sha256: str, ext: str) -> str:
+    """Fan-out key for a content hash: ab/cd/abcd...ef.ext"""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}.{ext}"
+
+
+def _hash_data(data: StorageData) -> str:
+    digest = hashlib.sha256()
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        digest.update(data)
+    else:
+        data.seek(0)
+        for chunk in iter(lambda: data.read(COPY_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        data.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStore:
+    """Deduplicating layer over a StorageBackend.
+
+    Objects are named by their SHA-256 and reference counted in the
+    stored_objects table, so identical uploads and outputs are stored once
+    and only removed when the last watermark using them is deleted. Counter
+    updates join the caller's transaction. An AsyncSession allows one
+    operation at a time, so counter updates through one store are
+    serialised; the file writes still run concurrently.
+
+    Backend objects follow the transaction's outcome: callers finish with
+    commit() or rollback() on the store, which deletes released objects
+    only after the commit and removes objects written by put() when the
+    transaction is rolled back.
+    """
+
+    def __init__(self, backend: Optional[StorageBackend] = None):
+        self.backend = backend or get_storage()
+        self._db_lock = asyncio.Lock()
+        self._written: List[str] = []
+        self._released: List[str] = []
+
+    def _insert(self, db: AsyncSession):
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(StoredObject)
+        if dialect == "sqlite":
+            return sqlite.insert(StoredObject)
+        return None
+
+    async def _acquire(
+        self, db: AsyncSession, key: str, sha256: str, size: int, content_type: str, refs: int = 1
+    ) -> int:
+        """Add `refs` references to the object, returning the new count"""
+        insert = self._insert(db)
+        if insert is not None:
+            # Atomic upsert so concurrent identical uploads don't race
+            stmt = (
+                insert.values(key=key, sha256=sha256, size=size, content_type=content_type, ref_count=refs)
+                .on_conflict_do_update(
+                    index_elements=[StoredObject.key],
+                    set_={"ref_count": StoredObject.ref_count + refs},
+                )
+                .returning(StoredObject.ref_count)
+            )
+            return (await db.execute(stmt)).scalar_one()
+
+        obj = await db.scalar(
+            select(StoredObject).where(StoredObject.key == key).with_for_update()
+        )
+        if obj:
+            obj.ref_count += refs
+            return obj.ref_count
+        db.add(StoredObject(key=key, sha256=sha256, size=size, content_type=content_type, ref_count=refs))
+        await db.flush()
+        return refs
+
+    async def put(
+        self,
+        db: AsyncSession,
+        data: StorageData,
+        ext: str,
+        content_type: str,
+        sha256: Optional[str] = None,
+        size: Optional[int] = None,
+        refs: int = 1,
+    ) -> str:
+        """Store content (once) and take `refs` references to it (one per row
+        that will point at it); returns the URL"""
+        if sha256 is None:
+            sha256 = await asyncio.to_thread(_hash_data, data)
+        if size is None and isinstance(data, (bytes, bytearray, memoryview)):
+            size = memoryview(data).nbytes
+
+        key = content_key(sha256, ext)
+        async with self._db_lock:
+            ref_count = await self._acquire(db, key, sha256, size, content_type, refs)
+
+        # Duplicates skip the write; a missing file (e.g. lost volume) is re-created
+        if ref_count == refs or not await self.backend.exists(key):
+            self._written.append(key)
+            await self.backend.save(key, data, content_type, cache_control=IMMUTABLE_CACHE_CONTROL)
+
+        return self.backend.url_for(key)
+
+    async def release(self, db: AsyncSession, url: str) -> None:
+        """Drop a reference; the object is deleted with its last reference,
+        once the caller commits. URLs from before content addressing are
+        deleted on commit too."""
+        key = self.backend.key_from_url(url)
+        if not key:
+            return
+
+        async with self._db_lock:
+            obj = await db.scalar(
+                select(StoredObject).where(StoredObject.key == key).with_for_update()
+            )
+            if obj is not None:
+                obj.ref_count -= 1
+                if obj.ref_count <= 0:
+                    await db.delete(obj)
+        if obj is None or obj.ref_count <= 0:
+            self._released.append(key)
+
+    async def commit(self, db: AsyncSession) -> None:
+        """Commit the caller's transaction, then delete the released objects"""
+        await db.commit()
+        released, self._released = self._released, []
+        self._written.clear()
+        await self._delete_unreferenced(db, released)
+
+    async def rollback(self, db: AsyncSession) -> None:
+        """Roll back the caller's transaction and remove the objects put()
+        wrote for it"""
+        await db.rollback()
+        written, self._written = self._written, []
+        self._released.clear()
+        await self._delete_unreferenced(db, written)
+
+    async def _delete_unreferenced(self, db: AsyncSession, keys: List[str]) -> None:
+        # Skip objects that another transaction has referenced in the meantime;
+        # if one slips through, the next put() of that content re-creates it
+        for key in dict.fromkeys(keys):
+            try:
+                if await db.scalar(select(StoredObject.key).where(StoredObject.key == key)):
+                    continue
+                await self.backend.delete(key)
+            except Exception as e:
+                print(f"Error deleting stored object {key}: {e}")
@@ -0,0 +1,83 @@
+# File: backend/app/services/usage_service.py
+
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.user_cache import get_user_cache
+from ..models.user import User
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+class UsageService:
+    """Daily usage accounting behind the free-tier limit.
+
+    Uses are reserved before any work starts with one conditional UPDATE,
+    so concurrent requests cannot both pass the check, and handed back with
+    refund() for the work that fails. Both commit right away: a row lock
+    must not be held across a render. Days are UTC.
+    """
+
+    async def reserve(
+        self, db: AsyncSession, user_id: int, count: int, limit: Optional[int] = None
+    ) -> Optional[date]:
+        """Charge `count` uses and return the day they count against, or
+        None (nothing charged) when that would take the day's usage over
+        `limit`. Without a limit it always succeeds."""
+        now = datetime.utcnow()
+        # First use of a new day starts the count from zero
+        await db.execute(
+            update(User)
+            .where(User.id == user_id, User.last_usage_reset < _day_start(now.date()))
+            .values(daily_usage=0, last_usage_reset=now),
+            execution_options={"synchronize_session": "fetch"},
+        )
+        stmt = (
+            update(User)
+            .where(User.id == user_id)
+            .values(daily_usage=User.daily_usage + count)
+            .returning(User.email)
+        )
+        if limit is not None:
+            stmt = stmt.where(User.daily_usage + count <= limit)
+        email = (
+            await db.execute(stmt, execution_options={"synchronize_session": "fetch"})
+        ).scalar_one_or_none()
+        await db.commit()
+        if email is None:
+            return None
+        # A bulk UPDATE bypasses the session events that invalidate cached
+        # user snapshots
+        get_user_cache().invalidate(email)
+        return now.date()
+
+    async def refund(self, db: AsyncSession, user_id: int, count: int, day: date) -> None:
+        """Give back uses reserved on `day`; a no-op once the count has been
+        reset for a later day"""
+        if count <= 0:
+            return
+        email = (await db.execute(
+            update(User)
+            .where(User.id == user_id, User.last_usage_reset < _day_start(day + timedelta(days=1)))
+            .values(daily_usage=case(
+                (User.daily_usage > count, User.daily_usage - count), else_=0
+            ))
+            .returning(User.email),
+            execution_options={"synchronize_session": "fetch"},
+        )).scalar_one_or_none()
+        await db.commit()
+        if email:
+            get_user_cache().invalidate(email)
+
+    async def used_today(self, db: AsyncSession, user_id: int) -> int:
+        usage, reset = (await db.execute(
+            select(User.daily_usage, User.last_usage_reset).where(User.id == user_id)
+        )).one()
+        if reset < _day_start(datetime.utcnow().date()):
+            return 0
+        return usage or 0
@@ -1,10 +1,11 @@
 # File: backend/app/services/watermark_service.py
 
-from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageColor, ImageEnhance
+from PIL import Image, ImageDraw, ImageFilter, ImageColor, ImageEnhance
+import asyncio
+import copy
 import io
-import os
 import uuid
-from typing import Tuple, Dict, Optional, List
+from typing import Awaitable, Callable, Tuple, Dict, Optional, List, Union, BinaryIO
 import numpy as np
 import time
 from pathlib import Path
@@ -12,13 +13,45 @@ import math
 
 from .gemini_service import GeminiService
 from .font_manager import FontManager
+from .storage_service import get_storage
+from .render_pool import run_render
+from .degradation import (
+    LOCAL_ANALYSIS, NO_BLUR, FAST_ENCODE, CAPPED_PATTERN,
+    degraded_renders, describe_level, get_degradation_controller, watermark_pipeline_seconds,
+)
+from ..core.cache import TTLCache
 from ..core.config import settings
+from ..core.metrics import metrics
+from ..utils.image_processor import ImageProbe, probe_image, plan_decode
+
+# Defense in depth: uploads are probed against per-tier budgets first
+Image.MAX_IMAGE_PIXELS = settings.ELITE_MAX_PIXELS
+
+# Decoded originals for re-renders, keyed by (storage key, tier). Images are
+# only read while rendering, so entries can be shared between requests.
+_decode_cache: TTLCache[Image.Image] = TTLCache(
+    settings.DECODE_CACHE_SIZE, settings.DECODE_CACHE_TTL
+)
+decode_cache_requests = metrics.counter(
+    "rerender_decode_cache_total", "Stored-original decodes by cache result"
+)
+
+# Pre-rendered text tiles keyed by ((text, font path, size), fill, shadow
+# fill), shared by every request: tiles are only read once drawn. Fonts
+# installed later show up once an entry expires.
+_sprites: TTLCache[Tuple[Image.Image, Tuple[int, int]]] = TTLCache(256, 300)
+sprite_cache_requests = metrics.counter(
+    "text_sprite_cache_total", "Text sprite lookups by cache result"
+)
+
+
+SHADOW_OFFSET = 2
 
 
 class WatermarkService:
     def __init__(self):
         self.gemini_service = GeminiService()
-        
+
         # Initialize Font Manager
         self.font_manager = FontManager()
         
@@ -43,7 +76,7 @@ class WatermarkService:
 
     async def apply_intelligent_watermark(
         self, 
-        image_bytes: bytes, 
+        image_source: Union[bytes, BinaryIO], 
         watermark_text: str, 
         user_tier: str,
         # Erweiterte Parameter
@@ -56,26 +89,172 @@ class WatermarkService:
         font_family: Optional[str] = None,
         text_color: str = "#FFFFFF",
         text_shadow: bool = False,
-        protection_mode: str = "standard"  # standard, contextual, multilayer
-    ) -> Tuple[bytes, Dict]:
-        """Apply AI-guided watermark with enhanced protection strategies"""
+        protection_mode: str = "standard",  # standard, contextual, multilayer
+        probe: Optional[ImageProbe] = None,
+        analysis: Optional[Dict] = None,
+        on_stage: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> Tuple[memoryview, Dict]:
+        """Apply AI-guided watermark with enhanced protection strategies.
+
+        `image_source` may be raw bytes or a seekable file handle (the spooled
+        upload); the encoded PNG is returned as a view on the output buffer so
+        it can be written out without another copy. Decode, render and encode
+        run on the render pool. A previously computed `analysis` (e.g. from a
+        preview session) skips the Gemini call. `on_stage` is awaited after
+        each pipeline stage (progress events for background jobs). Under load
+        the degradation level picks cheaper steps; it is recorded in
+        analysis["degradation"].
+        """
 
         start_time = time.time()
+        level = get_degradation_controller().current()
 
         # Get AI analysis
+        if analysis is None:
+            analysis = await self.gemini_service.analyze_image_for_watermark(
+                image_source, watermark_text, use_model=level < LOCAL_ANALYSIS
+            )
+            if on_stage:
+                await on_stage("analyzed")
+
+        # Decode at the smallest size the tier limit allows
+        image = await run_render(self.decode_image, image_source, user_tier, probe)
+        if on_stage:
+            await on_stage("decoded")
+
+        options = dict(
+            text_position=text_position,
+            text_size=text_size,
+            text_opacity=text_opacity,
+            auto_opacity=auto_opacity,
+            multiple_watermarks=multiple_watermarks,
+            watermark_pattern=watermark_pattern,
+            font_family=font_family,
+            text_color=text_color,
+            text_shadow=text_shadow,
+            protection_mode=protection_mode,
+        )
+        return await self._render_and_encode(
+            image, watermark_text, user_tier, analysis, options, start_time, level, on_stage
+        )
+
+    async def apply_variants(
+        self,
+        image_source: Union[bytes, BinaryIO],
+        watermark_text: str,
+        user_tier: str,
+        variants: List[Dict],
+        probe: Optional[ImageProbe] = None
+    ) -> List[Tuple[memoryview, Dict]]:
+        """Render several settings combinations of one upload.
+
+        The image is decoded and analysed once; each variant gets its own copy
+        of the analysis, and text sprites are shared where settings overlap.
+        Results are in the order of `variants`.
+        """
+        start_time = time.time()
+        level = get_degradation_controller().current()
+
         analysis = await self.gemini_service.analyze_image_for_watermark(
-            image_bytes, watermark_text
+            image_source, watermark_text, use_model=level < LOCAL_ANALYSIS
         )
+        image = await run_render(self.decode_image, image_source, user_tier, probe)
 
-        # Open image
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGBA")
+        return await asyncio.gather(*[
+            self._render_and_encode(
+                image, watermark_text, user_tier, copy.deepcopy(analysis), options, start_time, level
+            )
+            for options in variants
+        ])
 
-        # Apply resolution limits based on tier
-        image = self._apply_resolution_limit(image, user_tier)
+    async def rerender(
+        self,
+        original_key: str,
+        watermark_text: str,
+        user_tier: str,
+        analysis: Dict,
+        **options
+    ) -> Tuple[memoryview, Dict]:
+        """Render new settings over a stored original, reusing its cached
+        decode and the stored analysis (no upload, no Gemini call)"""
+        start_time = time.time()
+        level = get_degradation_controller().current()
+        image = await self.decode_stored(original_key, user_tier)
+        return await self._render_and_encode(
+            image, watermark_text, user_tier, analysis, options, start_time, level
+        )
+
+    async def decode_stored(self, key: str, user_tier: str) -> Image.Image:
+        """Decoded stored original; kept in a small TTL cache because edits
+        tend to come in bursts on the same image"""
+        cache_key = (key, user_tier)
+        image = _decode_cache.get(cache_key, touch=True)
+        if image is not None:
+            decode_cache_requests.inc(result="hit")
+            return image
+
+        data = await get_storage().read(key)
+        image = await run_render(self.decode_image, data, user_tier)
+        _decode_cache.set(cache_key, image)
+        decode_cache_requests.inc(result="miss")
+        return image
+
+    async def _render_and_encode(
+        self,
+        image: Image.Image,
+        watermark_text: str,
+        user_tier: str,
+        analysis: Dict,
+        options: Dict,
+        start_time: float,
+        level: int = 0,
+        on_stage: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> Tuple[memoryview, Dict]:
+        watermarked = await run_render(
+            self.render, image, watermark_text, user_tier, analysis, degradation=level, **options
+        )
+        if on_stage:
+            await on_stage("rendered")
+        output = await run_render(self.encode, watermarked, fast=level >= FAST_ENCODE)
+        if on_stage:
+            await on_stage("encoded")
+
+        # Add processing info to analysis
+        elapsed = time.time() - start_time
+        watermark_pipeline_seconds.observe(elapsed)
+        degraded_renders.inc(level=level)
+        analysis["processing_time"] = int(elapsed * 1000)
+        analysis["degradation"] = describe_level(level)
+        analysis["custom_settings"] = self.describe_settings(user_tier, analysis, **options)
+
+        return output, analysis
+
+    def render(
+        self,
+        image: Image.Image,
+        watermark_text: str,
+        user_tier: str,
+        analysis: Dict,
+        text_position: str = "bottom-right",
+        text_size: str = "medium",
+        text_opacity: float = 0.7,
+        auto_opacity: bool = False,
+        multiple_watermarks: bool = False,
+        watermark_pattern: str = "diagonal",
+        font_family: Optional[str] = None,
+        text_color: str = "#FFFFFF",
+        text_shadow: bool = False,
+        protection_mode: str = "standard",
+        degradation: int = 0
+    ) -> Image.Image:
+        """Draw the watermark onto a decoded RGBA image (blocking).
 
+        Records auto-selected values (opacity, position) in `analysis`; pass
+        a copy when the analysis is shared between renders.
+        """
         # Auto-Opacity wenn aktiviert
         if auto_opacity:
-            text_opacity = await self._calculate_auto_opacity(image, analysis)
+            text_opacity = self._calculate_auto_opacity(image, analysis)
             analysis["auto_opacity_value"] = text_opacity
 
         # Position bestimmen
@@ -100,33 +279,56 @@ class WatermarkService:
 
         # Apply watermark based on protection mode
         if protection_mode == "multilayer":
-            watermarked = await self._apply_multilayer_watermark(
-                image, watermark_text, placement, font_path, text_shadow, analysis
+            return self._apply_multilayer_watermark(
+                image, watermark_text, placement, font_path, text_shadow, analysis,
+                blur=degradation < NO_BLUR
             )
         elif protection_mode == "contextual" and text_position == "auto":
-            watermarked = await self._apply_contextual_watermark(
+            return self._apply_contextual_watermark(
                 image, watermark_text, placement, font_path, analysis
             )
         elif multiple_watermarks:
-            watermarked = self._apply_multiple_watermarks(
-                image, watermark_text, placement, font_path, watermark_pattern, text_shadow
-            )
-        else:
-            watermarked = self._apply_standard_watermark(
-                image, watermark_text, placement, font_path, text_shadow
+            max_marks = settings.DEGRADATION_MAX_PATTERN_MARKS if degradation >= CAPPED_PATTERN else None
+            return self._apply_multiple_watermarks(
+                image, watermark_text, placement, font_path, watermark_pattern, text_shadow,
+                max_marks
             )
+        return self._apply_standard_watermark(
+            image, watermark_text, placement, font_path, text_shadow
+        )
 
-        # Convert to bytes
+    def encode(
+        self, image: Image.Image, format: str = "PNG", quality: int = 95, fast: bool = False
+    ) -> memoryview:
+        """Encode to a buffer and return a zero-copy view of it. `fast` trades
+        PNG size for speed (zlib level 1 instead of 6)."""
         output = io.BytesIO()
-        watermarked.save(output, format="PNG", quality=95)
-        output.seek(0)
+        if format == "JPEG":
+            image = image.convert("RGB")
+        params = {"compress_level": 1} if fast and format == "PNG" else {}
+        image.save(output, format=format, quality=quality, **params)
+        return output.getbuffer()
 
-        # Add processing info to analysis
-        analysis["processing_time"] = int((time.time() - start_time) * 1000)
-        analysis["custom_settings"] = {
+    def describe_settings(
+        self,
+        user_tier: str,
+        analysis: Dict,
+        text_position: str = "bottom-right",
+        text_size: str = "medium",
+        text_opacity: float = 0.7,
+        auto_opacity: bool = False,
+        multiple_watermarks: bool = False,
+        watermark_pattern: str = "diagonal",
+        font_family: Optional[str] = None,
+        text_color: str = "#FFFFFF",
+        text_shadow: bool = False,
+        protection_mode: str = "standard"
+    ) -> Dict:
+        """Settings actually applied, as stored in ai_analysis.custom_settings"""
+        return {
             "position": text_position,
             "size": text_size,
-            "opacity": text_opacity,
+            "opacity": analysis.get("auto_opacity_value", text_opacity) if auto_opacity else text_opacity,
             "auto_opacity": auto_opacity,
             "multiple_watermarks": multiple_watermarks,
             "pattern": watermark_pattern if multiple_watermarks else None,
@@ -136,9 +338,41 @@ class WatermarkService:
             "protection_mode": protection_mode
         }
 
-        return output.getvalue(), analysis
+    def decode_image(
+        self,
+        image_source: Union[bytes, BinaryIO],
+        user_tier: str,
+        probe: Optional[ImageProbe] = None,
+        max_resolution: Optional[int] = None
+    ) -> Image.Image:
+        """Decode to RGBA within the tier's resolution limit (or a smaller
+        max_resolution, e.g. for preview proxies), using the probed header to
+        let libjpeg scale during decode or to box-reduce early"""
+        if probe is None:
+            source = io.BytesIO(image_source) if isinstance(image_source, (bytes, bytearray, memoryview)) else image_source
+            probe = probe_image(source)
+
+        max_res = min(max_resolution or self._get_max_resolution(user_tier), self._get_max_resolution(user_tier))
+        plan = plan_decode(probe, max_res)
+
+        image = self._open_image(image_source)
+        if plan.draft_size and image.format == "JPEG":
+            image.draft("RGB", plan.draft_size)
+
+        image = image.convert("RGBA")
+        if plan.reduce_factor > 1:
+            image = image.reduce(plan.reduce_factor)
+
+        return self._apply_resolution_limit(image, user_tier, max_res)
+
+    def _open_image(self, image_source: Union[bytes, BinaryIO]) -> Image.Image:
+        """Open an image lazily from bytes or a file handle"""
+        if isinstance(image_source, (bytes, bytearray, memoryview)):
+            return Image.open(io.BytesIO(image_source))
+        image_source.seek(0)
+        return Image.open(image_source)
 
-    async def _calculate_auto_opacity(self, image: Image.Image, analysis: Dict) -> float:
+    def _calculate_auto_opacity(self, image: Image.Image, analysis: Dict) -> float:
         """AI-based automatic opacity calculation for optimal visibility and protection"""
         # Analysiere Bildhelligkeit und Kontrast
         grayscale = image.convert('L')
@@ -173,7 +407,8 @@ class WatermarkService:
         base_placement: Dict,
         font_path: Path,
         pattern: str,
-        text_shadow: bool
+        text_shadow: bool,
+        max_marks: Optional[int] = None
     ) -> Image.Image:
         """Apply multiple watermarks in various patterns"""
         overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
@@ -186,13 +421,10 @@ class WatermarkService:
             base_placement.get("size", "medium")
         )
         
-        try:
-            font = ImageFont.truetype(str(font_path), font_size)
-        except:
-            font = ImageFont.load_default()
+        layout = self.font_manager.layout_text(text, font_path, font_size)
         
         # Get text dimensions
-        bbox = draw.textbbox((0, 0), text, font=font)
+        bbox = layout.textbbox(draw)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
         
@@ -225,7 +457,7 @@ class WatermarkService:
                     
         elif pattern == "random":
             # Random pattern with collision avoidance
-            num_watermarks = 7
+            num_watermarks = min(7, max_marks or 7)
             min_distance = max(text_width, text_height) * 1.5
             
             for _ in range(num_watermarks):
@@ -247,27 +479,32 @@ class WatermarkService:
                         break
                     attempts += 1
         
-        # Draw all watermarks
+        if max_marks and len(positions) > max_marks:
+            # Thin the pattern evenly instead of dropping one side of it
+            step = len(positions) / max_marks
+            positions = [positions[int(i * step)] for i in range(max_marks)]
+        
+        # Draw all watermarks (one pre-rendered sprite, pasted per position)
+        shadow_color = self._hex_to_rgba("#000000", 0.5) if text_shadow else None
+        sprite, (dx, dy) = self._text_sprite(
+            (text, str(font_path), font_size), layout, color, shadow_color
+        )
         for x, y in positions:
-            if text_shadow:
-                shadow_offset = 2
-                shadow_color = self._hex_to_rgba("#000000", 0.5)
-                draw.text((x + shadow_offset, y + shadow_offset), text, font=font, fill=shadow_color)
-            
-            draw.text((x, y), text, font=font, fill=color)
+            self._composite_sprite(overlay, sprite, x + dx, y + dy)
         
         # Composite
         watermarked = Image.alpha_composite(image, overlay)
         return watermarked
 
-    async def _apply_multilayer_watermark(
+    def _apply_multilayer_watermark(
         self,
         image: Image.Image,
         text: str,
         placement: Dict,
         font_path: Path,
         text_shadow: bool,
-        analysis: Dict
+        analysis: Dict,
+        blur: bool = True
     ) -> Image.Image:
         """Apply multilayer watermark for enhanced protection"""
         # Layer 1: Standard visible watermark
@@ -296,13 +533,10 @@ class WatermarkService:
             placement.get("size", "medium")
         ) * 0.9  # Slightly smaller
         
-        try:
-            font = ImageFont.truetype(str(font_path), int(font_size))
-        except:
-            font = ImageFont.load_default()
+        layout = self.font_manager.layout_text(text, font_path, int(font_size))
         
         # Calculate position for displaced layer
-        bbox = draw.textbbox((0, 0), text, font=font)
+        bbox = layout.textbbox(draw)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
         
@@ -323,17 +557,18 @@ class WatermarkService:
         )
         
         # Draw displaced layer
-        draw.text((x, y), text, font=font, fill=shifted_color)
+        layout.draw(draw, (x, y), fill=shifted_color)
         
-        # Apply slight blur to displaced layer
-        overlay = overlay.filter(ImageFilter.GaussianBlur(radius=1))
+        # Apply slight blur to displaced layer (a full-size pass, skipped under load)
+        if blur:
+            overlay = overlay.filter(ImageFilter.GaussianBlur(radius=1))
         
         # Composite
         final_watermarked = Image.alpha_composite(watermarked, overlay)
         
         return final_watermarked
 
-    async def _apply_contextual_watermark(
+    def _apply_contextual_watermark(
         self,
         image: Image.Image,
         text: str,
@@ -398,13 +633,10 @@ class WatermarkService:
             placement.get("size", "medium")
         )
         
-        try:
-            font = ImageFont.truetype(str(font_path), font_size)
-        except:
-            font = ImageFont.load_default()
+        layout = self.font_manager.layout_text(text, font_path, font_size)
         
         # Get text dimensions
-        bbox = draw.textbbox((0, 0), text, font=font)
+        bbox = layout.textbbox(draw)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
         
@@ -425,7 +657,7 @@ class WatermarkService:
         
         # Draw text
         color = self._hex_to_rgba(placement.get("color", "#FFFFFF"), placement.get("opacity", 0.7))
-        text_draw.text((10, 10), text, font=font, fill=color)
+        layout.draw(text_draw, (10, 10), fill=color)
         
         # Apply slight perspective transform if needed
         if placement.get("rotation", 0) != 0:
@@ -450,15 +682,19 @@ class WatermarkService:
         # and adjust watermark color for better integration
         return image
 
-    def _apply_resolution_limit(self, image: Image.Image, user_tier: str) -> Image.Image:
-        """Apply resolution limits based on subscription tier"""
+    def _get_max_resolution(self, user_tier: str) -> int:
         max_resolutions = {
             "free": settings.FREE_MAX_RESOLUTION,
             "pro": settings.PRO_MAX_RESOLUTION,
             "elite": settings.ELITE_MAX_RESOLUTION,
         }
-        
-        max_res = max_resolutions.get(user_tier, settings.FREE_MAX_RESOLUTION)
+        return max_resolutions.get(user_tier, settings.FREE_MAX_RESOLUTION)
+
+    def _apply_resolution_limit(
+        self, image: Image.Image, user_tier: str, max_res: Optional[int] = None
+    ) -> Image.Image:
+        """Apply resolution limits based on subscription tier"""
+        max_res = max_res or self._get_max_resolution(user_tier)
         
         if image.width > max_res or image.height > max_res:
             ratio = min(max_res / image.width, max_res / image.height)
@@ -529,12 +765,9 @@ class WatermarkService:
             placement.get("size", "medium")
         )
         
-        try:
-            font = ImageFont.truetype(str(font_path), font_size)
-        except:
-            font = ImageFont.load_default()
+        layout = self.font_manager.layout_text(text, font_path, font_size)
         
-        bbox = draw.textbbox((0, 0), text, font=font)
+        bbox = layout.textbbox(draw)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
         
@@ -545,13 +778,12 @@ class WatermarkService:
         y = max(10, min(y, image.height - text_height - 10))
         
         color = self._hex_to_rgba(placement.get("color", "#FFFFFF"), placement.get("opacity", 0.7))
+        shadow_color = self._hex_to_rgba("#000000", 0.5) if text_shadow else None
         
-        if text_shadow:
-            shadow_offset = 2
-            shadow_color = self._hex_to_rgba("#000000", 0.5)
-            draw.text((x + shadow_offset, y + shadow_offset), text, font=font, fill=shadow_color)
-        
-        draw.text((x, y), text, font=font, fill=color)
+        sprite, (dx, dy) = self._text_sprite(
+            (text, str(font_path), font_size), layout, color, shadow_color
+        )
+        self._composite_sprite(overlay, sprite, x + dx, y + dy)
         
         if placement.get("rotation", 0) != 0:
             overlay = overlay.rotate(placement["rotation"], expand=1)
@@ -590,6 +822,53 @@ class WatermarkService:
         
         return watermarked
 
+    def _text_sprite(
+        self,
+        layout_key: Tuple,
+        layout,
+        fill: Tuple[int, int, int, int],
+        shadow_fill: Optional[Tuple[int, int, int, int]] = None
+    ) -> Tuple[Image.Image, Tuple[int, int]]:
+        """Text (and shadow) drawn once on a tight transparent tile.
+
+        Returns the tile and its offset from the text origin. Tiles are cached
+        per process by (text, font, size, colors), so repeated placements,
+        variants and later requests with the same settings reuse them.
+        """
+        key = (layout_key, fill, shadow_fill)
+        cached = _sprites.get(key)
+        if cached is not None:
+            sprite_cache_requests.inc(result="hit")
+            return cached
+        sprite_cache_requests.inc(result="miss")
+
+        left, top, right, bottom = layout.textbbox(ImageDraw.Draw(Image.new("RGBA", (1, 1))))
+        pad = SHADOW_OFFSET if shadow_fill else 0
+        origin_x, origin_y = min(0, int(left)), min(0, int(top))
+        sprite = Image.new(
+            "RGBA",
+            (max(1, int(right) - origin_x + pad), max(1, int(bottom) - origin_y + pad)),
+            (0, 0, 0, 0)
+        )
+        draw = ImageDraw.Draw(sprite)
+        if shadow_fill:
+            layout.draw(draw, (SHADOW_OFFSET - origin_x, SHADOW_OFFSET - origin_y), fill=shadow_fill)
+        layout.draw(draw, (-origin_x, -origin_y), fill=fill)
+
+        result = (sprite, (origin_x, origin_y))
+        _sprites.set(key, result)
+        return result
+
+    def _composite_sprite(self, overlay: Image.Image, sprite: Image.Image, x: int, y: int) -> None:
+        """Alpha-composite a sprite in place; parts outside the overlay are clipped"""
+        if x >= overlay.width or y >= overlay.height:
+            return
+        if x + sprite.width <= 0 or y + sprite.height <= 0:
+            return
+        overlay.alpha_composite(
+            sprite, dest=(max(0, x), max(0, y)), source=(max(0, -x), max(0, -y))
+        )
+
     def _hex_to_rgba(self, hex_color: str, opacity: float) -> Tuple[int, int, int, int]:
         """Convert hex color to RGBA tuple"""
         hex_color = hex_color.lstrip('#')
@@ -599,11 +878,4 @@ class WatermarkService:
     async def save_watermarked_image(self, image_bytes: bytes, filename: str) -> str:
         """Save watermarked image to storage"""
         unique_filename = f"{uuid.uuid4()}_{filename}"
-        file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
-        
-        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-        
-        with open(file_path, "wb") as f:
-            f.write(image_bytes)
-        
-        return f"watermarks/{unique_filename}"
\ No newline at end of file
+        return await get_storage().save(unique_filename, image_bytes, "image/png")
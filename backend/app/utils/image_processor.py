@@ -0,0 +1,244 @@
+# File: backend/app/utils/image_processor.py
+
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Optional, Tuple
+
+# Keep LANCZOS input at least this many times larger than the target
+REDUCING_GAP = 2.0
+
+# Never walk more frames than this when counting animation frames
+MAX_PROBE_FRAMES = 1000
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_MODES = {0: "L", 2: "RGB", 3: "P", 4: "LA", 6: "RGBA"}
+JPEG_MODES = {1: "L", 3: "RGB", 4: "CMYK"}
+# SOF markers carrying frame dimensions (C4 = DHT, C8 = JPG, CC = DAC are not SOF)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+CONTENT_TYPE_FORMATS = {
+    "image/png": "png",
+    "image/jpeg": "jpeg",
+    "image/jpg": "jpeg",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+
+
+class ImageProbeError(ValueError):
+    """Raised when a file is not a supported image or its header is corrupt"""
+
+
+@dataclass
+class ImageProbe:
+    format: str  # png, jpeg, gif, webp
+    width: int
+    height: int
+    frames: int
+    mode: str
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+    @property
+    def total_pixels(self) -> int:
+        """Pixels across all frames (what a full decode would allocate)"""
+        return self.pixels * max(1, self.frames)
+
+
+@dataclass
+class DecodePlan:
+    target_size: Tuple[int, int]
+    draft_size: Optional[Tuple[int, int]] = None  # JPEG DCT scaling request
+    reduce_factor: int = 1  # integer box reduction before the final resize
+
+
+def _read_exact(fh: BinaryIO, size: int) -> bytes:
+    data = fh.read(size)
+    if len(data) != size:
+        raise ImageProbeError("Truncated image header")
+    return data
+
+
+def _probe_png(fh: BinaryIO) -> ImageProbe:
+    fh.seek(8)
+    length, chunk_type = struct.unpack(">I4s", _read_exact(fh, 8))
+    if chunk_type != b"IHDR" or length != 13:
+        raise ImageProbeError("PNG is missing IHDR")
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", _read_exact(fh, 10))
+    fh.seek(3 + 4, 1)  # rest of IHDR + CRC
+
+    # APNG declares its frame count in acTL, which must precede IDAT
+    frames = 1
+    while True:
+        header = fh.read(8)
+        if len(header) < 8:
+            break
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type == b"acTL":
+            frames = struct.unpack(">I", _read_exact(fh, 4))[0]
+            break
+        if chunk_type in (b"IDAT", b"IEND"):
+            break
+        fh.seek(length + 4, 1)
+
+    mode = PNG_MODES.get(color_type)
+    if mode is None:
+        raise ImageProbeError("Unsupported PNG color type")
+    if mode == "L" and bit_depth == 1:
+        mode = "1"
+    return ImageProbe("png", width, height, frames, mode)
+
+
+def _probe_jpeg(fh: BinaryIO) -> ImageProbe:
+    fh.seek(2)
+    while True:
+        byte = _read_exact(fh, 1)
+        if byte != b"\xff":
+            raise ImageProbeError("Corrupt JPEG marker stream")
+        marker = _read_exact(fh, 1)[0]
+        while marker == 0xFF:  # fill bytes
+            marker = _read_exact(fh, 1)[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue  # markers without a length field
+        if marker in (0xD9, 0xDA):
+            raise ImageProbeError("JPEG has no frame header")
+
+        length = struct.unpack(">H", _read_exact(fh, 2))[0]
+        if marker in JPEG_SOF_MARKERS:
+            _, height, width, components = struct.unpack(">BHHB", _read_exact(fh, 6))
+            mode = JPEG_MODES.get(components)
+            if mode is None:
+                raise ImageProbeError("Unsupported JPEG component count")
+            return ImageProbe("jpeg", width, height, 1, mode)
+        fh.seek(length - 2, 1)
+
+
+def _skip_gif_sub_blocks(fh: BinaryIO) -> None:
+    while True:
+        size = _read_exact(fh, 1)[0]
+        if size == 0:
+            return
+        fh.seek(size, 1)
+
+
+def _probe_gif(fh: BinaryIO) -> ImageProbe:
+    fh.seek(6)
+    width, height, flags = struct.unpack("<HHB", _read_exact(fh, 5))
+    fh.seek(2, 1)  # background color index + aspect ratio
+    if flags & 0x80:
+        fh.seek(3 * (2 << (flags & 0x07)), 1)
+
+    # Count image descriptors without touching the LZW data; a frame may
+    # extend beyond the logical screen, so track the largest extent
+    frames = 0
+    while frames <= MAX_PROBE_FRAMES:
+        block = fh.read(1)
+        if not block or block == b"\x3b":
+            break
+        if block == b"\x21":
+            fh.seek(1, 1)  # extension label
+            _skip_gif_sub_blocks(fh)
+        elif block == b"\x2c":
+            left, top, frame_w, frame_h, frame_flags = struct.unpack("<HHHHB", _read_exact(fh, 9))
+            width = max(width, left + frame_w)
+            height = max(height, top + frame_h)
+            if frame_flags & 0x80:
+                fh.seek(3 * (2 << (frame_flags & 0x07)), 1)
+            fh.seek(1, 1)  # LZW minimum code size
+            _skip_gif_sub_blocks(fh)
+            frames += 1
+        else:
+            raise ImageProbeError("Corrupt GIF block")
+
+    return ImageProbe("gif", width, height, max(1, frames), "P")
+
+
+def _probe_webp(fh: BinaryIO) -> ImageProbe:
+    fh.seek(12)
+    chunk_type, chunk_size = struct.unpack("<4sI", _read_exact(fh, 8))
+
+    if chunk_type == b"VP8 ":
+        data = _read_exact(fh, 10)
+        if data[3:6] != b"\x9d\x01\x2a":
+            raise ImageProbeError("Corrupt VP8 frame header")
+        width, height = struct.unpack("<HH", data[6:10])
+        return ImageProbe("webp", width & 0x3FFF, height & 0x3FFF, 1, "RGB")
+
+    if chunk_type == b"VP8L":
+        data = _read_exact(fh, 5)
+        if data[0] != 0x2F:
+            raise ImageProbeError("Corrupt VP8L header")
+        bits = struct.unpack("<I", data[1:5])[0]
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+        mode = "RGBA" if (bits >> 28) & 1 else "RGB"
+        return ImageProbe("webp", width, height, 1, mode)
+
+    if chunk_type == b"VP8X":
+        data = _read_exact(fh, 10)
+        flags = data[0]
+        width = int.from_bytes(data[4:7], "little") + 1
+        height = int.from_bytes(data[7:10], "little") + 1
+        mode = "RGBA" if flags & 0x10 else "RGB"
+
+        frames = 1
+        if flags & 0x02:
+            frames = 0
+            fh.seek(12 + 8 + chunk_size + (chunk_size & 1))
+            while frames <= MAX_PROBE_FRAMES:
+                header = fh.read(8)
+                if len(header) < 8:
+                    break
+                sub_type, sub_size = struct.unpack("<4sI", header)
+                if sub_type == b"ANMF":
+                    frames += 1
+                fh.seek(sub_size + (sub_size & 1), 1)
+        return ImageProbe("webp", width, height, max(1, frames), mode)
+
+    raise ImageProbeError("Unsupported WebP chunk")
+
+
+def probe_image(fh: BinaryIO) -> ImageProbe:
+    """Read format, dimensions, frame count and mode from the header only.
+
+    No pixel data is decoded; the handle is rewound afterwards.
+    """
+    try:
+        fh.seek(0)
+        magic = fh.read(12)
+
+        if magic.startswith(PNG_SIGNATURE):
+            return _probe_png(fh)
+        if magic.startswith(b"\xff\xd8"):
+            return _probe_jpeg(fh)
+        if magic[:6] in (b"GIF87a", b"GIF89a"):
+            return _probe_gif(fh)
+        if magic[:4] == b"RIFF" and magic[8:12] == b"WEBP":
+            return _probe_webp(fh)
+        raise ImageProbeError("Unrecognized image format")
+    except struct.error:
+        raise ImageProbeError("Corrupt image header")
+    finally:
+        fh.seek(0)
+
+
+def plan_decode(probe: ImageProbe, max_resolution: int) -> DecodePlan:
+    """Pick draft/reduce settings so a decode never works at a larger size than needed"""
+    width, height = probe.width, probe.height
+
+    if width <= max_resolution and height <= max_resolution:
+        return DecodePlan(target_size=(width, height))
+
+    ratio = min(max_resolution / width, max_resolution / height)
+    target = (max(1, int(width * ratio)), max(1, int(height * ratio)))
+
+    if probe.format == "jpeg":
+        # libjpeg scales by 1/2, 1/4 or 1/8 during decode, never below the
+        # requested size; ask for REDUCING_GAP headroom to keep LANCZOS sharp
+        draft = (int(target[0] * REDUCING_GAP), int(target[1] * REDUCING_GAP))
+        return DecodePlan(target_size=target, draft_size=draft)
+
+    factor = int(min(width / target[0], height / target[1]) / REDUCING_GAP)
+    return DecodePlan(target_size=target, reduce_factor=max(1, factor))
@@ -0,0 +1,92 @@
+# File: backend/app/utils/uploads.py
+
+import hashlib
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException, UploadFile
+
+from ..core.metrics import metrics, BYTE_BUCKETS
+
+CHUNK_SIZE = 64 * 1024
+
+upload_bytes_copied = metrics.histogram(
+    "watermark_upload_bytes_copied",
+    "Bytes copied through Python buffers per upload request",
+    buckets=BYTE_BUCKETS,
+)
+upload_bytes_copied_peak = metrics.gauge(
+    "watermark_upload_bytes_copied_peak",
+    "Largest number of bytes copied by a single upload request",
+)
+
+
+@dataclass
+class SpooledUpload:
+    """An upload that has been size-checked and hashed without being buffered.
+
+    `file` is the spooled file handle Starlette already wrote the multipart
+    part to; it is rewound and handed to the decoder and storage as-is.
+    """
+
+    file: BinaryIO
+    filename: str
+    content_type: Optional[str]
+    size: int
+    sha256: str
+    bytes_copied: int = 0
+
+    def rewind(self) -> BinaryIO:
+        self.file.seek(0)
+        return self.file
+
+    def record(self, extra_bytes: int = 0) -> None:
+        """Publish the per-request copy accounting (extra_bytes: copies made
+        after spooling, e.g. streaming the original and output to storage)"""
+        total = self.bytes_copied + extra_bytes
+        upload_bytes_copied.observe(total)
+        upload_bytes_copied_peak.set_max(total)
+
+
+async def spool_upload(file: UploadFile, max_size: int) -> SpooledUpload:
+    """Walk an upload in chunks, enforcing max_size as bytes arrive"""
+    digest = hashlib.sha256()
+    size = 0
+
+    await file.seek(0)
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File size too large. Maximum size is {max_size // (1024 * 1024)}MB"
+            )
+        digest.update(chunk)
+
+    if size == 0:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+
+    await file.seek(0)
+    return SpooledUpload(
+        file=file.file,
+        filename=file.filename or "",
+        content_type=file.content_type,
+        size=size,
+        sha256=digest.hexdigest(),
+        bytes_copied=size,
+    )
+
+
+def copy_to_tempfile(source: BinaryIO) -> BinaryIO:
+    """Private copy of an upload that outlives the request (Starlette closes
+    the spooled form files when the endpoint returns)"""
+    target = tempfile.TemporaryFile()
+    source.seek(0)
+    shutil.copyfileobj(source, target, CHUNK_SIZE)
+    target.seek(0)
+    return target
@@ -3,7 +3,10 @@
 from fastapi import HTTPException, UploadFile
 import re
 import html
-from typing import Optional
+from typing import Optional, BinaryIO
+
+from ..core.config import settings
+from .image_processor import ImageProbe, ImageProbeError, probe_image, CONTENT_TYPE_FORMATS
 
 # Erlaubte Bildformate
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
@@ -18,11 +21,11 @@ ALLOWED_CONTENT_TYPES = {
 def validate_image_file(file: UploadFile) -> None:
     """Validate uploaded image file"""
     
-    # Check file size (10MB limit)
-    if file.size and file.size > 10 * 1024 * 1024:
+    # Cheap pre-check only; the real limit is enforced while spooling
+    if file.size and file.size > settings.MAX_FILE_SIZE:
         raise HTTPException(
             status_code=413,
-            detail="File size too large. Maximum size is 10MB"
+            detail=f"File size too large. Maximum size is {settings.MAX_FILE_SIZE // (1024 * 1024)}MB"
         )
     
     # Check content type
@@ -41,6 +44,50 @@ def validate_image_file(file: UploadFile) -> None:
         )
 
 
+def get_pixel_budget(user_tier: str) -> int:
+    """Maximum decoded pixels per frame for a subscription tier"""
+    budgets = {
+        "free": settings.FREE_MAX_PIXELS,
+        "pro": settings.PRO_MAX_PIXELS,
+        "elite": settings.ELITE_MAX_PIXELS,
+    }
+    return budgets.get(user_tier, settings.FREE_MAX_PIXELS)
+
+
+def validate_image_probe(file: BinaryIO, content_type: Optional[str], user_tier: str) -> ImageProbe:
+    """Inspect the image header and reject bombs or mislabeled files before decoding"""
+    try:
+        probe = probe_image(file)
+    except ImageProbeError:
+        raise HTTPException(
+            status_code=415,
+            detail="File is not a valid image"
+        )
+
+    # The declared content type must match the actual bytes
+    if CONTENT_TYPE_FORMATS.get(content_type) != probe.format:
+        raise HTTPException(
+            status_code=415,
+            detail="File content does not match its declared type"
+        )
+
+    budget = get_pixel_budget(user_tier)
+    if probe.pixels > budget:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Image dimensions too large ({probe.width}x{probe.height}). "
+                   f"Maximum is {budget // 1_000_000} megapixels for your plan"
+        )
+
+    if probe.frames > settings.MAX_IMAGE_FRAMES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many animation frames. Maximum is {settings.MAX_IMAGE_FRAMES}"
+        )
+
+    return probe
+
+
 def sanitize_watermark_text(text: str) -> str:
     """Sanitize watermark text to prevent XSS and injection attacks"""
     
@@ -21,6 +21,17 @@ def main():
     
     # Download all fonts
     font_manager.download_all_fonts()
+
+    # Ohne Fallback-Fonts werden CJK, Arabisch und Emoji als Kästchen gerendert
+    installed = font_manager.installed_fonts()
+    missing = [font for font in FontManager.FALLBACK_CHAIN if font not in installed]
+    if missing:
+        print(f"\n❌ Fallback-Fonts fehlen: {', '.join(missing)}")
+        sys.exit(1)
+
+    # Coverage-Index einmal bauen, damit der Server ihn nur noch lädt
+    index = font_manager.load_coverage_index(rebuild=True)
+    print(f"\n📇 Coverage-Index: {len(index.fonts)} Fonts")
     
     print("\n✅ Font setup complete!")
     print("\nDu kannst jetzt den Server starten:")
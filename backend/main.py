@@ -1,23 +1,29 @@
 # File: backend/main.py
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import uvicorn
+import asyncio
 import os
 import logging
+import secrets
+from PIL import features
 
-from app.api.endpoints import auth, users, watermarks, subscriptions, webhooks, admin
+from app.api.endpoints import auth, users, watermarks, subscriptions, webhooks, admin, media, jobs, ws
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import async_engine, create_tables
+from app.core.metrics import metrics
+from app.core.security import shutdown_hash_pool
+from app.core.middleware import QueryStatsMiddleware, UploadSizeLimitMiddleware
+from app.services.font_manager import FontManager
+from app.services.render_pool import shutdown_render_pool
+from app.services.job_worker import WatermarkJobWorker
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(
     title="AI Watermark API",
     description="Intelligent watermarking system using AI",
@@ -43,6 +49,18 @@ origins = list(set(origins))
 
 logger.info(f"CORS Origins configured: {origins}")
 
+# Refuse oversized uploads while the body is still streaming in
+# (registered first so CORS headers still wrap the 413)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_size=settings.MAX_FILE_SIZE + settings.UPLOAD_FORM_OVERHEAD,
+    path_prefixes=("/api/watermarks",),
+    overrides={"/api/watermarks/batch": settings.BATCH_MAX_BODY_SIZE},
+)
+
+# SQL statements per request (headers only in debug)
+app.add_middleware(QueryStatsMiddleware, expose_headers=settings.DEBUG)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -53,11 +71,10 @@ app.add_middleware(
 )
 
 # Create directories if they don't exist
-os.makedirs("static/watermarks", exist_ok=True)
 os.makedirs("fonts", exist_ok=True)
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Stored images are not mounted publicly: responses carry signed /media
+# links and downloads go through /api/watermarks/{id}/file/{variant}
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
@@ -66,6 +83,9 @@ app.include_router(watermarks.router, prefix="/api/watermarks", tags=["watermark
 app.include_router(subscriptions.router, prefix="/api/subscriptions", tags=["subscriptions"])
 app.include_router(webhooks.router, prefix="/api/webhooks", tags=["webhooks"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(media.router, prefix="/media", tags=["media"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+app.include_router(ws.router, prefix="/ws", tags=["websocket"])
 
 @app.get("/")
 async def root():
@@ -90,13 +110,59 @@ async def health_check():
         "version": "1.0.0"
     }
 
+def require_metrics_access(request: Request) -> None:
+    """Internal counters are for the scraper only"""
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get("authorization", "")
+    if token and secrets.compare_digest(authorization, f"Bearer {token}"):
+        return
+    if request.client and request.client.host in settings.METRICS_ALLOWED_IPS:
+        return
+    raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+async def metrics_endpoint():
+    return metrics.render()
+
 # Log startup
 @app.on_event("startup")
 async def startup_event():
+    # Create database tables (DDL runs on the sync side of the async connection)
+    await create_tables()
+
+    # Build (or reload) the font coverage index once per process
+    index = FontManager().load_coverage_index()
+    logger.info(f"Font coverage index ready: {len(index.fonts)} fonts")
+    missing_fonts = [font for font in FontManager.FALLBACK_CHAIN if font not in index.fonts]
+    if missing_fonts:
+        logger.warning(
+            f"Fallback fonts missing (run download_fonts.py): {', '.join(missing_fonts)}"
+        )
+    if not features.check("raqm"):
+        logger.warning("Pillow has no libraqm: Arabic is drawn unshaped and left-to-right")
     logger.info("AI Watermark API started successfully")
     logger.info(f"CORS origins: {origins}")
     logger.info(f"Environment: {'production' if not settings.DEBUG else 'development'}")
 
+    # Without Redis the job queue lives in this process, so consume it here;
+    # with Redis, jobs are handled by separate `python worker.py` processes
+    if not settings.REDIS_URL:
+        app.state.worker_stop = asyncio.Event()
+        app.state.worker_task = asyncio.create_task(
+            WatermarkJobWorker().run(app.state.worker_stop)
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if getattr(app.state, "worker_task", None):
+        app.state.worker_stop.set()
+        await app.state.worker_task
+    shutdown_render_pool()
+    shutdown_hash_pool()
+    await async_engine.dispose()
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
     uvicorn.run("main:app", host="0.0.0.0", port=port, log_level="info")
\ No newline at end of file
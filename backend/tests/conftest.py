@@ -0,0 +1,103 @@
+# File: backend/tests/conftest.py
+
+import io
+import itertools
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Settings are read at import time, so the environment has to be in place
+# before anything from the app is imported
+_tmp = tempfile.mkdtemp(prefix="watermark-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ["UPLOAD_DIR"] = f"{_tmp}/uploads"
+os.environ["DERIVATIVE_CACHE_DIR"] = f"{_tmp}/derivatives"
+os.environ["DEBUG"] = "true"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ.setdefault("MEDIA_SIGNING_SECRET", "test-media-signing-secret")
+os.environ.pop("REDIS_URL", None)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# Fonts are looked up relative to the working directory, as in the image
+os.chdir(BACKEND_DIR)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from PIL import Image  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+import main  # noqa: E402
+from app.api.endpoints.admin import SUPER_ADMIN_EMAIL  # noqa: E402
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.models.user import SubscriptionTier, User  # noqa: E402
+
+PASSWORD = "Passw0rd!"
+_ids = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+def run(client: TestClient, func, *args):
+    """Run an async function on the app's event loop (the async engine's
+    connections belong to it)"""
+    return client.portal.call(func, *args)
+
+
+def register(client: TestClient, email: str = None) -> dict:
+    """Register and log in a new user; returns its auth headers"""
+    n = next(_ids)
+    email = email or f"user{n}@example.com"
+    response = client.post(
+        "/api/auth/register",
+        json={"email": email, "username": f"user{n}", "password": PASSWORD},
+    )
+    assert response.status_code == 200, response.text
+    response = client.post("/api/auth/login", data={"username": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def _update_user(email: str, **values) -> None:
+    async with AsyncSessionLocal() as db:
+        user = await db.scalar(select(User).where(User.email == email))
+        for name, value in values.items():
+            setattr(user, name, value)
+        await db.commit()
+
+
+@pytest.fixture(scope="session")
+def user_headers(client):
+    # Pro, so the free tier's daily limit does not get in the way
+    headers = register(client, "pro@example.com")
+    run(client, lambda: _update_user("pro@example.com", subscription_tier=SubscriptionTier.PRO))
+    return headers
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    headers = register(client, SUPER_ADMIN_EMAIL)
+    run(client, lambda: _update_user(SUPER_ADMIN_EMAIL, is_admin=True))
+    return headers
+
+
+def png_bytes(size=(200, 120), color=(40, 90, 160)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def create_watermark(client: TestClient, headers: dict, text: str = "hello") -> dict:
+    response = client.post(
+        "/api/watermarks/create",
+        data={"watermark_text": text},
+        files={"image": ("image.png", png_bytes(), "image/png")},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
@@ -0,0 +1,70 @@
+# File: backend/tests/test_admin_queries.py
+
+from types import SimpleNamespace
+
+from app.api.endpoints.admin import (
+    SUPER_ADMIN_EMAIL, get_admin_logs, get_user_details, list_users,
+)
+from app.core.database import AsyncSessionLocal
+from app.core.query_stats import capture_queries
+from app.models.admin import AdminAction
+from app.models.user import User
+from app.models.watermark import Watermark
+
+from .conftest import run
+
+ADMIN = SimpleNamespace(id=0, email=SUPER_ADMIN_EMAIL)
+
+
+async def _seed(prefix: str, n: int) -> int:
+    """n users, each with a watermark and an admin action about them"""
+    async with AsyncSessionLocal() as db:
+        users = [
+            User(email=f"{prefix}{i}@example.com", username=f"{prefix}{i}", hashed_password="x")
+            for i in range(n)
+        ]
+        db.add_all(users)
+        await db.flush()
+        db.add_all(
+            Watermark(user_id=user.id, original_image_url="/o.png",
+                      watermarked_image_url="/w.png", watermark_text="seed")
+            for user in users
+        )
+        db.add_all(
+            AdminAction(admin_id=users[0].id, action_type="seed", target_user_id=user.id)
+            for user in users
+        )
+        await db.commit()
+        return users[-1].id
+
+
+async def _statements(endpoint, **kwargs) -> int:
+    async with AsyncSessionLocal() as db:
+        with capture_queries() as stats:
+            result = await endpoint(admin_user=ADMIN, db=db, **kwargs)
+    assert result
+    return stats.count
+
+
+async def _admin_counts():
+    page = dict(skip=0, limit=100)
+    return [
+        await _statements(list_users, search=None, subscription_tier=None, **page),
+        await _statements(get_admin_logs, action_type=None, **page),
+    ]
+
+
+def test_admin_queries_do_not_grow_with_rows(client):
+    user_id = run(client, _seed, "few", 2)
+    few = run(client, _admin_counts) + [
+        run(client, lambda: _statements(get_user_details, user_id=user_id))
+    ]
+
+    user_id = run(client, _seed, "many", 25)
+    many = run(client, _admin_counts) + [
+        run(client, lambda: _statements(get_user_details, user_id=user_id))
+    ]
+
+    assert few == many, (few, many)
+    budgets = [list_users.query_budget, get_admin_logs.query_budget, get_user_details.query_budget]
+    assert all(count <= budget for count, budget in zip(many, budgets)), (many, budgets)
@@ -0,0 +1,102 @@
+# File: backend/tests/test_admission.py
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.user import User
+from app.services import admission
+from app.services.admission import AdmissionController
+
+from .conftest import png_bytes, register, run
+
+
+def _controller(**overrides) -> AdmissionController:
+    values = dict(max_inflight=2, memory_budget=1000, bytes_per_pixel=1)
+    values.update(overrides)
+    return AdmissionController(**values)
+
+
+def test_over_capacity_is_refused_with_retry_after():
+    controller = _controller()
+
+    async def scenario():
+        async with controller.admit(10), controller.admit(10):
+            with pytest.raises(HTTPException) as error:
+                async with controller.admit(10):
+                    pass
+            return error.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 503
+    # Nothing has finished yet, so there is no drain rate to go by
+    assert error.headers["Retry-After"] == str(settings.ADMISSION_MAX_RETRY_AFTER)
+    assert controller.inflight == 0 and controller.reserved == 0
+
+
+def test_retry_after_follows_the_drain_rate():
+    controller = _controller()
+    controller.inflight = 2
+    controller.drain_rate = 0.5
+    assert controller.retry_after() == 2
+    controller.drain_rate = 4.0
+    assert controller.retry_after() == 1
+    controller.drain_rate = 0.001
+    assert controller.retry_after() == settings.ADMISSION_MAX_RETRY_AFTER
+
+
+def test_memory_budget_admits_an_oversized_render_only_alone():
+    controller = _controller(max_inflight=10)
+
+    async def scenario():
+        async with controller.admit(5000):
+            with pytest.raises(HTTPException):
+                controller.ensure_capacity(10)
+        async with controller.admit(600):
+            with pytest.raises(HTTPException):
+                controller.ensure_capacity(600)
+            controller.ensure_capacity(400)
+
+    asyncio.run(scenario())
+
+
+def test_reserve_waits_for_capacity_instead_of_failing():
+    controller = _controller(max_inflight=1)
+
+    async def scenario():
+        order = []
+
+        async def job(name):
+            async with controller.reserve(10):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(job("first"), job("second"))
+        return order
+
+    assert asyncio.run(scenario()) == ["first", "second"]
+
+
+def test_saturated_server_answers_503_and_refunds_the_use(client, monkeypatch):
+    monkeypatch.setattr(admission, "_controller", _controller(max_inflight=0))
+    email = "busy@example.com"
+    headers = register(client, email)
+
+    response = client.post(
+        "/api/watermarks/create",
+        data={"watermark_text": "busy"},
+        files={"image": ("image.png", png_bytes(color=(111, 112, 113)), "image/png")},
+        headers=headers,
+    )
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+
+    async def usage():
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(User.daily_usage).where(User.email == email))
+
+    assert run(client, usage) == 0
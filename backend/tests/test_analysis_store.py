@@ -0,0 +1,95 @@
+# File: backend/tests/test_analysis_store.py
+
+import hashlib
+import uuid
+
+from sqlalchemy import func, select
+
+from app.core.database import AsyncSessionLocal
+from app.models.analysis import Analysis, canonical_json, decompress
+from app.models.watermark import Watermark
+from app.services.analysis_store import get_analysis_store
+
+from .conftest import create_watermark, run
+
+
+def _document(**extra):
+    return {"subject": "landscape", "colors": ["#112233"] * 50, "nonce": uuid.uuid4().hex, **extra}
+
+
+async def _rows(sha256: str) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(Analysis).where(Analysis.sha256 == sha256))
+
+
+def test_identical_documents_are_stored_once_and_compressed(client):
+    document = _document()
+    reordered = dict(reversed(list(document.items())))
+    sha256 = hashlib.sha256(canonical_json(document)).hexdigest()
+
+    async def intern_twice():
+        store = get_analysis_store()
+        async with AsyncSessionLocal() as db:
+            first = await store.intern(db, document)
+            second = await store.intern(db, reordered)
+            await db.commit()
+            row = await db.get(Analysis, first)
+            return first, second, row
+
+    first, second, row = run(client, intern_twice)
+    assert first == second
+    assert run(client, _rows, sha256) == 1
+    assert row.size == len(canonical_json(document)) > len(row.data)
+    assert row.document == document
+    assert decompress(row.codec, row.data) == canonical_json(document)
+
+
+def test_ids_are_cached_only_after_commit(client):
+    document = _document()
+    sha256 = hashlib.sha256(canonical_json(document)).hexdigest()
+    store = get_analysis_store()
+
+    async def intern_then(finish):
+        async with AsyncSessionLocal() as db:
+            analysis_id = await store.intern(db, document)
+            await getattr(db, finish)()
+            return analysis_id
+
+    run(client, intern_then, "rollback")
+    assert store._ids.get(sha256) is None
+    assert run(client, _rows, sha256) == 0
+
+    analysis_id = run(client, intern_then, "commit")
+    assert store._ids.get(sha256) == analysis_id
+    assert run(client, _rows, sha256) == 1
+
+
+def test_render_keys_stay_on_the_row(client):
+    document = _document()
+    analysis = {**document, "processing_time": 42, "degradation": {"level": 0}}
+
+    async def columns():
+        async with AsyncSessionLocal() as db:
+            values = await get_analysis_store().columns(db, analysis)
+            await db.commit()
+            return values, (await db.get(Analysis, values["analysis_id"])).document
+
+    values, stored = run(client, columns)
+    assert values["render_info"] == {"processing_time": 42, "degradation": {"level": 0}}
+    assert stored == document
+
+
+def test_watermarks_of_one_image_share_the_analysis(client, user_headers):
+    first = create_watermark(client, user_headers, "shared analysis one")
+    second = create_watermark(client, user_headers, "shared analysis two")
+
+    async def analysis_ids():
+        async with AsyncSessionLocal() as db:
+            return (await db.scalars(
+                select(Watermark.analysis_id).where(Watermark.id.in_([first["id"], second["id"]]))
+            )).all()
+
+    ids = run(client, analysis_ids)
+    assert len(ids) == 2 and len(set(ids)) == 1
+    # Each row still reports its own full analysis
+    assert first["ai_analysis"].keys() == second["ai_analysis"].keys()
@@ -0,0 +1,128 @@
+# File: backend/tests/test_batch.py
+
+import io
+import json
+import os
+import zipfile
+from datetime import datetime
+
+from fastapi import UploadFile
+from sqlalchemy import func, select
+from starlette.datastructures import Headers
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.storage import StoredObject
+from app.models.user import User
+from app.models.watermark import Watermark
+from app.services.batch_service import BatchService
+from app.services.usage_service import UsageService
+
+from .conftest import png_bytes, register, run
+
+
+def _post_batch(client, headers, colors):
+    return client.post(
+        "/api/watermarks/batch",
+        data={"watermark_text": "batch"},
+        files=[("images", (f"{i}.png", png_bytes(color=c), "image/png")) for i, c in enumerate(colors)],
+        headers=headers,
+    )
+
+
+def _user_id(client, headers) -> int:
+    return client.get("/api/users/me", headers=headers).json()["id"]
+
+
+async def _usage(user_id: int) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(User.daily_usage).where(User.id == user_id))
+
+
+async def _set_usage(user_id: int, usage: int) -> None:
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, user_id)
+        user.daily_usage = usage
+        user.last_usage_reset = datetime.utcnow()
+        await db.commit()
+
+
+def test_batch_is_charged_per_delivered_item(client):
+    headers = register(client)
+    user_id = _user_id(client, headers)
+
+    response = _post_batch(client, headers, [(201, 31, 7), (202, 31, 7)])
+    assert response.status_code == 200, response.text
+    manifest = json.loads(zipfile.ZipFile(io.BytesIO(response.content)).read("manifest.json"))
+    assert manifest["succeeded"] == 2
+    assert run(client, _usage, user_id) == 2
+
+
+def test_batch_must_fit_in_remaining_free_usage(client):
+    headers = register(client)
+    user_id = _user_id(client, headers)
+    run(client, _set_usage, user_id, settings.FREE_DAILY_LIMIT - 1)
+
+    response = _post_batch(client, headers, [(203, 31, 7), (204, 31, 7)])
+    assert response.status_code == 403
+    assert "Only 1 watermarks left" in response.json()["detail"]
+    # Nothing was reserved
+    assert run(client, _usage, user_id) == settings.FREE_DAILY_LIMIT - 1
+
+
+def test_concurrent_reservations_cannot_overrun_the_limit(client):
+    headers = register(client)
+    user_id = _user_id(client, headers)
+
+    async def reserve_twice():
+        async with AsyncSessionLocal() as a, AsyncSessionLocal() as b:
+            usage = UsageService()
+            return [
+                await usage.reserve(a, user_id, settings.FREE_DAILY_LIMIT, settings.FREE_DAILY_LIMIT),
+                await usage.reserve(b, user_id, 1, settings.FREE_DAILY_LIMIT),
+            ]
+
+    first, second = run(client, reserve_twice)
+    assert first is not None and second is None
+    assert run(client, _usage, user_id) == settings.FREE_DAILY_LIMIT
+
+
+def test_disconnect_refunds_unsent_items_and_rolls_back_storage(client):
+    headers = register(client)
+    user_id = _user_id(client, headers)
+    colors = [(205, 31, 7), (206, 31, 7)]
+
+    async def stream_first_entry_only():
+        images = [
+            UploadFile(
+                io.BytesIO(png_bytes(color=c)), filename=f"{i}.png",
+                headers=Headers({"content-type": "image/png"}),
+            )
+            for i, c in enumerate(colors)
+        ]
+        service = BatchService()
+        items = await service.prepare(images, "free")
+        async with AsyncSessionLocal() as db:
+            day = await UsageService().reserve(db, user_id, len(items), settings.FREE_DAILY_LIMIT)
+        stream = service.stream_zip(
+            "batch-disconnect", items, user_id, "batch", "free", {}, {}, day
+        )
+        await stream.__anext__()
+        # The client goes away after the first entry
+        await stream.aclose()
+
+    async def stored():
+        async with AsyncSessionLocal() as db:
+            return (
+                await db.scalar(select(func.count()).select_from(StoredObject)),
+                await db.scalar(select(func.count()).select_from(Watermark).where(Watermark.user_id == user_id)),
+            )
+
+    objects_before, _ = run(client, stored)
+    files_before = sum(len(files) for _, _, files in os.walk(settings.UPLOAD_DIR))
+    run(client, stream_first_entry_only)
+
+    # The delivered entry stays charged, the other one is handed back
+    assert run(client, _usage, user_id) == 1
+    assert run(client, stored) == (objects_before, 0)
+    assert sum(len(files) for _, _, files in os.walk(settings.UPLOAD_DIR)) == files_before
@@ -0,0 +1,15 @@
+# File: backend/tests/test_config.py
+
+import pytest
+
+from app.core.config import Settings
+
+
+def test_media_signing_secret_is_required():
+    with pytest.raises(ValueError, match="MEDIA_SIGNING_SECRET must be set"):
+        Settings(MEDIA_SIGNING_SECRET="")
+
+
+def test_media_signing_secret_is_not_the_jwt_key():
+    with pytest.raises(ValueError, match="must differ from SECRET_KEY"):
+        Settings(SECRET_KEY="shared", MEDIA_SIGNING_SECRET="shared")
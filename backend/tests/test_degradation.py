@@ -0,0 +1,30 @@
+# File: backend/tests/test_degradation.py
+
+import time
+
+from app.services.degradation import (
+    FAST_ENCODE, LOCAL_ANALYSIS, NORMAL, NO_BLUR, DegradationController, watermark_pipeline_seconds,
+)
+
+
+def test_level_steps_up_under_latency_and_back_down_when_idle():
+    window = 0.05
+    controller = DegradationController(
+        depth_thresholds=[1000],
+        latency_thresholds=[1.0, 2.0, 3.0],
+        hold_seconds=0,
+        latency_window=window,
+    )
+    # Earlier renders are outside the window
+    time.sleep(window)
+    assert controller.current() == NORMAL
+
+    for _ in range(5):
+        watermark_pipeline_seconds.observe(3.5)
+    assert controller.current() == FAST_ENCODE
+
+    # Nothing rendered for a whole window: no latency signal, one level per hold
+    time.sleep(window)
+    assert controller.current() == NO_BLUR
+    assert controller.current() == LOCAL_ANALYSIS
+    assert controller.current() == NORMAL
@@ -0,0 +1,63 @@
+# File: backend/tests/test_font_coverage.py
+
+import os
+
+import pytest
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+from app.services.font_coverage import FontCoverageIndex
+from app.services.font_manager import FontManager
+
+from .conftest import BACKEND_DIR
+
+TEXT = "Hello 世界 مرحبا 😀"
+
+
+def _font(path, family: str, codepoints) -> str:
+    """Minimal TrueType file whose cmap covers exactly `codepoints`"""
+    names = [".notdef"] + [f"uni{cp:04X}" for cp in codepoints]
+    empty = TTGlyphPen(None).glyph()
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(names)
+    builder.setupCharacterMap({cp: f"uni{cp:04X}" for cp in codepoints})
+    builder.setupGlyf({name: empty for name in names})
+    builder.setupHorizontalMetrics({name: (500, 0) for name in names})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": family, "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(str(path))
+    return path
+
+
+def test_split_runs_uses_fallback_fonts(tmp_path):
+    latin = [*range(0x20, 0x7F)]
+    font_paths = {
+        "Arial": _font(tmp_path / "Arial.ttf", "Arial", latin),
+        "Noto Sans Arabic": _font(tmp_path / "Arabic.ttf", "Arabic", [0x20, *range(0x0600, 0x0700)]),
+        "Noto Sans SC": _font(tmp_path / "SC.ttf", "SC", [0x20, *map(ord, "世界")]),
+        "Noto Emoji": _font(tmp_path / "Emoji.ttf", "Emoji", [0x1F600]),
+    }
+    index = FontCoverageIndex.build(font_paths, FontManager.FALLBACK_CHAIN)
+
+    assert index.split_runs(TEXT, "Arial") == [
+        ("Hello ", "Arial"),
+        ("世界", "Noto Sans SC"),
+        (" ", "Arial"),
+        ("مرحبا", "Noto Sans Arabic"),
+        (" ", "Arial"),
+        ("😀", "Noto Emoji"),
+    ]
+
+
+def test_installed_fallback_fonts_cover_scripts():
+    """The fonts download_fonts.py installs into the image"""
+    installed = FontManager(os.path.join(BACKEND_DIR, "fonts")).installed_fonts()
+    missing = [font for font in FontManager.FALLBACK_CHAIN if font not in installed]
+    if missing:
+        pytest.skip(f"fallback fonts not installed: {', '.join(missing)}")
+
+    index = FontCoverageIndex.build(installed, FontManager.FALLBACK_CHAIN)
+    fonts = {font for _, font in index.split_runs(TEXT, "Arial")}
+    assert {"Arial", "Noto Sans SC", "Noto Sans Arabic", "Noto Emoji"} <= fonts
@@ -0,0 +1,84 @@
+# File: backend/tests/test_image_probe.py
+
+import io
+import struct
+import zlib
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from app.utils.image_processor import ImageProbeError, ImageProbe, plan_decode, probe_image
+from app.utils.validators import validate_image_probe
+
+
+def _encode(fmt: str, size=(64, 48), mode="RGB", **params) -> io.BytesIO:
+    buffer = io.BytesIO()
+    Image.new(mode, size, "red").save(buffer, fmt, **params)
+    buffer.seek(0)
+    return buffer
+
+
+def _png_header(width: int, height: int) -> io.BytesIO:
+    """A PNG that is only a signature and IHDR: enough to probe, nothing to decode"""
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    chunk = struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+    return io.BytesIO(b"\x89PNG\r\n\x1a\n" + chunk)
+
+
+@pytest.mark.parametrize("fmt, expected", [
+    ("PNG", "png"), ("JPEG", "jpeg"), ("GIF", "gif"), ("WEBP", "webp"),
+])
+def test_probe_reads_format_and_size_from_the_header(fmt, expected):
+    fh = _encode(fmt)
+    probe = probe_image(fh)
+    assert (probe.format, probe.width, probe.height, probe.frames) == (expected, 64, 48, 1)
+    # The handle is rewound for the decoder
+    assert fh.tell() == 0
+
+
+def test_probe_counts_animation_frames():
+    frames = [Image.new("RGB", (32, 32), color) for color in ("red", "green", "blue")]
+    buffer = io.BytesIO()
+    frames[0].save(buffer, "GIF", save_all=True, append_images=frames[1:])
+    buffer.seek(0)
+    probe = probe_image(buffer)
+    assert probe.frames == 3
+    assert probe.total_pixels == 3 * 32 * 32
+
+
+def test_probe_rejects_garbage_and_truncated_headers():
+    with pytest.raises(ImageProbeError):
+        probe_image(io.BytesIO(b"definitely not an image"))
+    with pytest.raises(ImageProbeError):
+        probe_image(io.BytesIO(_png_header(10, 10).getvalue()[:20]))
+
+
+def test_decompression_bomb_is_refused_from_the_header():
+    # 40000 x 40000 declared in a file of a few dozen bytes
+    with pytest.raises(HTTPException) as error:
+        validate_image_probe(_png_header(40_000, 40_000), "image/png", "free")
+    assert error.value.status_code == 413
+    # A bigger plan has a bigger budget
+    assert validate_image_probe(_png_header(6_000, 6_000), "image/png", "pro").pixels == 36_000_000
+
+
+def test_declared_type_must_match_the_content():
+    with pytest.raises(HTTPException) as error:
+        validate_image_probe(_encode("JPEG"), "image/png", "free")
+    assert error.value.status_code == 415
+
+
+def test_plan_decode_keeps_small_images_and_shrinks_large_ones_early():
+    small = ImageProbe(format="png", width=800, height=600, frames=1, mode="RGB")
+    assert plan_decode(small, 1000).target_size == (800, 600)
+
+    jpeg = ImageProbe(format="jpeg", width=8000, height=4000, frames=1, mode="RGB")
+    plan = plan_decode(jpeg, 1000)
+    assert plan.target_size == (1000, 500)
+    # libjpeg gets to scale during decode, with headroom for the resize
+    assert plan.draft_size == (2000, 1000)
+
+    png = ImageProbe(format="png", width=8000, height=4000, frames=1, mode="RGB")
+    plan = plan_decode(png, 1000)
+    assert plan.draft_size is None and plan.reduce_factor == 4
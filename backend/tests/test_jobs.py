@@ -0,0 +1,152 @@
+# File: backend/tests/test_jobs.py
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.storage import StoredObject
+from app.models.user import User
+from app.models.watermark import Watermark
+from app.services import job_queue
+from app.services.job_queue import DEAD, QUEUED, SUCCEEDED, InMemoryJobQueue
+from app.services.job_worker import WatermarkJobWorker
+from app.services.storage_service import get_storage
+
+from .conftest import png_bytes, register, run
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    # The app's own in-process worker keeps consuming the startup queue;
+    # jobs submitted during the test land here instead
+    queue = InMemoryJobQueue(max_attempts=2)
+    monkeypatch.setattr(job_queue, "_queue", queue)
+    return queue
+
+
+def _submit(client, headers, color) -> str:
+    response = client.post(
+        "/api/watermarks/create",
+        data={"watermark_text": "queued", "async_job": "true"},
+        files={"image": ("image.png", png_bytes(color=color), "image/png")},
+        headers=headers,
+    )
+    assert response.status_code == 202, response.text
+    return response.json()["job_id"]
+
+
+def _user_id(client, headers) -> int:
+    return client.get("/api/users/me", headers=headers).json()["id"]
+
+
+async def _usage(user_id: int) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(User.daily_usage).where(User.id == user_id))
+
+
+def test_queue_ack_and_dead_letter():
+    async def scenario():
+        queue = InMemoryJobQueue(max_attempts=2)
+        done_id = await queue.enqueue({"n": 1}, user_id=1)
+        job = await queue.reserve(timeout=0.1)
+        await queue.ack(job.id, {"watermark_id": 7})
+        done = await queue.get(done_id)
+
+        dead_id = await queue.enqueue({"n": 2}, user_id=1)
+        retried = await queue.fail((await queue.reserve(timeout=0.1)).id, "boom")
+        second = await queue.reserve(timeout=0.1)
+        buried = await queue.fail(second.id, "boom again")
+        return done, retried, second.attempts, buried, await queue.get(dead_id), await queue.reserve(timeout=0.01)
+
+    done, retried, attempts, buried, dead, empty = asyncio.run(scenario())
+    assert done["status"] == SUCCEEDED and done["result"] == {"watermark_id": 7}
+    assert retried is True and attempts == 2
+    assert buried is False
+    assert dead["status"] == DEAD and dead["error"] == "boom again"
+    assert empty is None
+
+
+def test_reaper_requeues_jobs_past_their_visibility_timeout():
+    async def scenario():
+        queue = InMemoryJobQueue(visibility_timeout=0.01)
+        await queue.enqueue({}, user_id=1)
+        job = await queue.reserve(timeout=0.1)
+        await asyncio.sleep(0.02)
+        requeued = await queue.requeue_expired()
+        status = (await queue.get(job.id))["status"]
+        # The first worker's late failure does not queue the job twice
+        late = await queue.fail(job.id, "too late")
+        pending = queue._pending.qsize()
+        again = await queue.reserve(timeout=0.1)
+        return requeued, status, late, pending, again
+
+    requeued, status, late, pending, again = asyncio.run(scenario())
+    assert requeued == 1 and status == QUEUED
+    assert late is True and pending == 1
+    assert again.attempts == 2
+
+
+def test_redelivered_job_returns_the_existing_row(client, user_headers, queue):
+    _submit(client, user_headers, (61, 62, 63))
+
+    async def process_twice():
+        worker = WatermarkJobWorker(queue=queue)
+        job = await queue.reserve(timeout=1)
+        await worker.process(job)
+        # The worker died before the ack reached the queue: a second delivery
+        again = await worker.handle(job, lambda *args, **kwargs: asyncio.sleep(0))
+        async with AsyncSessionLocal() as db:
+            rows = await db.scalar(
+                select(func.count()).select_from(Watermark).where(Watermark.job_id == job.id)
+            )
+        return (await queue.get(job.id))["result"], again, rows
+
+    result, again, rows = run(client, process_twice)
+    assert result == again
+    assert rows == 1
+
+
+def test_queued_jobs_count_toward_the_free_limit(client, queue):
+    headers = register(client)
+    user_id = _user_id(client, headers)
+    for n in range(settings.FREE_DAILY_LIMIT):
+        _submit(client, headers, (64, 65, n))
+    assert run(client, _usage, user_id) == settings.FREE_DAILY_LIMIT
+
+    response = client.post(
+        "/api/watermarks/create",
+        data={"watermark_text": "queued", "async_job": "true"},
+        files={"image": ("image.png", png_bytes(color=(66, 67, 68)), "image/png")},
+        headers=headers,
+    )
+    assert response.status_code == 403
+
+
+def test_dead_job_releases_original_and_refunds_usage(client, queue):
+    headers = register(client)
+    user_id = _user_id(client, headers)
+    job_id = _submit(client, headers, (69, 70, 71))
+    assert run(client, _usage, user_id) == 1
+    original_key = get_storage().key_from_url(queue._records[job_id]["payload"]["original_url"])
+
+    async def fail_until_dead():
+        worker = WatermarkJobWorker(queue=queue)
+
+        async def broken(job, progress):
+            raise RuntimeError("render failed")
+
+        worker.handle = broken
+        for _ in range(queue.max_attempts):
+            await worker.process(await queue.reserve(timeout=1))
+        async with AsyncSessionLocal() as db:
+            row = await db.scalar(select(StoredObject).where(StoredObject.key == original_key))
+        return (await queue.get(job_id))["status"], row
+
+    status, row = run(client, fail_until_dead)
+    assert status == DEAD
+    assert row is None
+    assert not get_storage().path_for(original_key).exists()
+    assert run(client, _usage, user_id) == 0
@@ -0,0 +1,30 @@
+# File: backend/tests/test_media.py
+
+from .conftest import create_watermark
+
+
+def test_responses_carry_signed_media_links(client, user_headers):
+    created = create_watermark(client, user_headers, "media")
+    media_url = created["watermarked_media_url"]
+    assert media_url.startswith("/media/") and "md5=" in media_url
+
+    response = client.get(media_url)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+
+    page = client.get("/api/watermarks/my-watermarks/page", headers=user_headers).json()
+    assert all(item["watermarked_media_url"].startswith("/media/") for item in page["items"])
+
+
+def test_stored_urls_are_not_served(client, user_headers):
+    created = create_watermark(client, user_headers, "private")
+    assert client.get(created["watermarked_image_url"]).status_code == 404
+    assert client.get(created["original_image_url"]).status_code == 404
+
+
+def test_tampered_media_link_is_rejected(client, user_headers):
+    created = create_watermark(client, user_headers, "tampered")
+    path, query = created["watermarked_media_url"].split("?")
+    other = created["original_media_url"].split("?")[0]
+    assert client.get(f"{other}?{query}").status_code == 403
+    assert client.get(path, params={"md5": "x", "expires": "1"}).status_code == 403
@@ -0,0 +1,29 @@
+# File: backend/tests/test_metrics.py
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core.config import settings
+from main import require_metrics_access
+
+
+def test_metrics_requires_scraper_access(client, monkeypatch):
+    # TestClient requests carry no client address
+    assert client.get("/metrics").status_code == 403
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-token")
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert response.status_code == 200
+    assert "db_queries_per_request" in response.text
+
+
+def _request(host: str) -> Request:
+    return Request({"type": "http", "client": (host, 40000), "headers": []})
+
+
+def test_metrics_allow_list():
+    require_metrics_access(_request("127.0.0.1"))
+    with pytest.raises(HTTPException):
+        require_metrics_access(_request("203.0.113.7"))
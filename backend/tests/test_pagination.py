@@ -0,0 +1,62 @@
+# File: backend/tests/test_pagination.py
+
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app.core.database import AsyncSessionLocal
+from app.models.user import SubscriptionTier
+from app.models.watermark import Watermark
+
+from .conftest import _update_user, create_watermark, register, run
+
+
+def _pages(client, headers, limit):
+    cursor, ids = None, []
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/watermarks/my-watermarks/page", params=params, headers=headers).json()
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+
+
+def test_cursor_pages_are_stable_across_equal_created_at(client):
+    email = "pages@example.com"
+    headers = register(client, email)
+    run(client, lambda: _update_user(email, subscription_tier=SubscriptionTier.PRO))
+    created = [create_watermark(client, headers, f"page {n}")["id"] for n in range(5)]
+
+    # Same timestamp for every row: only the id tie-break orders them
+    async def same_created_at():
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Watermark).where(Watermark.id.in_(created)).values(created_at=datetime(2026, 1, 1))
+            )
+            await db.commit()
+
+    run(client, same_created_at)
+    ids = _pages(client, headers, limit=2)
+    assert ids == sorted(created)
+
+    # A row added mid-way sorts before the cursor and does not shift later pages
+    first = client.get(
+        "/api/watermarks/my-watermarks/page", params={"limit": 2}, headers=headers
+    ).json()
+    newest = create_watermark(client, headers, "newest")["id"]
+    rest = client.get(
+        "/api/watermarks/my-watermarks/page",
+        params={"limit": 10, "cursor": first["next_cursor"]},
+        headers=headers,
+    ).json()
+    assert [item["id"] for item in first["items"]] == sorted(created)[:2]
+    assert [item["id"] for item in rest["items"]] == sorted(created)[2:]
+    assert newest not in [item["id"] for item in rest["items"]]
+
+
+def test_invalid_cursor_is_rejected(client, user_headers):
+    response = client.get(
+        "/api/watermarks/my-watermarks/page", params={"cursor": "not-a-cursor"}, headers=user_headers
+    )
+    assert response.status_code == 400
@@ -0,0 +1,62 @@
+# File: backend/tests/test_password_hashing.py
+
+import threading
+
+from passlib.hash import bcrypt
+from sqlalchemy import select
+
+from app.core import security
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.user import User
+
+from .conftest import PASSWORD, _update_user, register, run
+
+
+def _login(client, email):
+    return client.post("/api/auth/login", data={"username": email, "password": PASSWORD})
+
+
+async def _stored_hash(email: str) -> str:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(User.hashed_password).where(User.email == email))
+
+
+def test_login_rehashes_passwords_made_with_another_cost(client):
+    email = "rehash@example.com"
+    register(client, email)
+    old_hash = bcrypt.using(rounds=settings.BCRYPT_ROUNDS + 1).hash(PASSWORD)
+    run(client, lambda: _update_user(email, hashed_password=old_hash))
+
+    assert _login(client, email).status_code == 200
+    new_hash = run(client, _stored_hash, email)
+    assert new_hash != old_hash
+    assert bcrypt.from_string(new_hash).rounds == settings.BCRYPT_ROUNDS
+    # The upgraded hash still logs in and is left alone from now on
+    assert _login(client, email).status_code == 200
+    assert run(client, _stored_hash, email) == new_hash
+
+
+def test_hashing_runs_on_the_bcrypt_pool(client, monkeypatch):
+    email = "pool@example.com"
+    register(client, email)
+    threads = []
+    verify = security.pwd_context.verify_and_update
+
+    def recording(*args):
+        threads.append(threading.current_thread().name)
+        return verify(*args)
+
+    monkeypatch.setattr(security.pwd_context, "verify_and_update", recording)
+    assert _login(client, email).status_code == 200
+    assert threads and threads[0].startswith("bcrypt")
+
+
+def test_saturated_pool_answers_503(client, monkeypatch):
+    email = "saturated@example.com"
+    register(client, email)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+
+    response = _login(client, email)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
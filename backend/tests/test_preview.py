@@ -0,0 +1,75 @@
+# File: backend/tests/test_preview.py
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.user import User
+from app.services import preview_service
+from app.services.preview_service import PreviewService
+
+from .conftest import png_bytes, register, run
+
+
+def _open_session(client, headers):
+    return client.post(
+        "/api/watermarks/preview",
+        data={"watermark_text": "preview"},
+        files={"image": ("image.png", png_bytes(), "image/png")},
+        headers=headers,
+    )
+
+
+def _user_id(client, headers) -> int:
+    return client.get("/api/users/me", headers=headers).json()["id"]
+
+
+async def _daily_usage(user_id: int) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(User.daily_usage).where(User.id == user_id))
+
+
+def test_sessions_count_toward_daily_limit(client):
+    headers = register(client)
+    user_id = _user_id(client, headers)
+
+    session_id = _open_session(client, headers).json()["session_id"]
+    assert run(client, _daily_usage, user_id) == 1
+
+    # Committing the session does not count it a second time
+    response = client.post(
+        f"/api/watermarks/preview/{session_id}/commit",
+        json={"watermark_text": "preview"},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert run(client, _daily_usage, user_id) == 1
+
+    for _ in range(settings.FREE_DAILY_LIMIT - 1):
+        assert _open_session(client, headers).status_code == 200
+    assert _open_session(client, headers).status_code == 403
+
+
+def test_sessions_are_capped_per_user(client, user_headers):
+    user_id = _user_id(client, user_headers)
+    session_ids = [
+        _open_session(client, user_headers).json()["session_id"]
+        for _ in range(settings.PREVIEW_MAX_SESSIONS_PER_USER + 1)
+    ]
+
+    assert list(preview_service._user_sessions[user_id]) == session_ids[1:]
+    service = PreviewService()
+    assert service.get_session(session_ids[0], user_id) is None
+    assert service.get_session(session_ids[-1], user_id) is not None
+
+
+def test_pinned_session_survives_eviction(client, user_headers):
+    user_id = _user_id(client, user_headers)
+    session_id = _open_session(client, user_headers).json()["session_id"]
+    service = PreviewService()
+    session = service.get_session(session_id, user_id)
+
+    with service.pinned(session):
+        service.close_session(session_id)
+        assert not session.original.closed
+    assert session.original.closed
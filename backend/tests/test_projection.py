@@ -0,0 +1,38 @@
+# File: backend/tests/test_projection.py
+
+from app.schemas.watermark import WatermarkSummary
+
+from .conftest import create_watermark
+
+
+def _list(client, headers, **params):
+    return client.get("/api/watermarks/my-watermarks", params=params, headers=headers)
+
+
+def test_list_returns_summaries_without_the_analysis(client, user_headers):
+    created = create_watermark(client, user_headers, "projection")
+    assert created["ai_analysis"]
+
+    items = _list(client, user_headers, limit=100).json()
+    item = next(i for i in items if i["id"] == created["id"])
+    assert set(item) == set(WatermarkSummary.model_fields)
+    assert "ai_analysis" not in item and "placement_data" not in item
+
+    # The detail endpoint still has everything
+    detail = client.get(f"/api/watermarks/{created['id']}", headers=user_headers).json()
+    assert detail["ai_analysis"] == created["ai_analysis"]
+
+
+def test_fields_selects_exactly_the_requested_keys(client, user_headers):
+    created = create_watermark(client, user_headers, "sparse")
+    items = _list(client, user_headers, fields="id,ai_analysis,thumbnails", limit=100).json()
+    item = next(i for i in items if i["id"] == created["id"])
+    assert set(item) == {"id", "ai_analysis", "thumbnails"}
+    assert item["ai_analysis"] == created["ai_analysis"]
+    assert item["thumbnails"]
+
+
+def test_unknown_fields_are_rejected(client, user_headers):
+    response = _list(client, user_headers, fields="id,hashed_password")
+    assert response.status_code == 400
+    assert "hashed_password" in response.json()["detail"]
@@ -0,0 +1,51 @@
+# File: backend/tests/test_query_budgets.py
+
+import pytest
+
+from .conftest import create_watermark
+
+
+def _within_budget(response):
+    assert response.status_code == 200, response.text
+    count = int(response.headers["x-db-query-count"])
+    budget = int(response.headers["x-db-query-budget"])
+    assert count <= budget, f"{count} statements, budget {budget}"
+
+
+@pytest.fixture(scope="module")
+def watermark(client, user_headers):
+    create_watermark(client, user_headers, "first")
+    return create_watermark(client, user_headers, "second")
+
+
+def test_create_succeeds(client, user_headers):
+    created = create_watermark(client, user_headers)
+    assert created["watermarked_image_url"]
+    assert created["ai_analysis"]
+
+
+@pytest.mark.parametrize("path", [
+    "/api/watermarks/my-watermarks",
+    "/api/watermarks/my-watermarks?fields=id,watermarked_image_url,thumbnails",
+    "/api/watermarks/my-watermarks/page",
+])
+def test_history_within_budget(client, user_headers, watermark, path):
+    _within_budget(client.get(path, headers=user_headers))
+
+
+def test_detail_within_budget(client, user_headers, watermark):
+    _within_budget(client.get(f"/api/watermarks/{watermark['id']}", headers=user_headers))
+
+
+def test_current_user_within_budget(client, user_headers):
+    _within_budget(client.get("/api/users/me", headers=user_headers))
+
+
+@pytest.mark.parametrize("path", [
+    "/api/admin/stats",
+    "/api/admin/stats/daily",
+    "/api/admin/users",
+    "/api/admin/logs",
+])
+def test_admin_within_budget(client, admin_headers, watermark, path):
+    _within_budget(client.get(path, headers=admin_headers))
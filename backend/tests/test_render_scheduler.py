@@ -0,0 +1,74 @@
+# File: backend/tests/test_render_scheduler.py
+
+import asyncio
+import functools
+import threading
+
+from app.services.render_pool import RenderScheduler
+
+
+async def _drain(scheduler, queued, before_release=None):
+    """Occupy every worker, queue `queued` (tier, user_id) steps, then let
+    them run; returns the (tier, user_id) steps in dispatch order"""
+    gate = threading.Event()
+    order = []
+    holders = [
+        asyncio.create_task(scheduler.run(gate.wait, "pro", None))
+        for _ in range(scheduler.workers)
+    ]
+    await asyncio.sleep(0)
+    tasks = [
+        asyncio.create_task(scheduler.run(functools.partial(order.append, (tier, user_id)), tier, user_id))
+        for tier, user_id in queued
+    ]
+    await asyncio.sleep(0)
+    if before_release:
+        await before_release()
+    gate.set()
+    await asyncio.gather(*holders, *tasks)
+    return order
+
+
+def test_tiers_share_the_pool_by_weight():
+    scheduler = RenderScheduler(workers=1, weights={"pro": 3, "free": 1}, user_limit=100, max_wait=60)
+    queued = [("free", n) for n in range(4)] + [("pro", 10 + n) for n in range(4)]
+    order = asyncio.run(_drain(scheduler, queued))
+
+    tiers = [tier for tier, _ in order]
+    # While both wait, pro gets three steps for every free one
+    assert tiers[:6].count("pro") == 4
+    # Each tier stays FIFO
+    assert [user for tier, user in order if tier == "free"] == [0, 1, 2, 3]
+    assert scheduler.running == 0 and scheduler.queued == 0
+
+
+def test_a_step_waiting_past_max_wait_is_served_first():
+    scheduler = RenderScheduler(workers=1, weights={"pro": 3, "free": 1}, user_limit=100, max_wait=0.05)
+
+    async def starve_free():
+        # Free is far behind on weights and has waited past max_wait
+        scheduler.passes["free"] = 100.0
+        await asyncio.sleep(0.1)
+
+    queued = [("free", 1)] + [("pro", 10 + n) for n in range(3)]
+    order = asyncio.run(_drain(scheduler, queued, before_release=starve_free))
+    assert order[0] == ("free", 1)
+
+
+def test_one_user_cannot_take_every_worker():
+    scheduler = RenderScheduler(workers=2, weights={"pro": 3, "free": 1}, user_limit=1, max_wait=60)
+
+    async def scenario():
+        gate = threading.Event()
+        first = asyncio.create_task(scheduler.run(gate.wait, "pro", 1))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(scheduler.run(lambda: "same user", "pro", 1))
+        other = asyncio.create_task(scheduler.run(lambda: "other user", "free", 2))
+        # The free user's step gets the second worker; user 1 waits for its first
+        assert await asyncio.wait_for(other, 5) == "other user"
+        assert not second.done()
+        gate.set()
+        await first
+        return await second
+
+    assert asyncio.run(scenario()) == "same user"
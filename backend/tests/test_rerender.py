@@ -0,0 +1,33 @@
+# File: backend/tests/test_rerender.py
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.user import User
+
+from .conftest import create_watermark, register, run
+
+
+async def _usage(email: str) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(User.daily_usage).where(User.email == email))
+
+
+def test_rerender_counts_toward_the_daily_limit(client):
+    email = "rerender@example.com"
+    headers = register(client, email)
+    watermark = create_watermark(client, headers)
+
+    for n in range(2, settings.FREE_DAILY_LIMIT + 1):
+        response = client.post(
+            f"/api/watermarks/{watermark['id']}/rerender", json={"text_size": "large"}, headers=headers
+        )
+        assert response.status_code == 200, response.text
+        assert run(client, _usage, email) == n
+
+    response = client.post(
+        f"/api/watermarks/{watermark['id']}/rerender", json={"text_size": "small"}, headers=headers
+    )
+    assert response.status_code == 403
+    assert run(client, _usage, email) == settings.FREE_DAILY_LIMIT
@@ -0,0 +1,89 @@
+# File: backend/tests/test_s3_storage.py
+
+import asyncio
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from botocore.stub import ANY, Stubber
+
+from app.core.config import settings
+from app.services.storage_service import S3StorageBackend
+
+KEY = "ab/cd/abcdef.png"
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setattr(settings, "S3_BUCKET", "watermarks")
+    monkeypatch.setattr(settings, "S3_ENDPOINT_URL", "http://minio:9000")
+    monkeypatch.setattr(settings, "S3_REGION", "us-east-1")
+    monkeypatch.setattr(settings, "S3_ACCESS_KEY_ID", "test-key")
+    monkeypatch.setattr(settings, "S3_SECRET_ACCESS_KEY", "test-secret")
+    monkeypatch.setattr(settings, "S3_PUBLIC_URL", "")
+    return S3StorageBackend()
+
+
+def test_save_uploads_with_headers_and_returns_public_url(backend):
+    with Stubber(backend.client) as stub:
+        stub.add_response("put_object", {}, {
+            "Bucket": "watermarks", "Key": KEY, "Body": ANY,
+            "ContentType": "image/png", "CacheControl": "public, max-age=60",
+        })
+        url = asyncio.run(backend.save(KEY, b"png bytes", "image/png", "public, max-age=60"))
+        stub.assert_no_pending_responses()
+
+    assert url == f"http://minio:9000/watermarks/{KEY}"
+    assert backend.key_from_url(url) == KEY
+    assert backend.key_from_url("https://elsewhere.example.com/watermarks/" + KEY) is None
+
+
+def test_read_exists_and_delete(backend):
+    with Stubber(backend.client) as stub:
+        stub.add_response(
+            "get_object", {"Body": _Body(b"stored")}, {"Bucket": "watermarks", "Key": KEY}
+        )
+        stub.add_response("head_object", {}, {"Bucket": "watermarks", "Key": KEY})
+        stub.add_client_error("head_object", "404", http_status_code=404)
+        stub.add_response("delete_object", {}, {"Bucket": "watermarks", "Key": KEY})
+
+        async def scenario():
+            return (
+                await backend.read(KEY),
+                await backend.exists(KEY),
+                await backend.exists(KEY),
+                await backend.delete(KEY),
+            )
+
+        data, present, missing, _ = asyncio.run(scenario())
+        stub.assert_no_pending_responses()
+
+    assert data == b"stored"
+    assert present is True and missing is False
+
+
+def test_other_client_errors_are_not_treated_as_missing(backend):
+    with Stubber(backend.client) as stub:
+        stub.add_client_error("head_object", "403", http_status_code=403)
+        with pytest.raises(backend._client_error):
+            asyncio.run(backend.exists(KEY))
+
+
+def test_signed_url_is_presigned_for_the_ttl(backend):
+    url = backend.signed_url(KEY, 300)
+    assert url.startswith(f"http://minio:9000/watermarks/{KEY}?")
+    query = parse_qs(urlsplit(url).query)
+    # SigV4 carries the TTL, SigV2 the absolute expiry
+    if "X-Amz-Expires" in query:
+        assert query["X-Amz-Expires"] == ["300"]
+    else:
+        assert abs(int(query["Expires"][0]) - (time.time() + 300)) < 5
+    assert "X-Amz-Signature" in query or "Signature" in query
+
+
+class _Body:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def read(self) -> bytes:
+        return self.data
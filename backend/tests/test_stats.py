@@ -0,0 +1,27 @@
+# File: backend/tests/test_stats.py
+
+from datetime import datetime
+
+from app.core.database import AsyncSessionLocal
+from app.models.stats import DailyStats
+from app.models.user import SubscriptionTier
+
+from .conftest import _update_user, create_watermark, register, run
+
+
+async def _watermarks_today() -> int:
+    async with AsyncSessionLocal() as db:
+        row = await db.get(DailyStats, datetime.utcnow().date())
+        return row.watermarks if row else 0
+
+
+def test_deleting_an_account_takes_its_watermarks_out_of_the_rollup(client):
+    headers = register(client, "leaving@example.com")
+    run(client, lambda: _update_user("leaving@example.com", subscription_tier=SubscriptionTier.PRO))
+    for text in ("first", "second", "third"):
+        create_watermark(client, headers, text)
+    before = run(client, _watermarks_today)
+
+    response = client.delete("/api/users/me", headers=headers)
+    assert response.status_code == 200, response.text
+    assert run(client, _watermarks_today) == before - 3
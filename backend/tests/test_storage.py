@@ -0,0 +1,58 @@
+# File: backend/tests/test_storage.py
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.storage import StoredObject
+from app.services.storage_service import ContentAddressedStore, get_storage
+
+from .conftest import create_watermark, png_bytes, register, run
+
+
+def _exists(url: str) -> bool:
+    storage = get_storage()
+    return storage.path_for(storage.key_from_url(url)).exists()
+
+
+async def _put_then(finish: str) -> str:
+    async with AsyncSessionLocal() as db:
+        store = ContentAddressedStore()
+        url = await store.put(db, png_bytes(color=(1, 2, 3)), "png", "image/png")
+        await getattr(store, finish)(db)
+        return url
+
+
+async def _row(url: str):
+    key = get_storage().key_from_url(url)
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(StoredObject).where(StoredObject.key == key))
+
+
+def test_rollback_removes_written_object(client):
+    url = run(client, _put_then, "rollback")
+    assert not _exists(url)
+    assert run(client, _row, url) is None
+
+
+def test_release_deletes_after_commit(client, user_headers):
+    first = create_watermark(client, user_headers, "shared original")
+    second = create_watermark(client, user_headers, "second")
+    # Both rows reference the same original
+    assert first["original_image_url"] == second["original_image_url"]
+
+    response = client.delete(f"/api/watermarks/{first['id']}", headers=user_headers)
+    assert response.status_code == 200
+    assert not _exists(first["watermarked_image_url"])
+    assert _exists(first["original_image_url"])
+    assert run(client, _row, first["original_image_url"]).ref_count >= 1
+
+
+def test_delete_account_releases_objects(client):
+    headers = register(client)
+    created = create_watermark(client, headers, "account going away")
+    assert _exists(created["watermarked_image_url"])
+
+    response = client.delete("/api/users/me", headers=headers)
+    assert response.status_code == 200
+    assert not _exists(created["watermarked_image_url"])
+    assert run(client, _row, created["watermarked_image_url"]) is None
@@ -0,0 +1,39 @@
+# File: backend/tests/test_thumbnails.py
+
+import pytest
+
+from app.services import derivative_service
+from app.services.derivative_service import DerivativeService
+
+from .conftest import create_watermark
+
+
+def test_thumbnail_of_stored_output(client, user_headers):
+    created = create_watermark(client, user_headers, "thumbnail")
+    url = created["thumbnails"]["160"]
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert not derivative_service._inflight
+
+
+@pytest.mark.parametrize("key", [
+    f"ab/cd/{'ab' * 32}.png",  # well-formed, but nothing is stored under it
+    "legacy/upload.png",
+    "../../etc/passwd",
+])
+def test_thumbnail_rejects_unknown_keys(client, key):
+    response = client.get(DerivativeService.url_for(key, 160))
+    assert response.status_code == 404
+
+
+def test_failed_render_releases_single_flight_lock(client, monkeypatch):
+    async def missing(key):
+        raise FileNotFoundError(key)
+
+    service = DerivativeService()
+    monkeypatch.setattr(service.storage, "read", missing)
+    with pytest.raises(FileNotFoundError):
+        client.portal.call(service.get_thumbnail, f"ab/cd/{'cd' * 32}.png", 160)
+    assert not derivative_service._inflight
@@ -0,0 +1,80 @@
+# File: backend/tests/test_uploads.py
+
+import asyncio
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.core.middleware import UploadSizeLimitMiddleware
+from app.utils.uploads import spool_upload
+
+
+def _post(path, chunks, content_length=None):
+    """POST `chunks` through the middleware (limit 100 bytes, 1000 for
+    batch); returns the response status and the body bytes the app read"""
+    read = []
+
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise OSError("client went away")
+            read.append(message["body"])
+            if not message.get("more_body"):
+                break
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = UploadSizeLimitMiddleware(
+        app, max_body_size=100, path_prefixes=("/api/watermarks",),
+        overrides={"/api/watermarks/batch": 1000},
+    )
+    headers = [] if content_length is None else [(b"content-length", str(content_length).encode())]
+    scope = {"type": "http", "method": "POST", "path": path, "headers": headers}
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0]["status"], sum(len(chunk) for chunk in read)
+
+
+def test_declared_oversized_body_is_refused_unread():
+    assert _post("/api/watermarks/create", [b"x" * 150], content_length=150) == (413, 0)
+
+
+def test_chunked_body_is_cut_off_once_over_the_limit():
+    status, read = _post("/api/watermarks/create", [b"x" * 60] * 5)
+    assert status == 413
+    # The app never sees the chunk that crossed the limit, nor any after it
+    assert read == 60
+
+
+def test_batch_has_its_own_limit():
+    assert _post("/api/watermarks/batch", [b"x" * 300] * 3) == (200, 900)
+    assert _post("/api/watermarks/batch", [b"x" * 1200], content_length=1200)[0] == 413
+
+
+def test_other_paths_are_not_limited():
+    assert _post("/api/auth/register", [b"x" * 500]) == (200, 500)
+
+
+def test_spool_upload_enforces_the_file_limit():
+    def upload(size):
+        return UploadFile(io.BytesIO(b"x" * size), filename="image.png")
+
+    spooled = asyncio.run(spool_upload(upload(64), max_size=64))
+    assert spooled.size == 64 and spooled.rewind().read() == b"x" * 64
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(spool_upload(upload(65), max_size=64))
+    assert error.value.status_code == 413
@@ -0,0 +1,76 @@
+# File: backend/tests/test_variants.py
+
+from PIL import Image, ImageDraw
+
+from app.services.watermark_service import SHADOW_OFFSET, WatermarkService
+
+from .conftest import png_bytes
+
+FILL = (255, 255, 255, 128)  # 50% opacity, the common case
+SHADOW = (0, 0, 0, 64)
+
+
+def _sprite(service, text="Sprite", size=40, fill=FILL, shadow=None):
+    font_path = service.font_manager.get_font_path("Arial")
+    layout = service.font_manager.layout_text(text, font_path, size)
+    return service._text_sprite((text, str(font_path), size), layout, fill, shadow), layout
+
+
+def test_sprites_are_shared_between_service_instances(client):
+    (first, _), _ = _sprite(WatermarkService())
+    (second, _), _ = _sprite(WatermarkService())
+    assert first is second
+
+    (other_color, _), _ = _sprite(WatermarkService(), fill=(255, 0, 0, 128))
+    assert other_color is not first
+
+
+def test_single_placement_matches_drawing_the_text_directly(client):
+    service = WatermarkService()
+    (sprite, (dx, dy)), layout = _sprite(service, text="Direct", shadow=SHADOW)
+
+    composited = Image.new("RGBA", (300, 120), (0, 0, 0, 0))
+    service._composite_sprite(composited, sprite, 20 + dx, 30 + dy)
+
+    drawn = Image.new("RGBA", (300, 120), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(drawn)
+    layout.draw(draw, (20 + SHADOW_OFFSET, 30 + SHADOW_OFFSET), fill=SHADOW)
+    layout.draw(draw, (20, 30), fill=FILL)
+
+    assert composited.tobytes() == drawn.tobytes()
+
+
+def test_overlapping_semi_transparent_marks_blend(client):
+    # Drawing straight onto the overlay replaced pixels, so where tiled marks
+    # overlapped the later one won; composited sprites blend like layers
+    service = WatermarkService()
+    (sprite, (dx, dy)), _ = _sprite(service, text="Overlap")
+
+    overlay = Image.new("RGBA", (300, 120), (0, 0, 0, 0))
+    for _ in range(2):
+        service._composite_sprite(overlay, sprite, 20 + dx, 30 + dy)
+
+    peak = max(overlay.getchannel("A").getdata())
+    # 1 - (1 - a)^2 for a = 128/255, instead of staying at 128
+    assert 190 <= peak <= 193
+
+
+def test_variants_share_one_upload_and_group(client, user_headers):
+    response = client.post(
+        "/api/watermarks/create",
+        data={
+            "watermark_text": "variants",
+            "variants": '[{"text_position": "top-left"}, {"text_position": "center", "text_opacity": 0.4}]',
+        },
+        files={"image": ("image.png", png_bytes(color=(121, 122, 123)), "image/png")},
+        headers=user_headers,
+    )
+    assert response.status_code == 200, response.text
+    variants = response.json()["variants"]
+
+    assert len(variants) == 2
+    assert len({v["variant_group"] for v in variants}) == 1 and variants[0]["variant_group"]
+    # One stored original, two different outputs
+    assert len({v["original_image_url"] for v in variants}) == 1
+    assert len({v["watermarked_image_url"] for v in variants}) == 2
+    assert [v["placement_data"]["position"] for v in variants] == ["top-left", "center"]
@@ -0,0 +1,67 @@
+# File: backend/tests/test_ws.py
+
+import time
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.services.job_events import JobProgress, get_event_broker
+
+from .conftest import png_bytes, register, run
+
+
+def _token(headers) -> str:
+    return headers["Authorization"].split()[1]
+
+
+def _wait_for_subscriber(user_id: int) -> None:
+    # The socket subscribes just after the handshake
+    deadline = time.monotonic() + 5
+    while user_id not in get_event_broker()._subscribers:
+        assert time.monotonic() < deadline, "socket never subscribed"
+        time.sleep(0.01)
+
+
+def test_socket_rejects_invalid_token(client):
+    with pytest.raises(WebSocketDisconnect) as error:
+        with client.websocket_connect("/ws/jobs?token=not-a-token") as ws:
+            ws.receive_json()
+    assert error.value.code == 1008
+
+
+def test_socket_streams_stages_of_a_background_job(client):
+    headers = register(client)
+    user_id = client.get("/api/users/me", headers=headers).json()["id"]
+
+    with client.websocket_connect(f"/ws/jobs?token={_token(headers)}") as ws:
+        _wait_for_subscriber(user_id)
+        response = client.post(
+            "/api/watermarks/create",
+            data={"watermark_text": "progress", "async_job": "true"},
+            files={"image": ("image.png", png_bytes(color=(91, 92, 93)), "image/png")},
+            headers=headers,
+        )
+        assert response.status_code == 202, response.text
+        job_id = response.json()["job_id"]
+
+        stages = []
+        while not stages or stages[-1]["stage"] not in ("succeeded", "failed"):
+            stages.append(ws.receive_json())
+
+    assert {event["job_id"] for event in stages} == {job_id}
+    names = [event["stage"] for event in stages]
+    assert names[0] == "queued" and names[-1] == "succeeded"
+    assert names.index("processing") < names.index("stored")
+    assert stages[-1]["watermark_id"]
+    assert all(event["elapsed_ms"] >= event["stage_ms"] >= 0 for event in stages)
+
+
+def test_job_filter_only_forwards_that_job(client):
+    headers = register(client)
+    user_id = client.get("/api/users/me", headers=headers).json()["id"]
+
+    with client.websocket_connect(f"/ws/jobs?token={_token(headers)}&job_id=wanted") as ws:
+        _wait_for_subscriber(user_id)
+        run(client, JobProgress(user_id, "other"), "queued")
+        run(client, JobProgress(user_id, "wanted"), "queued")
+        assert ws.receive_json()["job_id"] == "wanted"
@@ -0,0 +1,26 @@
+# File: backend/worker.py
+
+import asyncio
+import logging
+import signal
+
+from app.core.database import async_engine
+from app.services.job_worker import WatermarkJobWorker
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await WatermarkJobWorker().run(stop)
+    await async_engine.dispose()
+    logger.info("Watermark worker stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -12,17 +12,22 @@ export default function MyImages() {
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState("");
   const [selectedImage, setSelectedImage] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchImages();
   }, []);
 
-  const fetchImages = async () => {
+  const fetchImages = async (cursor = null) => {
     try {
-      const response = await api.get("/watermarks/my-watermarks", {
+      const response = await api.get("/watermarks/my-watermarks/page", {
         headers: { Authorization: `Bearer ${token}` },
+        params: cursor ? { cursor } : {},
       });
-      setImages(response.data);
+      const { items, next_cursor } = response.data;
+      setImages((prev) => (cursor ? [...prev, ...items] : items));
+      setNextCursor(next_cursor);
     } catch (error) {
       toast.error("Failed to load images");
     } finally {
@@ -30,6 +35,12 @@ export default function MyImages() {
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    await fetchImages(nextCursor);
+    setLoadingMore(false);
+  };
+
   const handleDelete = async (id) => {
     if (!confirm("Are you sure you want to delete this watermark?")) return;
 
@@ -44,6 +55,19 @@ export default function MyImages() {
     }
   };
 
+  // Cards use the small WebP derivatives instead of the full-size PNG
+  const thumbnailSrc = (image) => {
+    const url = image.thumbnails?.[320] ?? image.watermarked_media_url;
+    return `${import.meta.env.VITE_API_URL}${url}`;
+  };
+
+  const thumbnailSrcSet = (image) =>
+    image.thumbnails
+      ? Object.entries(image.thumbnails)
+          .map(([width, url]) => `${import.meta.env.VITE_API_URL}${url} ${width}w`)
+          .join(", ")
+      : undefined;
+
   const handleDownload = (url, filename) => {
     const link = document.createElement("a");
     link.href = `${import.meta.env.VITE_API_URL}${url}`;
@@ -105,7 +129,10 @@ export default function MyImages() {
                     onClick={() => setSelectedImage(image)}
                   >
                     <img
-                      src={`${import.meta.env.VITE_API_URL}${image.watermarked_image_url}`}
+                      src={thumbnailSrc(image)}
+                      srcSet={thumbnailSrcSet(image)}
+                      sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
+                      loading="lazy"
                       alt={image.watermark_text}
                       className="w-full h-full object-cover"
                     />
@@ -126,7 +153,7 @@ export default function MyImages() {
                       <button
                         onClick={() =>
                           handleDownload(
-                            image.watermarked_image_url,
+                            image.watermarked_media_url,
                             `${image.watermark_text}.png`,
                           )
                         }
@@ -149,6 +176,19 @@ export default function MyImages() {
           </div>
         )}
 
+        {!loading && nextCursor && (
+          <div className="flex justify-center mt-8">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="btn-secondary flex items-center"
+            >
+              {loadingMore && <Loader className="w-4 h-4 mr-2 animate-spin" />}
+              Load more
+            </button>
+          </div>
+        )}
+
         {/* Image Modal */}
         {selectedImage && (
           <motion.div
@@ -165,7 +205,7 @@ export default function MyImages() {
               onClick={(e) => e.stopPropagation()}
             >
               <img
-                src={`${import.meta.env.VITE_API_URL}${selectedImage.watermarked_image_url}`}
+                src={`${import.meta.env.VITE_API_URL}${selectedImage.watermarked_media_url}`}
                 alt={selectedImage.watermark_text}
                 className="w-full h-auto max-h-[80vh] object-contain rounded-lg"
               />
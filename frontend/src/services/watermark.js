@@ -2,6 +2,20 @@
 
 import api from "./api";
 
+const previewPayload = (watermarkText, customSettings) => ({
+  watermark_text: watermarkText,
+  text_position: customSettings.position || "bottom-right",
+  text_size: customSettings.size || "medium",
+  text_opacity: customSettings.opacity || 0.7,
+  auto_opacity: customSettings.autoOpacity || false,
+  multiple_watermarks: customSettings.multipleWatermarks || false,
+  watermark_pattern: customSettings.pattern || "diagonal",
+  font_family: customSettings.fontFamily || null,
+  text_color: customSettings.textColor || "#FFFFFF",
+  text_shadow: customSettings.textShadow || false,
+  protection_mode: customSettings.protectionMode || "standard",
+});
+
 export const watermarkService = {
   create: async (image, watermarkText, customSettings = {}) => {
     const formData = new FormData();
@@ -36,6 +50,15 @@ export const watermarkService = {
     // Protection mode
     formData.append("protection_mode", customSettings.protectionMode || "standard");
 
+    if (customSettings.asyncJob) {
+      formData.append("async_job", true);
+    }
+
+    // Variants: list of API setting overrides rendered from this one upload
+    if (customSettings.variants?.length) {
+      formData.append("variants", JSON.stringify(customSettings.variants));
+    }
+
     const response = await api.post("/watermarks/create", formData, {
       headers: {
         "Content-Type": "multipart/form-data",
@@ -44,6 +67,37 @@ export const watermarkService = {
     return response.data;
   },
 
+  // Preview sessions: upload once, then re-render on the server-side proxy
+  createPreviewSession: async (image, watermarkText = "") => {
+    const formData = new FormData();
+    formData.append("image", image);
+    formData.append("watermark_text", watermarkText);
+
+    const response = await api.post("/watermarks/preview", formData, {
+      headers: {
+        "Content-Type": "multipart/form-data",
+      },
+    });
+    return response.data;
+  },
+
+  renderPreview: async (sessionId, watermarkText, customSettings = {}) => {
+    const response = await api.post(
+      `/watermarks/preview/${sessionId}/render`,
+      previewPayload(watermarkText, customSettings),
+      { responseType: "blob" }
+    );
+    return URL.createObjectURL(response.data);
+  },
+
+  commitPreview: async (sessionId, watermarkText, customSettings = {}) => {
+    const response = await api.post(
+      `/watermarks/preview/${sessionId}/commit`,
+      previewPayload(watermarkText, customSettings)
+    );
+    return response.data;
+  },
+
   getMyWatermarks: async (skip = 0, limit = 20) => {
     const response = await api.get("/watermarks/my-watermarks", {
       params: { skip, limit },
@@ -51,6 +105,46 @@ export const watermarkService = {
     return response.data;
   },
 
+  // Cursor pagination: returns { items, next_cursor }; pass next_cursor back
+  // to get the following page (null when there is none)
+  // Items are summaries; fields (e.g. ["id", "thumbnails"]) narrows them further
+  getMyWatermarksPage: async (cursor = null, limit = 20, fields = null) => {
+    const params = { limit };
+    if (cursor) params.cursor = cursor;
+    if (fields) params.fields = fields.join(",");
+    const response = await api.get("/watermarks/my-watermarks/page", { params });
+    return response.data;
+  },
+
+  // Full record including ai_analysis and placement_data
+  getWatermark: async (id) => {
+    const response = await api.get(`/watermarks/${id}`);
+    return response.data;
+  },
+
+  // Only the changed settings are needed; the rest is kept server-side
+  rerender: async (id, changes = {}) => {
+    const response = await api.post(`/watermarks/${id}/rerender`, changes);
+    return response.data;
+  },
+
+  // Background jobs (create with customSettings.asyncJob)
+  getJob: async (jobId) => {
+    const response = await api.get(`/jobs/${jobId}`);
+    return response.data;
+  },
+
+  // Push progress for background/batch jobs; returns the socket (call close())
+  subscribeJobEvents: (onEvent, jobId = null) => {
+    const base = api.defaults.baseURL.replace(/\/api$/, "").replace(/^http/, "ws");
+    const params = new URLSearchParams({ token: localStorage.getItem("token") || "" });
+    if (jobId) params.set("job_id", jobId);
+
+    const socket = new WebSocket(`${base}/ws/jobs?${params}`);
+    socket.onmessage = (message) => onEvent(JSON.parse(message.data));
+    return socket;
+  },
+
   delete: async (id) => {
     const response = await api.delete(`/watermarks/${id}`);
     return response.data;